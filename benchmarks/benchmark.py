@@ -0,0 +1,486 @@
+"""
+Benchmarks for the List and File methods against idiomatic plain-Python baselines.
+
+Usage (from the repository root):
+
+    python -m benchmarks.benchmark --sizes 1e3,1e4,1e5 --output results.json
+    python -m benchmarks.benchmark --sizes 1e3,1e4,1e5 --compare results.json --threshold 0.2
+
+Every case is timed for each data size, data shape (ints, strings, dicts) and key cardinality.
+The results are saved as JSON; the compare mode reruns the suite and reports the cases whose time grew by more
+than the threshold relative to a saved run, exiting with status 1 if there are any.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from itertools import dropwhile
+from pathlib import Path
+
+from python_linq.file_like_csharp import File
+from python_linq.linq_like_csharp import List
+
+SHAPES = ('ints', 'strings', 'dicts')
+ALL = SHAPES
+ONE = ('ints',)
+
+Dataset = namedtuple('Dataset', 'items list other key value middle predicate never sentinel marked indexed folder')
+
+
+def make_dataset(shape, size, cardinality, seed, folder):
+    rnd = random.Random(seed)
+    if shape == 'ints':
+        items = [rnd.randrange(cardinality) for _ in range(size)]
+        other = [rnd.randrange(cardinality) for _ in range(size // 2)]
+        key = value = lambda x: x
+    elif shape == 'strings':
+        items = ['key%d' % rnd.randrange(cardinality) for _ in range(size)]
+        other = ['key%d' % rnd.randrange(cardinality) for _ in range(size // 2)]
+        key = lambda x: x
+        value = len
+    else:
+        items = [{'id': rnd.randrange(cardinality), 'v': rnd.random()} for _ in range(size)]
+        other = [{'id': rnd.randrange(cardinality), 'w': rnd.random()} for _ in range(size // 2)]
+        key = lambda x: x['id']
+        value = lambda x: x['v']
+    middle = key(items[len(items) // 2])
+    predicate = lambda x: key(x) == middle
+    never = lambda x: False
+    # a unique object at the end of the data, for cases that must scan everything to find exactly one match
+    sentinel = object()
+    marked = List(items + [sentinel])
+    indexed = List(items)
+    indexed.CreateIndex('key', key)
+    return Dataset(items, List(items), other, key, value, middle, predicate, never, sentinel, marked, indexed, folder)
+
+
+# name -> (shapes, linq implementation, plain Python baseline)
+LIST_CASES = {
+    'Select': (ALL, lambda d: d.list.Select(d.value), lambda d: [d.value(x) for x in d.items]),
+    'SelectMany': (ONE, lambda d: List([d.items, d.other]).SelectMany(),
+                   lambda d: [x for n in [d.items, d.other] for x in n]),
+    'Where': (ALL, lambda d: d.list.Where(d.predicate), lambda d: [x for x in d.items if d.predicate(x)]),
+    'GroupBy': (ALL, lambda d: d.list.GroupBy(d.key), lambda d: _baseline_group(d.items, d.key)),
+    'GroupAggregate': (ALL, lambda d: d.list.GroupAggregate(d.key, {'n': 'count', 's': ('sum', d.value)}),
+                       lambda d: _baseline_group_sum(d.items, d.key, d.value)),
+    'ToLookup': (ALL, lambda d: d.list.ToLookup(d.key)[d.key(d.items[0])],
+                 lambda d: _baseline_group(d.items, d.key)),
+    'Except': (('ints', 'strings'), lambda d: d.list.Except(d.other),
+               lambda d: _baseline_except(d.items, d.other, None)),
+    'ExceptBy': (ALL, lambda d: d.list.ExceptBy(d.other, d.key),
+                 lambda d: _baseline_except(d.items, d.other, d.key)),
+    'Single': (ALL, lambda d: d.marked.Single(lambda x: x is d.sentinel),
+               lambda d: [x for x in d.marked if x is d.sentinel][0]),
+    'SingleOrDefault': (ALL, lambda d: d.list.SingleOrDefault(None, d.never),
+                        lambda d: next((x for x in d.items if d.never(x)), None)),
+    'Join': (ALL, lambda d: d.list.Join(d.other, d.key, d.key, lambda n, o: (n, o)),
+             lambda d: _baseline_join(d.items, d.other, d.key)),
+    'GroupJoin': (ALL, lambda d: d.list.GroupJoin(d.other, d.key, d.key, lambda n, g: (n, g)),
+                  lambda d: _baseline_group_join(d.items, d.other, d.key)),
+    'LeftJoin': (ALL, lambda d: d.list.LeftJoin(d.other, d.key, d.key, lambda n, o: (n, o)),
+                 lambda d: _baseline_join(d.items, d.other, d.key, left=True)),
+    'Any': (ALL, lambda d: d.list.Any(d.never), lambda d: any(d.never(x) for x in d.items)),
+    'All': (ALL, lambda d: d.list.All(lambda x: not d.never(x)), lambda d: all(not d.never(x) for x in d.items)),
+    'Contains': (ALL, lambda d: d.list.Contains(d.sentinel), lambda d: d.sentinel in d.items),
+    'Distinct': (('ints', 'strings'), lambda d: d.list.Distinct(), lambda d: _baseline_distinct(d.items, None)),
+    'DistinctBy': (ALL, lambda d: d.list.DistinctBy(d.key), lambda d: _baseline_distinct(d.items, d.key)),
+    'Concat': (ALL, lambda d: d.list.Concat(d.other), lambda d: d.items + d.other),
+    'Intersect': (('ints', 'strings'), lambda d: d.list.Intersect(d.other),
+                  lambda d: _baseline_intersect(d.items, d.other, lambda x: x)),
+    'IntersectBy': (ALL, lambda d: d.list.IntersectBy(d.other, d.key),
+                    lambda d: _baseline_intersect(d.items, d.other, d.key)),
+    'Union': (('ints', 'strings'), lambda d: d.list.Union(d.other),
+              lambda d: _baseline_distinct(d.items + d.other, None)),
+    'UnionBy': (ALL, lambda d: d.list.UnionBy(d.other, d.key),
+                lambda d: _baseline_distinct(d.items + d.other, d.key)),
+    'Count': (ALL, lambda d: d.list.Count(d.predicate), lambda d: sum(1 for x in d.items if d.predicate(x))),
+    'Sum': (ALL, lambda d: d.list.Sum(d.value), lambda d: sum(d.value(x) for x in d.items)),
+    'Average': (ALL, lambda d: d.list.Average(d.value), lambda d: sum(d.value(x) for x in d.items) / len(d.items)),
+    'Min': (ALL, lambda d: d.list.Min(selector=d.value), lambda d: min(d.value(x) for x in d.items)),
+    'Max': (ALL, lambda d: d.list.Max(selector=d.value), lambda d: max(d.value(x) for x in d.items)),
+    'MinBy': (ALL, lambda d: d.list.MinBy(d.value), lambda d: min(d.items, key=d.value)),
+    'MaxBy': (ALL, lambda d: d.list.MaxBy(d.value), lambda d: max(d.items, key=d.value)),
+    'Aggregate': (ALL, lambda d: d.list.Aggregate(0, lambda a, x: a + d.value(x)),
+                  lambda d: sum(d.value(x) for x in d.items)),
+    'Stats': (ALL, lambda d: d.list.Stats(d.value), lambda d: _baseline_stats([d.value(x) for x in d.items])),
+    'AggregateMany': (ALL, lambda d: d.list.AggregateMany({'n': 'count', 'max': ('max', d.value)}),
+                      lambda d: (len(d.items), max(d.value(x) for x in d.items))),
+    'Take': (ALL, lambda d: d.list.Take(len(d.items) // 2), lambda d: d.items[:len(d.items) // 2]),
+    'Skip': (ALL, lambda d: d.list.Skip(len(d.items) // 2), lambda d: d.items[len(d.items) // 2:]),
+    'TakeWhile': (ALL, lambda d: d.list.TakeWhile(lambda x: not d.never(x)),
+                  lambda d: [x for x in d.items if not d.never(x)]),
+    'SkipWhile': (ALL, lambda d: d.marked.SkipWhile(lambda x: x is not d.sentinel),
+                  lambda d: list(dropwhile(lambda x: x is not d.sentinel, d.marked))),
+    'First': (ALL, lambda d: d.list.First(d.predicate), lambda d: next(x for x in d.items if d.predicate(x))),
+    'FirstOrDefault': (ALL, lambda d: d.list.FirstOrDefault(None, d.never),
+                       lambda d: next((x for x in d.items if d.never(x)), None)),
+    'ElementAt': (ALL, lambda d: d.list.ElementAt(len(d.items) // 2), lambda d: d.items[len(d.items) // 2]),
+    'ElementAtOrDefault': (ALL, lambda d: d.list.ElementAtOrDefault(len(d.items), None),
+                           lambda d: _element_at_or_default(d.items, len(d.items))),
+    'Last': (ALL, lambda d: d.list.Last(d.predicate),
+             lambda d: next(x for x in reversed(d.items) if d.predicate(x))),
+    'LastOrDefault': (ALL, lambda d: d.list.LastOrDefault(None, d.never),
+                      lambda d: next((x for x in reversed(d.items) if d.never(x)), None)),
+    'OrderBy': (ALL, lambda d: d.list.OrderBy(d.value).ToList(), lambda d: sorted(d.items, key=d.value)),
+    'OrderByDescending': (ALL, lambda d: d.list.OrderByDescending(d.value).ToList(),
+                          lambda d: sorted(d.items, key=d.value, reverse=True)),
+    'ThenBy': (ALL, lambda d: d.list.OrderBy(d.key).ThenBy(d.value).ToList(),
+               lambda d: sorted(d.items, key=lambda x: (d.key(x), d.value(x)))),
+    'OrderByTake': (ALL, lambda d: d.list.OrderBy(d.value).Take(100).ToList(),
+                    lambda d: sorted(d.items, key=d.value)[:100]),
+    'Reverse': (ALL, lambda d: d.list.Reverse(), lambda d: d.items[::-1]),
+    'Zip': (ALL, lambda d: d.list.Zip(d.other, lambda n, o: (n, o)), lambda d: list(zip(d.items, d.other))),
+    'ForEach': (ALL, lambda d: d.list.ForEach(d.value), lambda d: [d.value(x) for x in d.items]),
+    'Add': (ONE, lambda d: List(d.items).Add(0), lambda d: list(d.items).append(0)),
+    'AddRange': (ONE, lambda d: List(d.items).AddRange(d.other), lambda d: list(d.items).extend(d.other)),
+    'IndexOf': (ALL, lambda d: d.list.IndexOf(d.items[-1]), lambda d: d.items.index(d.items[-1])),
+    'Insert': (ONE, lambda d: List(d.items).Insert(0, 0), lambda d: list(d.items).insert(0, 0)),
+    'Remove': (ONE, lambda d: List(d.items).Remove(d.items[-1]), lambda d: list(d.items).remove(d.items[-1])),
+    'RemoveAt': (ONE, lambda d: List(d.items).RemoveAt(0), lambda d: list(d.items).pop(0)),
+    'Chunk': (ALL, lambda d: d.list.Chunk(100).ToList(), lambda d: _baseline_chunk(d.items, 100)),
+    'Batch': (('strings',), lambda d: d.list.Batch(100, max_bytes=4096).ToList(),
+              lambda d: _baseline_batch(d.items, 100, 4096)),
+    'ForEachBatch': (ALL, lambda d: d.list.ForEachBatch(len, 100),
+                     lambda d: [len(c) for c in _baseline_chunk(d.items, 100)]),
+    'CreateIndex': (ALL, lambda d: List(d.items).CreateIndex('key', d.key), lambda d: _baseline_group(d.items, d.key)),
+    'Lookup': (ALL, lambda d: d.indexed.Lookup('key', d.middle),
+               lambda d: [x for x in d.items if d.key(x) == d.middle]),
+    'AsEnumerable': (ALL, lambda d: d.list.AsEnumerable().Select(d.value).Where(bool).Take(10).ToList(),
+                     lambda d: [y for y in (d.value(x) for x in d.items) if y][:10]),
+}
+
+# names of List methods that are deliberately not benchmarked (conversions without work of their own)
+NOT_BENCHMARKED = {'ToPythonList', 'AsParallel', 'AsNumeric', 'ToColumnar', 'WithProfiling', 'DropIndex'}
+
+
+def _element_at_or_default(items, index):
+    return items[index] if index < len(items) else None
+
+
+def _baseline_chunk(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _baseline_batch(items, size, max_bytes):
+    batches, batch, batch_bytes = [], [], 0
+    for x in items:
+        if batch and (len(batch) == size or batch_bytes + len(x) > max_bytes):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(x)
+        batch_bytes += len(x)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _baseline_group(items, key):
+    groups = {}
+    for x in items:
+        groups.setdefault(key(x), []).append(x)
+    return groups
+
+
+def _baseline_group_sum(items, key, value):
+    groups = {}
+    for x in items:
+        k = key(x)
+        count, total = groups.get(k, (0, 0))
+        groups[k] = (count + 1, total + value(x))
+    return groups
+
+
+def _baseline_except(items, other, key):
+    if key is None:
+        excluded = set(other)
+        return [x for x in items if x not in excluded]
+    excluded = {key(x) for x in other}
+    return [x for x in items if key(x) not in excluded]
+
+
+def _baseline_distinct(items, key):
+    seen = set()
+    output = []
+    for x in items:
+        k = x if key is None else key(x)
+        if k not in seen:
+            seen.add(k)
+            output.append(x)
+    return output
+
+
+def _baseline_intersect(items, other, key):
+    keys = {key(x) for x in other}
+    seen = set()
+    output = []
+    for x in items:
+        k = key(x)
+        if k in keys and k not in seen:
+            seen.add(k)
+            output.append(x)
+    return output
+
+
+def _baseline_join(items, other, key, left=False):
+    lookup = _baseline_group(other, key)
+    output = []
+    for n in items:
+        matches = lookup.get(key(n))
+        if matches:
+            output.extend((n, o) for o in matches)
+        elif left:
+            output.append((n, None))
+    return output
+
+
+def _baseline_group_join(items, other, key):
+    lookup = _baseline_group(other, key)
+    return [(n, lookup.get(key(n), [])) for n in items]
+
+
+def _baseline_stats(values):
+    count = len(values)
+    mean = sum(values) / count
+    return count, sum(values), min(values), max(values), mean, sum((x - mean) ** 2 for x in values) / count
+
+
+def _write_lines(folder, size):
+    path = os.path.join(folder, 'lines.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join('line number %d' % i for i in range(size)))
+    with open(path + '.csv', 'w', encoding='utf-8') as f:
+        f.write('id,name,value,note\n')
+        f.write(''.join('%d,item %d,%d.5,"a, b"\n' % (i, i, i % 1000) for i in range(size)))
+    with open(path + '.jsonl', 'w', encoding='utf-8') as f:
+        f.write(''.join(json.dumps({'id': i, 'name': 'item %d' % i, 'value': i % 1000 + 0.5}) + '\n'
+                        for i in range(size)))
+    return path
+
+
+def _scratch(folder):
+    path = os.path.join(folder, 'scratch.txt')
+    if os.path.exists(path):
+        os.remove(path)
+    return path
+
+
+FILE_CASES = {
+    'ReadAllLines': (lambda p, d: File.ReadAllLines(p), lambda p, d: Path(p).read_text(encoding='utf-8').splitlines()),
+    'ReadLines': (lambda p, d: File.ReadLines(p).Count(), lambda p, d: _count_lines(p)),
+    # the lines take several times the size of the file in memory, so this spills a dozen or so sorted runs
+    'ExternalOrderBy': (lambda p, d: File.ReadLines(p).OrderByDescending(
+                            memory_limit=os.path.getsize(p) // 2 + 1).ToList(),
+                        lambda p, d: sorted(Path(p).read_text(encoding='utf-8').splitlines(), reverse=True)),
+    'ParallelLines': (lambda p, d: File.ParallelLines(p).Count(), lambda p, d: _count_lines(p)),
+    'ReadCsv': (lambda p, d: File.ReadCsv(p + '.csv', columns=['id', 'value'], types={'value': float},
+                                          predicate=lambda row: row['id'].endswith('7')).Count(),
+                lambda p, d: _baseline_read_csv(p + '.csv')),
+    'ReadJsonLines': (lambda p, d: File.ReadJsonLines(p + '.jsonl', fields=['name'],
+                                                      predicate=lambda x: x['value'] > 500).Count(),
+                      lambda p, d: _baseline_read_json_lines(p + '.jsonl')),
+    'ReadAllText': (lambda p, d: File.ReadAllText(p), lambda p, d: Path(p).read_text(encoding='utf-8')),
+    'ReadAllBytes': (lambda p, d: File.ReadAllBytes(p), lambda p, d: Path(p).read_bytes()),
+    'MapBytes': (lambda p, d: bytes(File.MapBytes(p)[-16:]), lambda p, d: Path(p).read_bytes()[-16:]),
+    'OpenView': (lambda p, d: bytes(File.OpenView(p, os.path.getsize(p) // 2, 64)),
+                 lambda p, d: _read_at(p, os.path.getsize(p) // 2, 64)),
+    'ReadRecords': (lambda p, d: File.ReadRecords(p, 64).Count(), lambda p, d: _count_records(p, 64)),
+    'ReadSegments': (lambda p, d: File.ReadSegments(p).Count(), lambda p, d: Path(p).read_bytes().count(b'\n') + 1),
+    'AppendAllLines': (lambda p, d: File.AppendAllLines(_scratch(d), ['x'] * 1000),
+                       lambda p, d: _append(_scratch(d), '\n'.join(['x'] * 1000))),
+    'AppendLines': (lambda p, d: File.AppendLines(_scratch(d), (str(i) for i in range(100000))),
+                    lambda p, d: _append(_scratch(d), ''.join(str(i) + '\n' for i in range(100000)))),
+    'WriteLines': (lambda p, d: File.WriteLines(_scratch(d), (str(i) for i in range(100000))),
+                   lambda p, d: Path(_scratch(d)).write_text(''.join(str(i) + '\n' for i in range(100000)),
+                                                             encoding='utf-8')),
+    'OpenWriter': (lambda p, d: _write_with_writer(_scratch(d), 100000),
+                   lambda p, d: _baseline_write_lines(_scratch(d), 100000)),
+    'AppendAllText': (lambda p, d: File.AppendAllText(_scratch(d), 'x' * 100000),
+                      lambda p, d: _append(_scratch(d), 'x' * 100000)),
+    'WriteAllLines': (lambda p, d: File.WriteAllLines(_scratch(d), ['x'] * 100000),
+                      lambda p, d: Path(_scratch(d)).write_text('\n'.join(['x'] * 100000), encoding='utf-8')),
+    'WriteAllText': (lambda p, d: File.WriteAllText(_scratch(d), 'x' * 100000),
+                     lambda p, d: Path(_scratch(d)).write_text('x' * 100000, encoding='utf-8')),
+    'WriteAllBytes': (lambda p, d: File.WriteAllBytes(_scratch(d), b'x' * 100000),
+                      lambda p, d: Path(_scratch(d)).write_bytes(b'x' * 100000)),
+}
+
+
+def _count_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return sum(1 for _ in f)
+
+
+def _baseline_read_csv(path):
+    with open(path, encoding='utf-8', newline='') as f:
+        return sum(1 for row in csv.DictReader(f) if row['id'].endswith('7') and float(row['value']) is not None)
+
+
+def _baseline_read_json_lines(path):
+    with open(path, encoding='utf-8') as f:
+        return sum(1 for x in map(json.loads, f) if x['value'] > 500 and {'name': x['name']})
+
+
+def _append(path, text):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(text)
+
+
+def _write_with_writer(path, count):
+    with File.OpenWriter(path) as writer:
+        for i in range(count):
+            writer.WriteLine(str(i))
+
+
+def _baseline_write_lines(path, count):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(str(i) + '\n')
+
+
+def _read_at(path, offset, length):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+def _count_records(path, record_size):
+    count = 0
+    with open(path, 'rb') as f:
+        while f.read(record_size):
+            count += 1
+    return count
+
+
+def missing_cases():
+    """
+    Returns the public List and File methods that have no benchmark case.
+    """
+
+    list_methods = {name for name in vars(List) if name[:1].isupper()} - NOT_BENCHMARKED
+    file_methods = {name for name in vars(File) if name[:1].isupper()}
+    return sorted((list_methods - set(LIST_CASES)) | (file_methods - set(FILE_CASES)))
+
+
+def measure(fun, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fun()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(sizes, cardinalities, repeat, cases=None, seed=0):
+    results = []
+    folder = tempfile.mkdtemp(prefix='python_linq_bench_')
+    try:
+        for size in sizes:
+            for cardinality in cardinalities:
+                for shape in SHAPES:
+                    data = make_dataset(shape, size, cardinality, seed, folder)
+                    for name, (shapes, linq, baseline) in LIST_CASES.items():
+                        if shape not in shapes or (cases and name not in cases):
+                            continue
+                        results.append(_result(name, shape, size, cardinality,
+                                               measure(lambda: linq(data), repeat),
+                                               measure(lambda: baseline(data), repeat)))
+            path = _write_lines(folder, size)
+            for name, (linq, baseline) in FILE_CASES.items():
+                if cases and name not in cases:
+                    continue
+                results.append(_result(name, 'file', size, None,
+                                       measure(lambda: linq(path, folder), repeat),
+                                       measure(lambda: baseline(path, folder), repeat)))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def _result(name, shape, size, cardinality, linq_seconds, baseline_seconds):
+    result = {
+        'case': name,
+        'shape': shape,
+        'size': size,
+        'cardinality': cardinality,
+        'linq': linq_seconds,
+        'baseline': baseline_seconds,
+        'ratio': linq_seconds / baseline_seconds if baseline_seconds else None,
+    }
+    print('{case:<20} {shape:<8} n={size:<10} k={cardinality!s:<8} linq={linq:.6f}s baseline={baseline:.6f}s'
+          .format(**result), file=sys.stderr)
+    return result
+
+
+def _identity(result):
+    return result['case'], result['shape'], result['size'], result['cardinality']
+
+
+def compare(old_results, new_results, threshold):
+    """
+    Returns the cases whose linq time grew by more than threshold (0.2 means 20%) relative to the old results.
+    """
+
+    old = {_identity(r): r for r in old_results}
+    regressions = []
+    for result in new_results:
+        previous = old.get(_identity(result))
+        if previous and previous['linq'] and result['linq'] > previous['linq'] * (1 + threshold):
+            regressions.append(dict(result, previous=previous['linq'], change=result['linq'] / previous['linq'] - 1))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1e3,1e4,1e5',
+                        help='comma-separated data sizes, for example 1e3,1e4,1e5,1e6,1e7')
+    parser.add_argument('--cardinalities', default='10,1000',
+                        help='comma-separated numbers of distinct keys')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the fastest one is kept')
+    parser.add_argument('--cases', help='comma-separated case names to run (default: all)')
+    parser.add_argument('--output', help='file to save the results to as JSON')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown that counts as a regression')
+    args = parser.parse_args(argv)
+
+    missing = missing_cases()
+    if missing:
+        print('No benchmark for: ' + ', '.join(missing), file=sys.stderr)
+
+    sizes = [int(float(x)) for x in args.sizes.split(',')]
+    cardinalities = [int(float(x)) for x in args.cardinalities.split(',')]
+    cases = set(args.cases.split(',')) if args.cases else None
+    results = run(sizes, cardinalities, args.repeat, cases)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        regressions = compare(previous['results'], results, args.threshold)
+        for r in regressions:
+            print('REGRESSION {case} {shape} n={size} k={cardinality}: {previous:.6f}s -> {linq:.6f}s (+{change:.0%})'
+                  .format(**r))
+        if regressions:
+            return 1
+        print('No regressions above {:.0%}'.format(args.threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
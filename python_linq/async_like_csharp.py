@@ -0,0 +1,1250 @@
+# https://learn.microsoft.com/en-us/dotnet/csharp/asynchronous-programming/generate-consume-asynchronous-stream
+import asyncio
+from collections import deque
+
+from time import monotonic
+
+from python_linq.linq_like_csharp import (List, Lookup, _KeySet, _MANY, _NONE, _MaxAggregate, _MinAggregate,
+                                          _SumAggregate, _VarianceAggregate, _byte_size,
+                                          _group_by, _group_results, _hash_group, _hash_inner, _order,
+                                          _parse_aggregates, _positive)
+
+
+async def _from_iterable(iterable):
+    for x in iterable:
+        yield x
+
+
+def _aiter(iterable):
+    if hasattr(iterable, '__aiter__'):
+        return iterable.__aiter__()
+    return _from_iterable(iterable)
+
+
+async def _to_list(iterable):
+    return [x async for x in _aiter(iterable)]
+
+
+class _AsyncDeferred:
+    __slots__ = ('_generator', '_args')
+
+    def __init__(self, generator, args):
+        self._generator = generator
+        self._args = args
+
+    def __aiter__(self):
+        return self._generator(*self._args)
+
+
+async def _select(source, fun):
+    async for x in source:
+        yield fun(x)
+
+
+async def _select_many(source, fun_selector):
+    async for n in source:
+        for x in n:
+            yield x if fun_selector is None else fun_selector(x)
+
+
+async def _where(source, fun):
+    async for x in source:
+        if fun(x):
+            yield x
+
+
+async def _take(source, count_of_elements):
+    if count_of_elements <= 0:
+        return
+    taken = 0
+    async for x in source:
+        yield x
+        taken += 1
+        if taken >= count_of_elements:
+            return
+
+
+async def _skip(source, count_of_elements):
+    skipped = 0
+    async for x in source:
+        if skipped < count_of_elements:
+            skipped += 1
+        else:
+            yield x
+
+
+async def _take_while(source, fun):
+    async for x in source:
+        if not fun(x):
+            return
+        yield x
+
+
+async def _skip_while(source, fun):
+    skipping = True
+    async for x in source:
+        if skipping and fun(x):
+            continue
+        skipping = False
+        yield x
+
+
+async def _distinct(source, fun_key_selector):
+    seen = _KeySet()
+    async for x in source:
+        if seen.add(x if fun_key_selector is None else fun_key_selector(x)):
+            yield x
+
+
+async def _concat(source, input_list):
+    async for x in source:
+        yield x
+    async for x in _aiter(input_list):
+        yield x
+
+
+async def _group(source, fun_key_selector, fun_element_selector, fun_result_selector):
+    for group in _group_by(await _to_list(source), fun_key_selector, fun_element_selector, fun_result_selector):
+        yield group
+
+
+async def _join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+    lookup = _hash_inner(await _to_list(inner_list), fun_inner_key_selector)
+    async for n in source:
+        for o in lookup.get(fun_outher_key_selector(n), ()):
+            yield result_selector(n, o)
+
+
+async def _group_join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+    lookup = _hash_inner(await _to_list(inner_list), fun_inner_key_selector)
+    async for n in source:
+        yield result_selector(n, List(lookup.get(fun_outher_key_selector(n), ())))
+
+
+async def _left_join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                     default_value):
+    lookup = _hash_inner(await _to_list(inner_list), fun_inner_key_selector)
+    async for n in source:
+        matches = lookup.get(fun_outher_key_selector(n))
+        if matches is None:
+            yield result_selector(n, default_value)
+        else:
+            for o in matches:
+                yield result_selector(n, o)
+
+
+async def _group_aggregate(source, fun_key_selector, aggregates):
+    parsed = _parse_aggregates(aggregates)
+    groups = {}
+    async for x in source:
+        key = fun_key_selector(x)
+        states = groups.get(key)
+        if states is None:
+            states = groups[key] = [aggregate() for _, aggregate, _ in parsed]
+        for state, (_, _, selector) in zip(states, parsed):
+            state.add(x if selector is None else selector(x))
+    for group in _group_results(groups, parsed):
+        yield group
+
+
+async def _reversed(source):
+    for x in reversed(await _to_list(source)):
+        yield x
+
+
+async def _chunk(source, size):
+    chunk = List()
+    async for x in source:
+        chunk.append(x)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = List()
+    if chunk:
+        yield chunk
+
+
+async def _batch(source, size, max_bytes, max_wait):
+    batch = List()
+    batch_bytes = 0
+    started = 0.0
+    async for x in source:
+        x_bytes = 0 if max_bytes is None else _byte_size(x)
+        if batch and ((max_bytes is not None and batch_bytes + x_bytes > max_bytes)
+                      or (max_wait is not None and monotonic() - started >= max_wait)):
+            yield batch
+            batch = List()
+            batch_bytes = 0
+        if not batch and max_wait is not None:
+            started = monotonic()
+        batch.append(x)
+        batch_bytes += x_bytes
+        if len(batch) >= size:
+            yield batch
+            batch = List()
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+async def _except(source, input_list, fun_key_selector):
+    second = await _to_list(input_list)
+    excluded = _KeySet(second if fun_key_selector is None else map(fun_key_selector, second))
+    async for x in source:
+        if (x if fun_key_selector is None else fun_key_selector(x)) not in excluded:
+            yield x
+
+
+async def _intersect(source, input_list, fun_key_selector):
+    second = await _to_list(input_list)
+    included = _KeySet(second if fun_key_selector is None else map(fun_key_selector, second))
+    seen = _KeySet()
+    async for x in source:
+        key = x if fun_key_selector is None else fun_key_selector(x)
+        if key in included and seen.add(key):
+            yield x
+
+
+async def _union(source, second_list, fun_key_selector):
+    async for x in _distinct(_concat(source, second_list), fun_key_selector):
+        yield x
+
+
+async def _zip(source, second_list, fun_result_selector):
+    second = _aiter(second_list)
+    async for x in source:
+        try:
+            y = await second.__anext__()
+        except StopAsyncIteration:
+            return
+        yield fun_result_selector(x, y)
+
+
+async def _ordered(source, orderings):
+    for x in _order(await _to_list(source), orderings):
+        yield x
+
+
+async def _map_concurrent(source, coro_fn, max_concurrency, ordered):
+    """
+    Awaits coro_fn(x) for the elements of source with at most max_concurrency calls in flight and yields
+    (element, result) pairs, either in source order or in completion order.
+    """
+
+    pending = deque() if ordered else set()
+    try:
+        async for x in source:
+            if len(pending) >= max_concurrency:
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            task = asyncio.ensure_future(_pair(x, coro_fn))
+            if ordered:
+                pending.append(task)
+            else:
+                pending.add(task)
+        if ordered:
+            while pending:
+                yield await pending.popleft()
+        else:
+            for task in asyncio.as_completed(pending):
+                yield await task
+            pending = set()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _pair(x, coro_fn):
+    return x, await coro_fn(x)
+
+
+async def _select_async(source, coro_fn, max_concurrency, ordered):
+    async for _, result in _map_concurrent(source, coro_fn, max_concurrency, ordered):
+        yield result
+
+
+async def _where_async(source, coro_fn, max_concurrency, ordered):
+    async for x, result in _map_concurrent(source, coro_fn, max_concurrency, ordered):
+        if result:
+            yield x
+
+
+class AsyncEnumerable:
+    """
+    A lazily evaluated asynchronous sequence with the methods of List.
+
+    The sequence can be consumed with `async for`; terminal methods (ToList, First, Count, ...) are coroutines.
+    SelectAsync and WhereAsync await a coroutine function for each element with bounded concurrency,
+    so the latency of I/O-bound calls overlaps instead of adding up.
+    Streaming operators and reductions (Count, Sum, Average, Min, Max, Aggregate, AggregateMany, Stats, Last,
+    Single, ...) keep constant memory, and GroupAggregate keeps one set of aggregate states per group.
+    GroupBy, OrderBy, Reverse and ToLookup consume the whole sequence first, and Join, GroupJoin, LeftJoin,
+    Except and Intersect consume their second sequence first.
+
+    The methods of List that mutate or index a list (Add, Remove, CreateIndex, ...), convert it to another
+    storage (AsNumeric, ToColumnar) or choose how it runs (AsParallel, Memoize, Share, Cached, WithProfiling)
+    are deliberately left out; call ToList() first to use them.
+
+    Example:
+    # >>> async def fetch(x):
+    # ...     await asyncio.sleep(0.1)
+    # ...     return x * 2
+    # >>> await AsyncEnumerable.From(range(100)).SelectAsync(fetch, max_concurrency=20).Where(lambda x: x > 10).ToList()
+    [12, 14, ...]
+    """
+
+    def __init__(self, iterable=()):
+        self._iterable = iterable
+
+    def __aiter__(self):
+        return _aiter(self._iterable)
+
+    @staticmethod
+    def From(iterable):
+        """
+        Creates an asynchronous sequence over a synchronous or asynchronous iterable.
+
+        Args:
+        - iterable: The source of the elements.
+
+        Returns:
+        - AsyncEnumerable: The asynchronous sequence.
+        """
+
+        return AsyncEnumerable(iterable)
+
+    def _defer(self, generator, *args):
+        return AsyncEnumerable(_AsyncDeferred(generator, (self,) + args))
+
+    def Select(self, fun):
+        """
+        Lazily applies the specified function to each element of the sequence.
+
+        Args:
+        - fun: The function that specifies the projection to be applied to each element.
+
+        Returns:
+        - AsyncEnumerable: The projected sequence.
+        """
+
+        return self._defer(_select, fun)
+
+    def SelectAsync(self, coro_fn, max_concurrency=1, ordered=True):
+        """
+        Lazily applies a coroutine function to each element, with up to max_concurrency calls running at once.
+
+        Args:
+        - coro_fn: The coroutine function that specifies the projection.
+        - max_concurrency (int): The maximum number of calls in flight.
+        - ordered (bool): If True, results keep the order of the source; if False, they are yielded
+        in the order in which the calls complete.
+
+        Returns:
+        - AsyncEnumerable: The projected sequence.
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        return self._defer(_select_async, coro_fn, max_concurrency, ordered)
+
+    def SelectMany(self, fun_selector=None):
+        """
+        Lazily flattens the sequence, optionally projecting each inner element.
+
+        Args:
+        - fun_selector: The function applied to each inner element. If None, the elements are flattened as is.
+
+        Returns:
+        - AsyncEnumerable: The flattened sequence.
+        """
+
+        return self._defer(_select_many, fun_selector)
+
+    def Where(self, fun):
+        """
+        Lazily filters the sequence.
+
+        Args:
+        - fun: The function that specifies the condition for the sampling filter.
+
+        Returns:
+        - AsyncEnumerable: The elements that satisfy the condition.
+        """
+
+        return self._defer(_where, fun)
+
+    def WhereAsync(self, coro_fn, max_concurrency=1, ordered=True):
+        """
+        Lazily filters the sequence with a coroutine predicate, with up to max_concurrency calls running at once.
+
+        Args:
+        - coro_fn: The coroutine function that specifies the condition for the sampling filter.
+        - max_concurrency (int): The maximum number of calls in flight.
+        - ordered (bool): If True, elements keep the order of the source; if False, they are yielded
+        in the order in which the calls complete.
+
+        Returns:
+        - AsyncEnumerable: The elements that satisfy the condition.
+        """
+
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        return self._defer(_where_async, coro_fn, max_concurrency, ordered)
+
+    def GroupBy(self, fun_key_selector, fun_element_selector=None, fun_result_selector=None):
+        """
+        Groups the elements by key. The whole sequence is consumed before the first group is yielded.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the elements.
+        - fun_element_selector: The function that maps each element before it is put into its group.
+        - fun_result_selector: The function that receives the key and the List of values of a group
+        and produces the result for that group.
+
+        Returns:
+        - AsyncEnumerable: The groups, as dictionaries with 'key' and 'values' fields
+        (or the results of fun_result_selector), in the order in which their keys first occur.
+        """
+
+        return self._defer(_group, fun_key_selector, fun_element_selector, fun_result_selector)
+
+    def Join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+        """
+        Lazily joins the sequence with a (synchronous or asynchronous) inner sequence on matching keys.
+        The inner sequence is consumed into a hash table first; this sequence is then streamed.
+
+        Args:
+        - inner_list: The sequence to join with.
+        - fun_outher_key_selector: The function that selects the key of an element of this sequence.
+        - fun_inner_key_selector: The function that selects the key of an element of the inner sequence.
+        - result_selector: The function that creates a result from an element and a matching inner element.
+
+        Returns:
+        - AsyncEnumerable: The results for every pair of elements with equal keys.
+        """
+
+        return self._defer(_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector)
+
+    def GroupJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+        """
+        Lazily correlates each element with the List of matching elements of a (synchronous or asynchronous)
+        inner sequence. The inner sequence is consumed into a hash table first; this sequence is then streamed.
+
+        Args:
+        - inner_list: The sequence to join with.
+        - fun_outher_key_selector: The function that selects the key of an element of this sequence.
+        - fun_inner_key_selector: The function that selects the key of an element of the inner sequence.
+        - result_selector: The function that receives an element and the List of its matching inner elements.
+
+        Returns:
+        - AsyncEnumerable: One result per element of this sequence.
+        """
+
+        return self._defer(_group_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector)
+
+    def LeftJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                 default_value=None):
+        """
+        Lazily joins the sequence with a (synchronous or asynchronous) inner sequence, keeping the elements
+        without a match. The inner sequence is consumed into a hash table first; this sequence is then streamed.
+
+        Args:
+        - inner_list: The sequence to join with.
+        - fun_outher_key_selector: The function that selects the key of an element of this sequence.
+        - fun_inner_key_selector: The function that selects the key of an element of the inner sequence.
+        - result_selector: The function that creates a result from an element and a matching inner element.
+        - default_value: The inner element passed to result_selector for elements without a match.
+
+        Returns:
+        - AsyncEnumerable: The results for every matching pair, and for every element without a match.
+        """
+
+        return self._defer(_left_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                           default_value)
+
+    def GroupAggregate(self, fun_key_selector, aggregates):
+        """
+        Groups the elements by key and computes aggregates per group in a single pass, keeping only
+        the aggregate states of each group instead of its elements.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the elements.
+        - aggregates (dict): Maps a result field name to 'count', 'sum', 'min', 'max', 'average', 'variance'
+        or to a (name, selector) pair, as in List.GroupAggregate.
+
+        Returns:
+        - AsyncEnumerable: One dictionary per group with the 'key' field and one field per aggregate.
+        """
+
+        return self._defer(_group_aggregate, fun_key_selector, aggregates)
+
+    def Except(self, input_list):
+        """
+        Lazily returns the elements that are not in a second (synchronous or asynchronous) sequence.
+
+        Args:
+        - input_list: The elements to exclude.
+
+        Returns:
+        - AsyncEnumerable: The remaining elements.
+        """
+
+        return self._defer(_except, input_list, None)
+
+    def ExceptBy(self, input_list, fun_key_selector):
+        """
+        Lazily returns the elements whose keys are not the key of any element of a second sequence.
+
+        Args:
+        - input_list: The elements whose keys are excluded.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - AsyncEnumerable: The remaining elements.
+        """
+
+        return self._defer(_except, input_list, fun_key_selector)
+
+    def Intersect(self, input_list):
+        """
+        Lazily returns the distinct elements that are also in a second (synchronous or asynchronous) sequence.
+
+        Args:
+        - input_list: The second sequence.
+
+        Returns:
+        - AsyncEnumerable: The common elements.
+        """
+
+        return self._defer(_intersect, input_list, None)
+
+    def IntersectBy(self, input_list, fun_key_selector):
+        """
+        Lazily returns the first element for each distinct key that is also the key of an element of a second sequence.
+
+        Args:
+        - input_list: The second sequence.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - AsyncEnumerable: The elements with common keys.
+        """
+
+        return self._defer(_intersect, input_list, fun_key_selector)
+
+    def Union(self, second_list):
+        """
+        Lazily returns the distinct elements of this sequence and then of a second one.
+
+        Args:
+        - second_list: The second (synchronous or asynchronous) sequence.
+
+        Returns:
+        - AsyncEnumerable: The distinct elements of both sequences.
+        """
+
+        return self._defer(_union, second_list, None)
+
+    def UnionBy(self, second_list, fun_key_selector):
+        """
+        Lazily returns the first element for each distinct key of this sequence and then of a second one.
+
+        Args:
+        - second_list: The second (synchronous or asynchronous) sequence.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - AsyncEnumerable: The elements with distinct keys.
+        """
+
+        return self._defer(_union, second_list, fun_key_selector)
+
+    def Zip(self, second_list, fun_result_selector):
+        """
+        Lazily combines the elements of this sequence and a second one pairwise; stops at the end of the shorter.
+
+        Args:
+        - second_list: The second (synchronous or asynchronous) sequence.
+        - fun_result_selector: The function that creates a result from a pair of elements.
+
+        Returns:
+        - AsyncEnumerable: The combined elements.
+        """
+
+        return self._defer(_zip, second_list, fun_result_selector)
+
+    def OrderBy(self, fun=None):
+        """
+        Arranges elements in ascending order. The whole sequence is consumed and sorted when it is enumerated.
+
+        Args:
+        - fun: The function used to specify the sorting order.
+
+        Returns:
+        - AsyncOrderedEnumerable: The sorted sequence.
+        """
+
+        return AsyncOrderedEnumerable(self, ((fun, False),))
+
+    def OrderByDescending(self, fun=None):
+        """
+        Arranges elements in descending order. The whole sequence is consumed and sorted when it is enumerated.
+
+        Args:
+        - fun: The function used to specify the sorting order.
+
+        Returns:
+        - AsyncOrderedEnumerable: The sorted sequence.
+        """
+
+        return AsyncOrderedEnumerable(self, ((fun, True),))
+
+    def Take(self, count_of_elements):
+        """
+        Lazily selects a certain number of elements from the beginning of the sequence.
+
+        Args:
+        - count_of_elements (int): The number of elements to select.
+
+        Returns:
+        - AsyncEnumerable: The first elements of the sequence.
+        """
+
+        return self._defer(_take, count_of_elements)
+
+    def Skip(self, count_of_elements):
+        """
+        Lazily skips a certain number of elements from the beginning of the sequence.
+
+        Args:
+        - count_of_elements (int): The number of elements to skip.
+
+        Returns:
+        - AsyncEnumerable: The remaining elements.
+        """
+
+        return self._defer(_skip, count_of_elements)
+
+    def TakeWhile(self, fun):
+        """
+        Lazily returns elements as long as the condition is true.
+
+        Args:
+        - fun: The condition function used to determine whether to include an element.
+
+        Returns:
+        - AsyncEnumerable: The leading elements that satisfy the condition.
+        """
+
+        return self._defer(_take_while, fun)
+
+    def SkipWhile(self, fun):
+        """
+        Lazily skips elements as long as the condition is true and returns the rest.
+
+        Args:
+        - fun: The condition function used to determine whether to skip an element.
+
+        Returns:
+        - AsyncEnumerable: The remaining elements.
+        """
+
+        return self._defer(_skip_while, fun)
+
+    def Distinct(self):
+        """
+        Lazily returns the distinct elements of the sequence in the order of their first occurrence.
+
+        Returns:
+        - AsyncEnumerable: The distinct elements.
+        """
+
+        return self._defer(_distinct, None)
+
+    def DistinctBy(self, fun_key_selector):
+        """
+        Lazily returns the first element of the sequence for each distinct key.
+
+        Args:
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - AsyncEnumerable: The first element for each distinct key.
+        """
+
+        return self._defer(_distinct, fun_key_selector)
+
+    def Concat(self, input_list):
+        """
+        Lazily appends a second (synchronous or asynchronous) sequence to this one.
+
+        Args:
+        - input_list: The sequence to be appended.
+
+        Returns:
+        - AsyncEnumerable: The elements of both sequences.
+        """
+
+        return self._defer(_concat, input_list)
+
+    def Reverse(self):
+        """
+        Returns the elements in reverse order. The whole sequence is consumed first.
+
+        Returns:
+        - AsyncEnumerable: The reversed sequence.
+        """
+
+        return self._defer(_reversed)
+
+    def Chunk(self, size):
+        """
+        Lazily splits the sequence into Lists of a fixed size; the last one may be shorter.
+
+        Args:
+        - size (int): The number of elements in a chunk.
+
+        Returns:
+        - AsyncEnumerable: A sequence of Lists.
+        """
+
+        return self._defer(_chunk, _positive(size))
+
+    def Batch(self, size, max_bytes=None, max_wait=None):
+        """
+        Lazily groups the elements into Lists bounded by a number of elements, a size in bytes and a time, as
+        List.Batch does. The time is checked when an element arrives, so a batch is yielded once the element
+        after max_wait seconds arrives.
+
+        Args:
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch, counted as len() for strings and bytes
+        and as sys.getsizeof() for other elements.
+        - max_wait (float): The maximum number of seconds between the first element of a batch and the element
+        that closes it.
+
+        Returns:
+        - AsyncEnumerable: A sequence of Lists.
+        """
+
+        return self._defer(_batch, _positive(size), max_bytes, max_wait)
+
+    async def Any(self, fun=None):
+        """
+        Determines whether any element satisfies the condition. Stops at the first match.
+
+        Args:
+        - fun: The function that specifies the condition to be satisfied.
+        If None, checks whether the sequence contains any elements.
+
+        Returns:
+        True if at least one element satisfies the condition, otherwise False.
+        """
+
+        return await self._first(fun) is not _NONE
+
+    async def All(self, fun):
+        """
+        Determines whether all elements satisfy the condition. Stops at the first mismatch.
+
+        Args:
+        - fun: The function that specifies the condition to be satisfied.
+
+        Returns:
+        True if the condition is satisfied for all elements, otherwise False.
+        """
+
+        async for x in self:
+            if not fun(x):
+                return False
+        return True
+
+    async def Contains(self, element):
+        """
+        Determines whether the sequence contains a specific element. Stops at the first match.
+
+        Args:
+        - element: The element to look for.
+
+        Returns:
+        True if the element is present in the sequence, otherwise False.
+        """
+
+        return await self.Any(lambda x: x == element)
+
+    async def Count(self, fun=None):
+        """
+        Counts the elements of the sequence that satisfy a condition.
+
+        Args:
+        - fun: The condition function used to determine which elements to count.
+
+        Returns:
+        - int: The number of elements that satisfy the condition.
+        """
+
+        count = 0
+        async for x in self:
+            if fun is None or fun(x):
+                count += 1
+        return count
+
+    async def Sum(self, selector=None):
+        """
+        Calculates the sum of the numeric values in the sequence.
+
+        Args:
+        - selector: The function that selects the value to sum from each element.
+
+        Returns:
+        - The sum of the values.
+        """
+
+        total = 0
+        async for x in self:
+            total += x if selector is None else selector(x)
+        return total
+
+    async def Average(self, selector=None):
+        """
+        Calculates the average of the numeric values in the sequence in a single pass.
+
+        Args:
+        - selector: The function that selects the value to average from each element.
+
+        Returns:
+        - The average of the values.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        total = 0
+        count = 0
+        async for x in self:
+            total += x if selector is None else selector(x)
+            count += 1
+        if count == 0:
+            raise ValueError("Sequence contains no elements")
+        return total / float(count)
+
+    async def _extreme(self, fun, selector, better):
+        found = _NONE
+        best_key = None
+        async for x in self:
+            if selector is not None:
+                x = selector(x)
+            key = x if fun is None else fun(x)
+            if found is _NONE or better(key, best_key):
+                found = x
+                best_key = key
+        if found is _NONE:
+            raise ValueError("Sequence contains no elements")
+        return found
+
+    async def Min(self, fun=None, selector=None):
+        """
+        Finds the minimum value in the sequence in a single pass, without buffering it.
+
+        Args:
+        - fun: If provided, the element with the smallest fun(element) is returned (the same as MinBy).
+        - selector: If provided, the smallest selector(element) value is returned.
+
+        Returns:
+        - The minimum value.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        return await self._extreme(fun, selector, lambda key, best: key < best)
+
+    async def Max(self, fun=None, selector=None):
+        """
+        Finds the maximum value in the sequence in a single pass, without buffering it.
+
+        Args:
+        - fun: If provided, the element with the greatest fun(element) is returned (the same as MaxBy).
+        - selector: If provided, the greatest selector(element) value is returned.
+
+        Returns:
+        - The maximum value.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        return await self._extreme(fun, selector, lambda key, best: key > best)
+
+    async def MinBy(self, fun_key_selector):
+        """
+        Returns the element with the smallest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the smallest key.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        return await self.Min(fun_key_selector)
+
+    async def MaxBy(self, fun_key_selector):
+        """
+        Returns the element with the greatest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the greatest key.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        return await self.Max(fun_key_selector)
+
+    async def Stats(self, selector=None):
+        """
+        Computes the count, sum, minimum, maximum, average and variances of the values in a single pass.
+
+        Args:
+        - selector: The function that selects the value from each element.
+
+        Returns:
+        - dict: The fields 'count', 'sum', 'min', 'max', 'average', 'variance' (population variance)
+        and 'sample_variance'; the statistics that are undefined for the number of values are None.
+        """
+
+        states = (_SumAggregate(), _MinAggregate(), _MaxAggregate(), _VarianceAggregate())
+        async for x in self:
+            if selector is not None:
+                x = selector(x)
+            for state in states:
+                state.add(x)
+        total, low, high, variance = states
+        count = variance.count
+        return {
+            'count': count,
+            'sum': total.result(),
+            'min': low.result(),
+            'max': high.result(),
+            'average': total.result() / float(count) if count else None,
+            'variance': variance.result(),
+            'sample_variance': variance.m2 / (count - 1) if count > 1 else None,
+        }
+
+    async def AggregateMany(self, aggregates):
+        """
+        Computes several aggregates in a single pass over the sequence.
+
+        Args:
+        - aggregates (dict): Maps a result field name to one of 'count', 'sum', 'min', 'max', 'average', 'variance',
+        or to a (name, selector) pair, as in List.AggregateMany.
+
+        Returns:
+        - dict: One field per aggregate.
+        """
+
+        parsed = _parse_aggregates(aggregates)
+        states = [aggregate() for _, aggregate, _ in parsed]
+        async for x in self:
+            for state, (_, _, selector) in zip(states, parsed):
+                state.add(x if selector is None else selector(x))
+        return {name: state.result() for (name, _, _), state in zip(parsed, states)}
+
+    async def Aggregate(self, seed, func, result_selector=None):
+        """
+        Applies an accumulator function over the sequence.
+
+        Args:
+        - seed: The initial accumulator value.
+        - func: The function that receives the accumulator and an element and returns the new accumulator.
+        - result_selector: The function that transforms the final accumulator into the result.
+
+        Returns:
+        The final accumulator value, transformed by result_selector if it is provided.
+        """
+
+        accumulator = seed
+        async for x in self:
+            accumulator = func(accumulator, x)
+        return accumulator if result_selector is None else result_selector(accumulator)
+
+    async def _first(self, fun):
+        async for x in self:
+            if fun is None or fun(x):
+                return x
+        return _NONE
+
+    async def First(self, fun=None):
+        """
+        Returns the first element of the sequence, or the first element that satisfies a condition.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sequence.
+
+        Raises:
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        found = await self._first(fun)
+        if found is _NONE:
+            raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+        return found
+
+    async def FirstOrDefault(self, default_value, fun=None):
+        """
+        Returns the first element of the sequence (or the first element that satisfies a condition)
+        or the default value if there is no such element.
+
+        Args:
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sequence, or the default value.
+        """
+
+        found = await self._first(fun)
+        return default_value if found is _NONE else found
+
+    async def ElementAt(self, element_index):
+        """
+        Returns the element at a specific index. The sequence is read up to that index only.
+
+        Args:
+        - element_index (int): The index of the element to select.
+
+        Returns:
+        - The element at the specified index.
+
+        Raises:
+        - IndexError: If the index is out of range.
+        """
+
+        found = await self._element_at(element_index)
+        if found is _NONE:
+            raise IndexError("Index was out of range")
+        return found
+
+    async def ElementAtOrDefault(self, element_index, default_value):
+        """
+        Returns the element at a specific index or the default value if the index is out of range.
+
+        Args:
+        - element_index (int): The index of the element to select.
+        - default_value: The default value to return if the index is out of range.
+
+        Returns:
+        - The element at the specified index, or the default value.
+        """
+
+        found = await self._element_at(element_index)
+        return default_value if found is _NONE else found
+
+    async def _element_at(self, element_index):
+        if element_index >= 0:
+            index = 0
+            async for x in self:
+                if index == element_index:
+                    return x
+                index += 1
+        return _NONE
+
+    async def _last(self, fun):
+        found = _NONE
+        async for x in self:
+            if fun is None or fun(x):
+                found = x
+        return found
+
+    async def Last(self, fun=None):
+        """
+        Returns the last element of the sequence, or the last element that satisfies a condition.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The last matching element of the sequence.
+
+        Raises:
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        found = await self._last(fun)
+        if found is _NONE:
+            raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+        return found
+
+    async def LastOrDefault(self, default_value, fun=None):
+        """
+        Returns the last element of the sequence (or the last element that satisfies a condition)
+        or the default value if there is no such element.
+
+        Args:
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The last matching element of the sequence, or the default value.
+        """
+
+        found = await self._last(fun)
+        return default_value if found is _NONE else found
+
+    async def _single(self, fun):
+        found = _NONE
+        async for x in self:
+            if fun is None or fun(x):
+                if found is not _NONE:
+                    return _MANY
+                found = x
+        return found
+
+    async def Single(self, fun=None):
+        """
+        Returns the only element of the sequence, or the only element that satisfies a condition.
+        The scan stops as soon as a second matching element is found.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        The single matching element from the sequence.
+
+        Raises:
+        - Exception: If the sequence contains more than one matching element.
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        found = await self._single(fun)
+        if found is _MANY:
+            raise Exception("Sequence contains more than one element")
+        if found is _NONE:
+            raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+        return found
+
+    async def SingleOrDefault(self, default_value, fun=None):
+        """
+        Returns the only element of the sequence (or the only element that satisfies a condition),
+        or the default value if the sequence does not contain exactly one such element.
+
+        Args:
+        - default_value: The value to be returned if the sequence does not contain exactly one matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        The single matching element of the sequence or the default value.
+        """
+
+        found = await self._single(fun)
+        return default_value if found is _NONE or found is _MANY else found
+
+    async def ForEach(self, fun):
+        """
+        Applies a function to each element of the sequence.
+
+        Args:
+        - fun: The function to be applied to each element.
+        """
+
+        async for n in self:
+            fun(n)
+
+    async def ForEachBatch(self, fun, size=1000, max_bytes=None, max_wait=None):
+        """
+        Applies a function to batches of elements, for example to insert or write them in bulk.
+
+        Args:
+        - fun: The function to be applied to each batch (a List).
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch (see Batch).
+        - max_wait (float): The maximum number of seconds a batch is kept open (see Batch).
+        """
+
+        async for batch in _batch(self, _positive(size), max_bytes, max_wait):
+            fun(batch)
+
+    async def ToLookup(self, fun_key_selector, fun_element_selector=None):
+        """
+        Consumes the sequence into an index of its elements by key.
+
+        Args:
+        - fun_key_selector: The function that selects the key of each element.
+        - fun_element_selector: The function that maps each element before it is stored.
+
+        Returns:
+        - Lookup: The index of the elements by key.
+        """
+
+        return Lookup(_hash_group(await self.ToPythonList(), fun_key_selector, fun_element_selector))
+
+    async def ToList(self):
+        """
+        Consumes the sequence and stores the result in a List.
+
+        Returns:
+        - List: The elements of the sequence.
+        """
+
+        return List(await self.ToPythonList())
+
+    async def ToPythonList(self):
+        """
+        Consumes the sequence and stores the result in a standard Python list.
+
+        Returns:
+        - list: The elements of the sequence.
+        """
+
+        return [x async for x in self]
+
+
+class AsyncOrderedEnumerable(AsyncEnumerable):
+    """
+    An asynchronous sequence sorted by OrderBy or OrderByDescending. The source is consumed and sorted when
+    the sequence is enumerated; ThenBy and ThenByDescending add secondary sort keys. The sort is stable.
+    """
+
+    def __init__(self, source, orderings):
+        super().__init__(_AsyncDeferred(_ordered, (source, orderings)))
+        self._source = source
+        self._orderings = orderings
+
+    def ThenBy(self, fun=None):
+        """
+        Adds a secondary sort key in ascending order.
+
+        Args:
+        - fun: The function used to specify the sorting order among elements with equal previous keys.
+
+        Returns:
+        - AsyncOrderedEnumerable: The sequence sorted by all the keys.
+        """
+
+        return AsyncOrderedEnumerable(self._source, self._orderings + ((fun, False),))
+
+    def ThenByDescending(self, fun=None):
+        """
+        Adds a secondary sort key in descending order.
+
+        Args:
+        - fun: The function used to specify the sorting order among elements with equal previous keys.
+
+        Returns:
+        - AsyncOrderedEnumerable: The sequence sorted by all the keys.
+        """
+
+        return AsyncOrderedEnumerable(self._source, self._orderings + ((fun, True),))
@@ -0,0 +1,159 @@
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+from python_linq.linq_like_csharp import List
+
+
+def _size_of(values):
+    """
+    Estimates the memory used by a result: the list itself plus the shallow size of each element.
+    """
+
+    return sys.getsizeof(values) + sum(sys.getsizeof(x) for x in values)
+
+
+class QueryCache:
+    """
+    A thread-safe cache of query results with least-recently-used eviction, bounded both by the number of
+    entries and by the estimated size of the results. Used by Enumerable.Cached(); DEFAULT_CACHE is the
+    process-wide instance. Keys are any hashable values; Cached() derives them from the pipeline, identifying
+    functions by their code and the values they capture rather than by identity, so that queries written
+    with inline lambdas share an entry.
+
+    Example:
+    # >>> cache = QueryCache(max_entries=16, max_bytes=10 * 1024 * 1024)
+    # >>> File.ReadLines("events.log").Where(is_error).Cached(cache=cache).Count()
+    # >>> cache.Statistics()
+    {'entries': 1, 'bytes': 5120, 'hits': 0, 'misses': 1}
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def Get(self, key, default_value=None):
+        """
+        Returns a cached result and marks it as recently used.
+
+        Args:
+        - key: The key of the result.
+        - default_value: The value returned if the key is not cached.
+
+        Returns:
+        The cached result, or default_value.
+        """
+
+        with self._lock:
+            try:
+                values, size = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default_value
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return values
+
+    def Set(self, key, values):
+        """
+        Stores a result, evicting the least recently used results until the bounds are met.
+        A result larger than max_bytes is not stored.
+
+        Args:
+        - key: The key of the result.
+        - values (list): The result.
+        """
+
+        size = _size_of(values)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (values, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def GetOrAdd(self, key, fun_factory):
+        """
+        Returns a cached result, or computes, stores and returns it if the key is not cached.
+        The factory runs outside the lock, so a slow query does not block other lookups.
+
+        Args:
+        - key: The key of the result.
+        - fun_factory: The function that computes the result.
+
+        Returns:
+        - list: The result.
+        """
+
+        values = self.Get(key, _MISSING)
+        if values is _MISSING:
+            values = fun_factory()
+            self.Set(key, values)
+        return values
+
+    def Remove(self, key):
+        """
+        Removes a result from the cache.
+
+        Args:
+        - key: The key of the result.
+        """
+
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def Clear(self):
+        """
+        Removes all results and resets the statistics.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def Statistics(self):
+        """
+        Returns the state of the cache.
+
+        Returns:
+        - dict: The number of 'entries', their estimated size in 'bytes', and the number of 'hits' and 'misses'.
+        """
+
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self._hits, 'misses': self._misses}
+
+    def Keys(self):
+        """
+        Returns the keys of the cached results, from the least to the most recently used.
+
+        Returns:
+        - List: The keys.
+        """
+
+        with self._lock:
+            return List(self._entries)
+
+
+_MISSING = object()
+
+DEFAULT_CACHE = QueryCache()
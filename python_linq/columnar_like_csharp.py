@@ -0,0 +1,407 @@
+from itertools import compress
+
+from python_linq.linq_like_csharp import List, Enumerable, _parse_aggregates
+from python_linq.numeric_like_csharp import _operator
+
+
+class RecordList:
+    """
+    A list of records (dictionaries) stored column-wise: one list of values per field.
+    Created by List.ToColumnar() or RecordList.FromRecords(records).
+
+    Field-based operators (Select("id"), Where("m", ">", 5), GroupBy("id"), Join(other, "id", "id"), Sum("m"), ...)
+    work on whole columns at a time, and the field names are stored once instead of in every record.
+    Records are turned back into dictionaries only on output (iteration, ToList).
+    Operators that take functions instead of field names, and List methods without a columnar
+    implementation, run on the dictionary rows.
+
+    Example:
+    # >>> records = List([{'id': 1, 'm': 6}, {'id': 5, 'm': 8}, {'id': 2, 'm': 7}]).ToColumnar()
+    # >>> records.Where('m', '>', 6).Select('id')
+    [5, 2]
+    """
+
+    def __init__(self, columns=None, length=None):
+        self._columns = dict(columns or {})
+        if length is None:
+            length = len(next(iter(self._columns.values()))) if self._columns else 0
+        self._length = length
+
+    @staticmethod
+    def FromRecords(records):
+        """
+        Converts a sequence of dictionaries to columns. Fields missing from a record are stored as None.
+
+        Args:
+        - records: The dictionaries to store.
+
+        Returns:
+        - RecordList: The records stored column-wise.
+        """
+
+        columns = {}
+        length = 0
+        for record in records:
+            for name in record:
+                if name not in columns:
+                    columns[name] = [None] * length
+            for name, values in columns.items():
+                values.append(record.get(name))
+            length += 1
+        return RecordList(columns, length)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        names = list(self._columns)
+        for values in zip(*self._columns.values()):
+            yield dict(zip(names, values))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordList({name: values[index] for name, values in self._columns.items()})
+        return {name: values[index] for name, values in self._columns.items()}
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getattr__(self, name):
+        # methods that have no columnar implementation fall back to a List of dictionaries
+        if name[:1].isupper() and hasattr(List, name):
+            return getattr(self.ToList(), name)
+        raise AttributeError(name)
+
+    def _column(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError("Unknown field '{}'".format(name))
+
+    def _present(self, field):
+        # missing fields are stored as None and, like NULL in SQL, are left out of aggregates
+        return [x for x in self._column(field) if x is not None]
+
+    def _mask(self, field, operator_name, value):
+        if callable(field):
+            return [bool(field(record)) for record in self]
+        compare = _operator(operator_name)
+        if value is None:
+            return [compare(x, value) for x in self._column(field)]
+        # missing fields are stored as None and, like NULL in SQL, do not satisfy any comparison with a value
+        return [x is not None and compare(x, value) for x in self._column(field)]
+
+    def _gather(self, indexes):
+        return RecordList({name: [values[i] for i in indexes] for name, values in self._columns.items()},
+                          len(indexes))
+
+    def Fields(self):
+        """
+        Returns the names of the fields.
+
+        Returns:
+        - List: The field names.
+        """
+
+        return List(self._columns)
+
+    def Column(self, name):
+        """
+        Returns the values of one field.
+
+        Args:
+        - name (str): The name of the field.
+
+        Returns:
+        - List: The values of the field.
+        """
+
+        return List(self._column(name))
+
+    def Select(self, *fields):
+        """
+        Projects the records. With one field name, returns the values of that field; with several field names,
+        returns the records restricted to those fields; with a function, applies it to each record.
+
+        Args:
+        - fields: One or more field names, or a single function that receives a record.
+
+        Returns:
+        - List: The values of a single field or the results of the function.
+        - RecordList: The records restricted to the given fields.
+
+        Example:
+        # >>> records.Select('id', 'm')
+        [{'id': 1, 'm': 6}, {'id': 5, 'm': 8}, {'id': 2, 'm': 7}]
+        """
+
+        if len(fields) == 1 and callable(fields[0]):
+            return List(fields[0](record) for record in self)
+        if len(fields) == 1:
+            return List(self._column(fields[0]))
+        return RecordList({name: self._column(name) for name in fields}, self._length)
+
+    def Where(self, field, operator_name=None, value=None):
+        """
+        Filters the records. The condition is either a comparison of a field with a value
+        ('<', '<=', '>', '>=', '==', '!='), evaluated on that column only, or a function that receives a record.
+        Missing values (None) never satisfy a comparison with a value, like NULL in SQL;
+        compare with None ('==', None or '!=', None) to select the records where the field is missing or present.
+
+        Args:
+        - field: The name of the field to compare, or the condition function.
+        - operator_name (str): The comparison operator.
+        - value: The value to compare the field with.
+
+        Returns:
+        - RecordList: The records that satisfy the condition.
+
+        Example:
+        # >>> records.Where('m', '>', 6).Count()
+        2
+        """
+
+        mask = self._mask(field, operator_name, value)
+        return RecordList({name: list(compress(values, mask)) for name, values in self._columns.items()},
+                          sum(mask))
+
+    def Count(self, field=None, operator_name=None, value=None):
+        """
+        Counts the records that satisfy a condition without building the filtered records.
+
+        Args:
+        - field: The name of the field to compare, or the condition function. If None, all records are counted.
+        - operator_name (str): The comparison operator.
+        - value: The value to compare the field with.
+
+        Returns:
+        - int: The number of records that satisfy the condition.
+        """
+
+        if field is None:
+            return self._length
+        return sum(self._mask(field, operator_name, value))
+
+    def Sum(self, field):
+        """
+        Calculates the sum of a field. Missing values (None) are skipped.
+
+        Args:
+        - field (str): The name of the field.
+
+        Returns:
+        - The sum of the values of the field.
+        """
+
+        return sum(self._present(field))
+
+    def Average(self, field):
+        """
+        Calculates the average of a field. Missing values (None) are skipped.
+
+        Args:
+        - field (str): The name of the field.
+
+        Returns:
+        - float: The average of the values of the field.
+
+        Raises:
+        - ValueError: If no record has a value for the field.
+        """
+
+        values = self._present(field)
+        if not values:
+            raise ValueError("Sequence contains no elements")
+        return sum(values) / float(len(values))
+
+    def Min(self, field):
+        """
+        Finds the minimum value of a field. Missing values (None) are skipped.
+
+        Args:
+        - field (str): The name of the field.
+
+        Returns:
+        - The minimum value of the field.
+
+        Raises:
+        - ValueError: If no record has a value for the field.
+        """
+
+        values = self._present(field)
+        if not values:
+            raise ValueError("Sequence contains no elements")
+        return min(values)
+
+    def Max(self, field):
+        """
+        Finds the maximum value of a field. Missing values (None) are skipped.
+
+        Args:
+        - field (str): The name of the field.
+
+        Returns:
+        - The maximum value of the field.
+
+        Raises:
+        - ValueError: If no record has a value for the field.
+        """
+
+        values = self._present(field)
+        if not values:
+            raise ValueError("Sequence contains no elements")
+        return max(values)
+
+    def Take(self, count_of_elements):
+        """
+        Selects a certain number of records from the beginning.
+
+        Args:
+        - count_of_elements (int): The number of records to select.
+
+        Returns:
+        - RecordList: The first records.
+        """
+
+        return self[:max(count_of_elements, 0)]
+
+    def Skip(self, count_of_elements):
+        """
+        Skips a certain number of records from the beginning.
+
+        Args:
+        - count_of_elements (int): The number of records to skip.
+
+        Returns:
+        - RecordList: The remaining records.
+        """
+
+        return self[max(count_of_elements, 0):]
+
+    def _group_indexes(self, field):
+        groups = {}
+        for i, key in enumerate(self._column(field)):
+            if key in groups:
+                groups[key].append(i)
+            else:
+                groups[key] = [i]
+        return groups
+
+    def GroupBy(self, field):
+        """
+        Groups the records by the value of a field, in the order in which the keys first occur.
+
+        Args:
+        - field (str): The name of the field to group by.
+
+        Returns:
+        A List of groups, where each group is represented by a dictionary with the 'key' field
+        and the 'values' field holding the RecordList of the group.
+        """
+
+        return List({'key': key, 'values': self._gather(indexes)}
+                    for key, indexes in self._group_indexes(field).items())
+
+    def GroupAggregate(self, field, aggregates):
+        """
+        Groups the records by the value of a field and computes aggregates of other fields for each group,
+        without building the groups.
+
+        Args:
+        - field (str): The name of the field to group by.
+        - aggregates (dict): Maps a result field name to an aggregate: 'count', or a tuple (name, field)
+        where name is one of 'count', 'sum', 'min', 'max', 'average', 'variance'. As in SQL, aggregates of a field
+        skip the records where it is missing (None), so ('count', field) counts the records that have it.
+
+        Returns:
+        - RecordList: One record per group with the 'key' field and one field per aggregate.
+
+        Example:
+        # >>> records.GroupAggregate('id', {'n': 'count', 'total': ('sum', 'm')})
+        """
+
+        parsed = _parse_aggregates(aggregates)
+        groups = self._group_indexes(field)
+        columns = {'key': list(groups)}
+        for name, aggregate, value_field in parsed:
+            values = self._column(value_field) if value_field is not None else None
+            results = []
+            for indexes in groups.values():
+                state = aggregate()
+                if values is None:
+                    for _ in indexes:
+                        state.add(None)
+                else:
+                    for i in indexes:
+                        if values[i] is not None:
+                            state.add(values[i])
+                results.append(state.result())
+            columns[name] = results
+        return RecordList(columns, len(groups))
+
+    def Join(self, inner_list, outer_field, inner_field, suffix='_inner'):
+        """
+        Performs a hash join with another list of records on the equality of two fields.
+        The result contains the fields of both lists; inner fields whose names are already used get the suffix,
+        and the inner join field is dropped when it has the same name as the outer one.
+
+        Args:
+        - inner_list (RecordList or sequence of dictionaries): The records to join with.
+        - outer_field (str): The name of the join field of this list.
+        - inner_field (str): The name of the join field of the inner list.
+        - suffix (str): Appended to the names of inner fields that clash with outer fields.
+
+        Returns:
+        - RecordList: The joined records, in the order of this list.
+
+        Example:
+        # >>> customers = RecordList.FromRecords([{'id': 1, 'name': 'A'}])
+        # >>> records.Join(customers, 'id', 'id').Select('name')
+        ['A']
+        """
+
+        if not isinstance(inner_list, RecordList):
+            inner_list = RecordList.FromRecords(inner_list)
+        lookup = inner_list._group_indexes(inner_field)
+        outer_indexes = []
+        inner_indexes = []
+        for i, key in enumerate(self._column(outer_field)):
+            for j in lookup.get(key, ()):
+                outer_indexes.append(i)
+                inner_indexes.append(j)
+        columns = {name: [values[i] for i in outer_indexes] for name, values in self._columns.items()}
+        for name, values in inner_list._columns.items():
+            if name == inner_field and name == outer_field:
+                continue
+            columns[name + suffix if name in columns else name] = [values[j] for j in inner_indexes]
+        return RecordList(columns, len(outer_indexes))
+
+    def AsEnumerable(self):
+        """
+        Returns a lazy sequence of the records as dictionaries.
+
+        Returns:
+        - Enumerable: A lazy sequence over the records.
+        """
+
+        return Enumerable(self)
+
+    def ToList(self):
+        """
+        Converts the records back to a List of dictionaries.
+
+        Returns:
+        - List: The records.
+        """
+
+        return List(self)
+
+    def ToPythonList(self):
+        """
+        Converts the records back to a standard Python list of dictionaries.
+
+        Returns:
+        - list: The records.
+        """
+
+        return list(self)
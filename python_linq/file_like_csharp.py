@@ -1,16 +1,570 @@
-from python_linq.linq_like_csharp import List
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import mmap
+import os
+import queue
+import threading
+from itertools import chain, islice
+from operator import itemgetter
+
+from python_linq.linq_like_csharp import List, Enumerable, _Deferred
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+FSYNC_POLICIES = ('none', 'flush', 'close')
+
+# lines joined into one write call by WriteLines
+_LINES_PER_BLOCK = 4096
+
+COMPRESSIONS = ('gzip', 'bz2', 'xz')
+
+_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+
+_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'))
+
+# decompressed blocks a pipelined reader may read ahead of the consumer
+_READ_AHEAD = 4
+
+
+def _compression(file_name, compression, mode):
+    """
+    Resolves the compression of a file: the explicit compression, or with 'infer' the one given by the extension.
+    With 'sniff', a file without a known extension that is read is also recognized by its first bytes; this is
+    opt-in because ordinary data may start with the same bytes (a text line starting with "BZh" looks like bz2),
+    and it is never done for appends.
+    """
+
+    if compression not in ('infer', 'sniff'):
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression '{}'".format(compression))
+        return compression
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension in _EXTENSIONS:
+        return _EXTENSIONS[extension]
+    if compression == 'sniff' and mode[0] == 'r' and os.path.isfile(file_name):
+        with open(file_name, mode='rb') as f:
+            head = f.read(6)
+        for magic, name in _MAGIC:
+            if head.startswith(magic):
+                return name
+    return None
+
+
+def _ends_without_newline(file_name, newline):
+    # only the last byte is read, so appending stays O(1) in the size of the file
+    try:
+        with open(file_name, mode='rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != newline[-1:]
+    except OSError:
+        # missing or empty file
+        return False
+
+
+def _open_compressed(file_name, compression, mode, compression_level):
+    mode = mode[0] + 'b'
+    if compression == 'gzip':
+        return gzip.open(file_name, mode, compresslevel=9 if compression_level is None else compression_level)
+    if compression == 'bz2':
+        return bz2.open(file_name, mode, compresslevel=9 if compression_level is None else compression_level)
+    return lzma.open(file_name, mode, preset=compression_level)
+
+
+class _PipelinedReader(io.RawIOBase):
+    """
+    Reads a decompressing stream on a background thread, a few blocks ahead of the consumer.
+    zlib, bz2 and lzma release the GIL while they decompress, so decompression overlaps with the processing
+    of the lines already read.
+    """
+
+    def __init__(self, stream, block_size):
+        super().__init__()
+        self._stream = stream
+        self._block_size = block_size
+        self._blocks = queue.Queue(_READ_AHEAD)
+        self._stopped = threading.Event()
+        self._pending = b''
+        self._eof = False
+        self._thread = threading.Thread(target=self._read_ahead, daemon=True)
+        self._thread.start()
+
+    def _read_ahead(self):
+        try:
+            while not self._stopped.is_set():
+                block = self._stream.read(self._block_size)
+                self._put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        if not self._stopped.is_set():
+            self._blocks.put(item)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._pending:
+            if self._eof:
+                return 0
+            block = self._blocks.get()
+            if isinstance(block, Exception):
+                self._eof = True
+                raise block
+            if not block:
+                self._eof = True
+                return 0
+            self._pending = memoryview(block)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stopped.set()
+            # make room in the queue so that a blocked read-ahead thread can finish
+            while True:
+                try:
+                    self._blocks.get_nowait()
+                except queue.Empty:
+                    break
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+def _open(file_name, mode, encoding=None, buffer_size=DEFAULT_BUFFER_SIZE, newline=None, compression='infer',
+          compression_level=None, pipelined=False):
+    """
+    Opens a file like open(), decompressing or compressing it with gzip, bz2 or lzma if needed.
+    With pipelined=True, a compressed file that is read is decompressed on a background thread.
+    """
+
+    compression = _compression(file_name, compression, mode)
+    binary = 'b' in mode
+    if compression is None:
+        if binary:
+            return open(file_name, mode=mode, buffering=buffer_size)
+        return open(file_name, mode=mode, buffering=buffer_size, encoding=encoding, newline=newline)
+    stream = _open_compressed(file_name, compression, mode, compression_level)
+    if mode[0] == 'r':
+        if pipelined:
+            stream = io.BufferedReader(_PipelinedReader(stream, buffer_size), buffer_size)
+    else:
+        # the compressors are called once per block instead of once per small write
+        stream = io.BufferedWriter(stream, buffer_size)
+    if binary:
+        return stream
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+
+def _read_lines(file_name, encoding, buffer_size, compression):
+    with _open(file_name, 'r', encoding, buffer_size, compression=compression, pipelined=True) as f:
+        for line in f:
+            yield line[:-1] if line.endswith('\n') else line
+
+
+def _projection(header, columns, file_name):
+    """
+    Returns the names of the selected columns and a function that builds a record of them from a CSV row.
+    """
+
+    if columns is None:
+        columns = header
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(name, index)
+    missing = [name for name in columns if name not in positions]
+    if missing:
+        raise ValueError("Columns {} are not in the header of {}".format(missing, file_name))
+    names = list(columns)
+    indexes = [positions[name] for name in names]
+    # a dict display is several times faster than dict(zip(...)), so the common narrow projections use one
+    if len(indexes) == 1:
+        name, index = names[0], indexes[0]
+        return names, lambda row: {name: row[index]}
+    if len(indexes) == 2:
+        (first, second), (i, j) = names, indexes
+        return names, lambda row: {first: row[i], second: row[j]}
+    getter = itemgetter(*indexes)
+    return names, lambda row: dict(zip(names, getter(row)))
+
+
+def _pending_lines(pending, f):
+    """
+    Yields the line put in pending, then the following lines of the file for as long as the csv reader asks.
+    """
+
+    while True:
+        if pending:
+            yield pending.pop()
+        else:
+            line = f.readline()
+            if not line:
+                return
+            yield line
+
+
+def _read_csv(file_name, columns, types, predicate, delimiter, encoding, buffer_size, compression):
+    with _open(file_name, 'r', encoding, buffer_size, newline='', compression=compression, pipelined=True) as f:
+        # lines without a quote are split with str.split; the others, which may continue on the next lines,
+        # are handed to a csv reader that reads the continuation lines from the file itself
+        pending = []
+        reader = csv.reader(_pending_lines(pending, f), delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        names, project = _projection(header, columns, file_name)
+        conversions = list(types.items()) if types else []
+        for name, _ in conversions:
+            if name not in names:
+                raise ValueError("Column '{}' has a type but is not selected".format(name))
+        # records are counted rather than lines, since a quoted field may span several lines
+        number = 0
+        for line in iter(f.readline, ''):
+            if '"' in line:
+                pending.append(line)
+                row = next(reader)
+            else:
+                row = line.rstrip('\r\n').split(delimiter)
+            if row == ['']:
+                continue
+            number += 1
+            try:
+                record = project(row)
+            except IndexError:
+                raise ValueError("Record {} of {} has {} fields, fewer than the header"
+                                 .format(number, file_name, len(row))) from None
+            if predicate is not None and not predicate(record):
+                continue
+            for name, fun in conversions:
+                record[name] = fun(record[name])
+            yield record
+
+
+def _read_json_lines(file_name, fields, predicate, encoding, buffer_size, compression):
+    loads = json.loads
+    names = None if fields is None else list(fields)
+    project = None if names is None else (lambda source: {name: source.get(name) for name in names})
+    with _open(file_name, 'r', encoding, buffer_size, compression=compression, pipelined=True) as f:
+        for number, line in enumerate(f, 1):
+            try:
+                record = loads(line)
+            except ValueError as error:
+                if not line.strip():
+                    continue
+                raise ValueError("Line {} of {} is not valid JSON: {}".format(number, file_name, error)) from None
+            if predicate is not None and not predicate(record):
+                continue
+            yield record if project is None else project(record)
+
+
+class _LineRange:
+    """
+    The lines that start in the byte range [start, end) of a file; start and end are at the beginning of lines.
+    Picklable, so a worker process reads the range itself. The range is read in blocks that end at a newline,
+    and each block is decoded and split at once.
+    """
+
+    __slots__ = ('file_name', 'start', 'end', 'encoding', 'buffer_size')
+
+    def __init__(self, file_name, start, end, encoding, buffer_size):
+        self.file_name = file_name
+        self.start = start
+        self.end = end
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+
+    def __iter__(self):
+        with open(self.file_name, 'rb') as f:
+            f.seek(self.start)
+            remaining = self.end - self.start
+            rest = b''
+            while remaining > 0:
+                block = f.read(min(self.buffer_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                block = rest + block
+                cut = block.rfind(b'\n') + 1
+                rest = block[cut:]
+                if cut:
+                    yield from _split_lines(block[:cut].decode(self.encoding))[:-1]
+            if rest:
+                yield from _split_lines(rest.decode(self.encoding))
+
+
+def _split_lines(text):
+    # the same line ends as a file opened in text mode: '\n', '\r\n' and '\r'
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text.split('\n')
+
+
+class _LineRanges:
+    """
+    A file that a ParallelQuery splits into newline-aligned byte ranges, about four per worker.
+    """
+
+    def __init__(self, file_name, encoding, buffer_size):
+        self.file_name = file_name
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+
+    def _partition(self, workers, range_size):
+        size = os.path.getsize(self.file_name)
+        if range_size is None:
+            range_size = max(self.buffer_size, -(-size // (workers * 4)))
+        starts = [0]
+        with open(self.file_name, 'rb') as f:
+            for boundary in range(range_size, size, range_size):
+                if boundary <= starts[-1]:
+                    continue
+                # a range starts after the newline that ends the line crossing its nominal start
+                f.seek(boundary - 1)
+                f.readline()
+                start = f.tell()
+                if start < size:
+                    starts.append(start)
+        ends = starts[1:] + [size]
+        return [_LineRange(self.file_name, start, end, self.encoding, self.buffer_size)
+                for start, end in zip(starts, ends)]
+
+
+def _map_view(file_name, offset=0, length=None):
+    """
+    Maps a region of a file read-only and returns a memoryview over it.
+    The mapping stays open as long as the view (or any slice of it) is referenced.
+    """
+
+    size = os.path.getsize(file_name)
+    if offset < 0 or offset > size:
+        raise ValueError("Offset is outside of the file")
+    if length is None or offset + length > size:
+        length = size - offset
+    if length == 0:
+        return memoryview(b'')
+    # mmap offsets must be aligned to the allocation granularity
+    aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with open(file_name, mode='rb') as f:
+        mapping = mmap.mmap(f.fileno(), length + offset - aligned, access=mmap.ACCESS_READ, offset=aligned)
+    return memoryview(mapping)[offset - aligned:]
+
+
+def _file_version(file_name):
+    """
+    Returns the version of a file used by cached queries: the path, modification time and size.
+    """
+
+    stat = os.stat(file_name)
+    return file_name, stat.st_mtime_ns, stat.st_size
+
+
+def _file_source(generator, file_name, *args):
+    return Enumerable(_Deferred(generator, (file_name,) + args, lambda: _file_version(file_name)))
+
+
+def _read_records(file_name, record_size, compression, buffer_size):
+    compression = _compression(file_name, compression, 'rb')
+    if compression is not None:
+        # a compressed file cannot be mapped; its records are read as bytes
+        with _open(file_name, 'rb', buffer_size=buffer_size, compression=compression, pipelined=True) as f:
+            while True:
+                record = f.read(record_size)
+                if not record:
+                    return
+                yield record
+    view = _map_view(file_name)
+    for start in range(0, len(view), record_size):
+        yield view[start:start + record_size]
+
+
+def _read_compressed_segments(file_name, delimiter, compression, buffer_size):
+    with _open(file_name, 'rb', buffer_size=buffer_size, compression=compression, pipelined=True) as f:
+        rest = b''
+        while True:
+            block = f.read(buffer_size)
+            if not block:
+                break
+            segments = (rest + block).split(delimiter)
+            rest = segments.pop()
+            for segment in segments:
+                yield segment
+        if rest:
+            yield rest
+
+
+def _read_segments(file_name, delimiter, compression, buffer_size):
+    compression = _compression(file_name, compression, 'rb')
+    if compression is not None:
+        yield from _read_compressed_segments(file_name, delimiter, compression, buffer_size)
+        return
+    view = _map_view(file_name)
+    if len(view) == 0:
+        return
+    mapping = view.obj
+    start = 0
+    while True:
+        end = mapping.find(delimiter, start)
+        if end == -1:
+            if start < len(view):
+                yield view[start:]
+            return
+        yield view[start:end]
+        start = end + len(delimiter)
+
+
+class FileWriter:
+    """
+    A buffered streaming writer created by File.OpenWriter. Lines are written in large blocks, and the
+    writer can be used as a context manager, which closes the file at the end of the block.
+
+    Args:
+    - file_name (str): The name of the file to write to.
+    - mode (str): 'w' to overwrite, 'a' to append or 'x' to create a new file; add 'b' for a binary file.
+    - encoding (str): The encoding of a text file.
+    - buffer_size (int): The size of the write buffer in bytes.
+    - flush_every (int): If set, the buffer is flushed to the operating system after this many lines.
+    - fsync_policy (str): When the data is forced to disk with os.fsync: 'none' (never), 'flush' (on every flush,
+    including the ones triggered by flush_every) or 'close' (once, when the writer is closed).
+    - newline: The line terminator written after each line (default is '\\n').
+    - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension of the file name.
+    - compression_level (int): The compression level (gzip and bz2: 1-9, xz: 0-9).
+
+    When appending to an uncompressed file whose last line has no terminator (for example a file written by
+    another program), a terminator is written first, so that the new lines do not run into the last one.
+    """
+
+    def __init__(self, file_name, mode='w', encoding='utf-8', buffer_size=DEFAULT_BUFFER_SIZE, flush_every=None,
+                 fsync_policy='none', newline='\n', compression='infer', compression_level=None):
+        if mode.replace('b', '') not in ('w', 'a', 'x'):
+            raise ValueError("Unknown mode '{}'".format(mode))
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError("Unknown fsync policy '{}'".format(fsync_policy))
+        compression = _compression(file_name, compression, mode)
+        if 'b' in mode:
+            self._file = _open(file_name, mode, buffer_size=buffer_size, compression=compression,
+                               compression_level=compression_level)
+            self._newline = newline.encode(encoding) if isinstance(newline, str) else newline
+        else:
+            # newline='' writes the line terminators as given, without translation
+            self._file = _open(file_name, mode, encoding, buffer_size, '', compression, compression_level)
+            self._newline = newline
+        if mode[0] == 'a' and compression is None:
+            terminator = self._newline.encode(encoding) if isinstance(self._newline, str) else self._newline
+            if _ends_without_newline(file_name, terminator):
+                self._file.write(self._newline)
+        self._flush_every = flush_every
+        self._fsync_policy = fsync_policy
+        self._unflushed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.Close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def _written(self, count):
+        if self._flush_every is not None:
+            self._unflushed += count
+            if self._unflushed >= self._flush_every:
+                self.Flush()
+
+    def Write(self, contents):
+        """
+        Writes text (or bytes, for a binary file) as is.
+
+        Args:
+        - contents: The text to write.
+        """
+
+        self._file.write(contents)
+
+    def WriteLine(self, line):
+        """
+        Writes a line followed by the line terminator.
+
+        Args:
+        - line: The line to write.
+        """
+
+        self._file.write(line + self._newline)
+        if self._flush_every is not None:
+            self._written(1)
+
+    def WriteLines(self, lines):
+        """
+        Writes each line of a sequence followed by the line terminator. The sequence is read lazily
+        and written in blocks, so it can be a generator or an Enumerable of any length.
+
+        Args:
+        - lines: The lines to write.
+        """
+
+        newline = self._newline
+        if self._flush_every is None and isinstance(lines, (list, tuple)):
+            # the lines are already in memory, so a single write avoids slicing them into blocks
+            if lines:
+                self._file.write(newline.join(lines) + newline)
+            return
+        block_size = _LINES_PER_BLOCK if self._flush_every is None else min(_LINES_PER_BLOCK, self._flush_every)
+        iterator = iter(lines)
+        while True:
+            block = list(islice(iterator, block_size))
+            if not block:
+                return
+            block.append(newline[:0])
+            self._file.write(newline.join(block))
+            self._written(len(block) - 1)
+
+    def Flush(self):
+        """
+        Flushes the buffer to the operating system, and to disk if the fsync policy is 'flush'.
+        """
+
+        self._file.flush()
+        self._unflushed = 0
+        if self._fsync_policy == 'flush':
+            os.fsync(self._file.fileno())
+
+    def Close(self):
+        """
+        Flushes the buffer and closes the file. Closing a closed writer does nothing.
+        """
+
+        if self._file.closed:
+            return
+        try:
+            self._file.flush()
+            if self._fsync_policy != 'none':
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
 
 
 class File:
 
     @staticmethod
-    def ReadAllLines(file_name: str, encoding='utf-8') -> List:
+    def ReadAllLines(file_name: str, encoding='utf-8', compression='infer') -> List:
         """
         Reads all the lines from a text file and returns them as a list of strings.
 
         Args:
         - file_name (str): The name of the file to read.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
 
         Returns:
         - List: A list of strings representing the lines of the file.
@@ -21,19 +575,158 @@ class File:
         ["line 1", "line 2", "line 3"]
         """
 
-        with open(file_name, mode='r', encoding=encoding) as f:
+        with _open(file_name, 'r', encoding, compression=compression) as f:
             content = f.readlines()
         content = [x.strip() for x in content]
         return List(content)
 
     @staticmethod
-    def ReadAllText(file_name: str, encoding='utf-8') -> str:
+    def ReadLines(file_name: str, encoding='utf-8', buffer_size=DEFAULT_BUFFER_SIZE, compression='infer') -> Enumerable:
+        """
+        Lazily reads the lines of a text file.
+        The file is opened when the sequence is enumerated and read in buffered chunks, one line at a time,
+        so the memory use does not depend on the size of the file. Only the line terminators are removed.
+        Every enumeration reads the file again. A compressed file is decompressed on a background thread,
+        a few blocks ahead of the processing of its lines.
+
+        Args:
+        - file_name (str): The name of the file to read.
+        - encoding (str): The encoding of the file (default is 'utf-8').
+        - buffer_size (int): The size of the read buffer in bytes.
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
+
+        Returns:
+        - Enumerable: A lazy sequence of the lines of the file.
+
+        Example:
+        # >>> File.ReadLines("example.log").Where(lambda x: "ERROR" in x).Take(10).ToList()
+        ["ERROR 1", "ERROR 2"]
+        """
+
+        return _file_source(_read_lines, file_name, encoding, buffer_size, compression)
+
+    @staticmethod
+    def ReadCsv(file_name: str, columns=None, types=None, predicate=None, delimiter=',', encoding='utf-8',
+                buffer_size=DEFAULT_BUFFER_SIZE, compression='infer') -> Enumerable:
+        """
+        Lazily reads the rows of a CSV file with a header line as dictionaries.
+        Lines without quotes are split directly and the others are parsed by the csv module (with its default
+        quoting rules); only the selected columns are taken out of each row, and only the rows accepted by the
+        predicate are converted to their types. Every enumeration reads the file again.
+
+        Args:
+        - file_name (str): The name of the file to read.
+        - columns (list): The names of the columns to keep, in order. If None, all columns are kept.
+        - types (dict): The conversion function of some of the selected columns, such as {'price': float}.
+        The other columns stay strings.
+        - predicate: A function that takes a row before the conversions, with string values, and returns
+        False to skip it.
+        - delimiter (str): The separator of the fields (default is ',').
+        - encoding (str): The encoding of the file (default is 'utf-8').
+        - buffer_size (int): The size of the read buffer in bytes.
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
+
+        Returns:
+        - Enumerable: A lazy sequence of dictionaries from column names to values.
+
+        Raises:
+        - ValueError: If a selected column is not in the header, or a row has fewer fields than the header.
+
+        Example:
+        # >>> File.ReadCsv("orders.csv", columns=["id", "price"], types={"price": float},
+        # ...              predicate=lambda row: row["id"].startswith("A")).Sum(lambda row: row["price"])
+        125.5
+        """
+
+        return _file_source(_read_csv, file_name, columns, types, predicate, delimiter, encoding, buffer_size,
+                            compression)
+
+    @staticmethod
+    def ReadJsonLines(file_name: str, fields=None, predicate=None, encoding='utf-8', buffer_size=DEFAULT_BUFFER_SIZE,
+                      compression='infer') -> Enumerable:
+        """
+        Lazily reads a JSON Lines file, one JSON value per line. Blank lines are skipped.
+        The predicate sees the whole parsed value, so it can test fields that are not kept, and only the values
+        it accepts are projected. Every enumeration reads the file again.
+
+        Args:
+        - file_name (str): The name of the file to read.
+        - fields (list): The names of the fields to keep, in order; missing fields are None. If None,
+        the parsed values are returned as they are.
+        - predicate: A function that takes a parsed value and returns False to skip it.
+        - encoding (str): The encoding of the file (default is 'utf-8').
+        - buffer_size (int): The size of the read buffer in bytes.
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
+
+        Returns:
+        - Enumerable: A lazy sequence of the parsed values, or of dictionaries of the selected fields.
+
+        Raises:
+        - ValueError: If a line is not valid JSON.
+
+        Example:
+        # >>> File.ReadJsonLines("events.jsonl", fields=["user"], predicate=lambda e: e["level"] == "ERROR").First()
+        {'user': 'alice'}
+        """
+
+        return _file_source(_read_json_lines, file_name, fields, predicate, encoding, buffer_size, compression)
+
+    @staticmethod
+    def ParallelLines(file_name: str, workers=None, backend="process", encoding='utf-8', range_size=None,
+                      buffer_size=DEFAULT_BUFFER_SIZE, compression='infer'):
+        """
+        Returns a parallel query over the lines of a text file. The file is split into byte ranges that start
+        at the beginning of lines, and every worker reads its own ranges, so the file is neither read nor sent
+        by the calling process. Select, Where and SelectMany run in the workers, and Count, Sum, Average,
+        Min, Max, Distinct, GroupBy, GroupAggregate, AggregateMany and Aggregate (with a combine_func)
+        merge the partial results of the ranges.
+
+        A compressed file cannot be split: its lines are read by the calling process and sent to the workers
+        in chunks, which only pays off when the stages are expensive. Only two chunks per worker are read ahead,
+        so the memory use does not depend on the size of the file.
+
+        Args:
+        - file_name (str): The name of the file to read.
+        - workers (int): The number of workers (default is the number of CPUs).
+        - backend (str): "process" for CPU-bound stages or "thread" for stages that release the GIL.
+        - encoding (str): The encoding of the file, in which '\\n' must be the byte b'\\n' (default is 'utf-8').
+        - range_size (int): The size of a range in bytes (default is about four ranges per worker).
+        - buffer_size (int): The size of the read buffer in bytes.
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
+
+        Returns:
+        - ParallelQuery: The parallel query over the lines of the file.
+
+        Raises:
+        - ValueError: If the encoding does not encode '\\n' as b'\\n' (such as UTF-16).
+
+        Example:
+        # >>> File.ParallelLines("access.log", workers=32).Where(is_error).Select(status).GroupAggregate(
+        # ...     identity, {'n': 'count'})
+        [{'key': 500, 'n': 812}, {'key': 503, 'n': 97}]
+        """
+
+        from python_linq.parallel_like_csharp import ParallelQuery
+        if '\n'.encode(encoding) != b'\n':
+            raise ValueError("ParallelLines needs an encoding in which '\\n' is the byte b'\\n'")
+        if _compression(file_name, compression, 'r') is not None:
+            return ParallelQuery(File.ReadLines(file_name, encoding, buffer_size, compression), workers, backend)
+        return ParallelQuery(_LineRanges(file_name, encoding, buffer_size), workers, backend, range_size)
+
+    @staticmethod
+    def ReadAllText(file_name: str, encoding='utf-8', compression='infer') -> str:
         """
         Reads all the text from a file and returns it as a string.
 
         Args:
         - file_name (str): The name of the file to read.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, 'infer' to choose it from the extension (default),
+        or 'sniff' to also recognize a compressed file without a known extension by its first bytes.
 
         Returns:
         - str: The content of the file as a string.
@@ -44,17 +737,18 @@ class File:
         "This is the content of the file."
         """
 
-        with open(file_name, mode='r', encoding=encoding) as f:
+        with _open(file_name, 'r', encoding, compression=compression) as f:
             content = f.read()
         return content
 
     @staticmethod
-    def ReadAllBytes(file_name: str):
+    def ReadAllBytes(file_name: str, compression='infer'):
         """
         Reads all the bytes from a binary file and returns them as bytes.
 
         Args:
         - file_name (str): The name of the binary file to read.
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
 
         Returns:
         - bytes: The content of the file as bytes.
@@ -63,37 +757,130 @@ class File:
         # >>> content = File.ReadAllBytes("example.bin")
         """
 
-        with open(file_name, mode="rb") as f:
+        with _open(file_name, 'rb', compression=compression) as f:
             content = f.read()
         return content
 
     @staticmethod
-    def AppendAllLines(file_name: str, list, encoding='utf-8'):
+    def MapBytes(file_name: str) -> memoryview:
+        """
+        Maps a binary file into memory read-only and returns a view of its bytes.
+        Nothing is read up front: the operating system loads only the pages that are accessed,
+        and slicing the view does not copy.
+
+        Args:
+        - file_name (str): The name of the binary file to map.
+
+        Returns:
+        - memoryview: A read-only view of the content of the file.
+
+        Example:
+        # >>> view = File.MapBytes("dump.bin")
+        # >>> header = bytes(view[:16])
+        """
+
+        return _map_view(file_name)
+
+    @staticmethod
+    def OpenView(file_name: str, offset: int, length: int = None) -> memoryview:
+        """
+        Maps a region of a binary file into memory read-only and returns a view of its bytes.
+
+        Args:
+        - file_name (str): The name of the binary file to map.
+        - offset (int): The position of the first byte of the region.
+        - length (int): The number of bytes in the region. If None, or if the region passes the end of the file,
+        the region ends at the end of the file.
+
+        Returns:
+        - memoryview: A read-only view of the region.
+
+        Example:
+        # >>> view = File.OpenView("dump.bin", 4096, 512)
+        # >>> len(view)
+        512
+        """
+
+        return _map_view(file_name, offset, length)
+
+    @staticmethod
+    def ReadRecords(file_name: str, record_size: int, compression='infer',
+                    buffer_size=DEFAULT_BUFFER_SIZE) -> Enumerable:
         """
-        Appends a list of strings as lines to a text file.
+        Lazily splits a memory-mapped binary file into fixed-size records.
+        Each record is a read-only memoryview into the mapping, so no bytes are copied.
+        If the size of the file is not a multiple of record_size, the last record is shorter.
+        A compressed file cannot be mapped: it is decompressed on a background thread and its records are bytes.
+
+        Args:
+        - file_name (str): The name of the binary file to read.
+        - record_size (int): The size of one record in bytes.
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - buffer_size (int): The size of the read buffer of a compressed file in bytes.
+
+        Returns:
+        - Enumerable: A lazy sequence of memoryview records.
+
+        Example:
+        # >>> File.ReadRecords("dump.bin", 16).Where(lambda r: r[0] == 0xFF).Count()
+        3
+        """
+
+        if record_size <= 0:
+            raise ValueError("record_size must be positive")
+        return _file_source(_read_records, file_name, record_size, compression, buffer_size)
+
+    @staticmethod
+    def ReadSegments(file_name: str, delimiter: bytes = b'\n', compression='infer',
+                     buffer_size=DEFAULT_BUFFER_SIZE) -> Enumerable:
+        """
+        Lazily splits a memory-mapped binary file into the segments between delimiters.
+        Each segment is a read-only memoryview into the mapping, without the delimiter, so no bytes are copied.
+        A compressed file cannot be mapped: it is decompressed on a background thread and its segments are bytes.
+
+        Args:
+        - file_name (str): The name of the binary file to read.
+        - delimiter (bytes): The separator of the segments (default is b'\\n').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - buffer_size (int): The size of the read buffer of a compressed file in bytes.
+
+        Returns:
+        - Enumerable: A lazy sequence of memoryview segments.
+
+        Example:
+        # >>> File.ReadSegments("dump.bin", b"\\x00").Select(bytes).First()
+        b'first record'
+        """
+
+        if not delimiter:
+            raise ValueError("delimiter must not be empty")
+        return _file_source(_read_segments, file_name, delimiter, compression, buffer_size)
+
+    @staticmethod
+    def AppendAllLines(file_name: str, list, encoding='utf-8', compression='infer', compression_level=None):
+        """
+        Appends a sequence of strings as lines to a text file, each followed by a line terminator, like WriteAllLines.
+        The sequence is written as it is read, so it can be a generator of any length.
 
         Args:
         - file_name (str): The name of the file to append to.
-        - list: The list of strings to append as lines.
+        - list: The strings to append as lines.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension
+        (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
 
         Example:
         # >>> lines = ["new line 1", "new line 2"]
         # >>> File.AppendAllLines("example.txt", lines)
         """
 
-        with open(file_name, mode="a+", encoding=encoding) as f:
-            f.seek(0)
-            data = f.read(100)
-            if len(data) > 0:
-                f.write("\n")
-            for i, n in enumerate(list):
-                f.write(n)
-                if i != len(list) - 1:
-                    f.write("\n")
+        with FileWriter(file_name, 'a', encoding, compression=compression,
+                        compression_level=compression_level) as writer:
+            writer.WriteLines(list)
 
     @staticmethod
-    def AppendAllText(file_name: str, contents: str, encoding='utf-8'):
+    def AppendAllText(file_name: str, contents: str, encoding='utf-8', compression='infer', compression_level=None):
         """
         Appends text to a file.
 
@@ -101,34 +888,121 @@ class File:
         - file_name (str): The name of the file to append to.
         - contents (str): The text to append.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension
+        (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
 
         Example:
         # >>> File.AppendAllText("example.txt", "additional content")
         """
 
-        with open(file_name, mode="a", encoding=encoding) as f:
+        with _open(file_name, 'a', encoding, compression=compression, compression_level=compression_level) as f:
             f.write(contents)
 
     @staticmethod
-    def WriteAllLines(file_name: str, list, encoding='utf-8'):
+    def WriteAllLines(file_name: str, list, encoding='utf-8', compression='infer', compression_level=None):
         """
         Writes a list of strings as lines to a text file, overwriting its previous content.
+        Every line is followed by a line terminator, as with WriteLines and AppendLines.
 
         Args:
         - file_name (str): The name of the file to write to.
         - list: The list of strings to write as lines.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
 
         Example:
         # >>> lines = ["new line 1", "new line 2"]
         # >>> File.WriteAllLines("example.txt", lines)
         """
 
-        with open(file_name, mode="w", encoding=encoding) as f:
-            f.writelines(list)
+        with FileWriter(file_name, 'w', encoding, compression=compression,
+                        compression_level=compression_level) as writer:
+            writer.WriteLines(list)
+
+    @staticmethod
+    def OpenWriter(file_name: str, mode='w', encoding='utf-8', buffer_size=DEFAULT_BUFFER_SIZE, flush_every=None,
+                   fsync_policy='none', newline='\n', compression='infer', compression_level=None) -> FileWriter:
+        """
+        Opens a buffered streaming writer, for writing many lines in small calls.
+
+        Args:
+        - file_name (str): The name of the file to write to.
+        - mode (str): 'w' to overwrite, 'a' to append or 'x' to create a new file; add 'b' for a binary file.
+        - encoding (str): The encoding of a text file (default is 'utf-8').
+        - buffer_size (int): The size of the write buffer in bytes (default is 1 MiB).
+        - flush_every (int): If set, the buffer is flushed to the operating system after this many lines.
+        - fsync_policy (str): 'none', 'flush' (os.fsync on every flush) or 'close' (os.fsync when closed).
+        - newline: The line terminator written after each line (default is '\\n').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension
+        (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
+
+        Returns:
+        - FileWriter: The writer. Use it in a with statement or call Close().
+
+        Example:
+        # >>> with File.OpenWriter("export.txt", "a", flush_every=10000) as writer:
+        # ...     writer.WriteLines(rows.Select(format_row))
+        """
+
+        return FileWriter(file_name, mode, encoding, buffer_size, flush_every, fsync_policy, newline, compression,
+                          compression_level)
+
+    @staticmethod
+    def WriteLines(file_name: str, lines, encoding='utf-8', newline='\n', buffer_size=DEFAULT_BUFFER_SIZE,
+                   compression='infer', compression_level=None):
+        """
+        Writes a sequence of lines to a text file, overwriting its previous content.
+        Every line is followed by the line terminator. The sequence can be any iterable, such as a generator
+        or an Enumerable; it is read lazily and written in large blocks.
+
+        Args:
+        - file_name (str): The name of the file to write to.
+        - lines: The lines to write.
+        - encoding (str): The encoding of the file (default is 'utf-8').
+        - newline (str): The line terminator (default is '\\n').
+        - buffer_size (int): The size of the write buffer in bytes (default is 1 MiB).
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
+
+        Example:
+        # >>> File.WriteLines("squares.txt", Enumerable.From(range(10 ** 6)).Select(lambda x: str(x * x)))
+        """
+
+        with FileWriter(file_name, 'w', encoding, buffer_size, newline=newline, compression=compression,
+                        compression_level=compression_level) as writer:
+            writer.WriteLines(lines)
+
+    @staticmethod
+    def AppendLines(file_name: str, lines, encoding='utf-8', newline='\n', buffer_size=DEFAULT_BUFFER_SIZE,
+                    compression='infer', compression_level=None):
+        """
+        Appends a sequence of lines to a text file. Every line is followed by the line terminator; of the existing
+        content only the last byte is read, to start a new line if the file does not end with one.
+        The sequence can be any iterable.
+
+        Args:
+        - file_name (str): The name of the file to append to.
+        - lines: The lines to append.
+        - encoding (str): The encoding of the file (default is 'utf-8').
+        - newline (str): The line terminator (default is '\\n').
+        - buffer_size (int): The size of the write buffer in bytes (default is 1 MiB).
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension
+        (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
+
+        Example:
+        # >>> File.AppendLines("events.log", batch)
+        """
+
+        with FileWriter(file_name, 'a', encoding, buffer_size, newline=newline, compression=compression,
+                        compression_level=compression_level) as writer:
+            writer.WriteLines(lines)
 
     @staticmethod
-    def WriteAllText(file_name: str, contents: str, encoding='utf-8'):
+    def WriteAllText(file_name: str, contents: str, encoding='utf-8', compression='infer', compression_level=None):
         """
         Writes text to a file, overwriting its previous content.
 
@@ -136,23 +1010,27 @@ class File:
         - file_name (str): The name of the file to write to.
         - contents (str): The text to write.
         - encoding (str): The encoding of the file (default is 'utf-8').
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
 
         Example:
         # >>> File.WriteAllText("example.txt", "new content")
         """
 
-        with open(file_name, mode="w", encoding=encoding) as f:
+        with _open(file_name, 'w', encoding, compression=compression, compression_level=compression_level) as f:
             f.write(contents)
 
     @staticmethod
-    def WriteAllBytes(file_name: str, contents, encoding='utf-8'):
+    def WriteAllBytes(file_name: str, contents, encoding='utf-8', compression='infer', compression_level=None):
         """
         Writes bytes to a binary file, overwriting its previous content.
 
         Args:
         - file_name (str): The name of the binary file to write to.
         - contents: The bytes to write.
+        - compression (str): 'gzip', 'bz2', 'xz', None, or 'infer' to choose it from the extension (default is 'infer').
+        - compression_level (int): The compression level (gzip and bz2: 1-9, default 9; xz: 0-9, default 6).
         """
 
-        with open(file_name, mode="wb", encoding=encoding) as f:
+        with _open(file_name, 'wb', compression=compression, compression_level=compression_level) as f:
             f.write(contents)
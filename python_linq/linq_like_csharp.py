@@ -1,10 +1,23 @@
 # https://metanit.com/sharp/tutorial/15.1.php
 # https://github.com/rogerwcpt/python-linq-samples
-from itertools import groupby
+from heapq import merge, nlargest, nsmallest
+import pickle
+import sys
+import tempfile
+from itertools import chain, dropwhile, islice, takewhile
+from operator import itemgetter
+from threading import Lock
+from time import monotonic
+
+_NONE = object()
+_MANY = object()
 
 
 class List(list):
 
+    # hash indexes created by CreateIndex, by name
+    _indexes = None
+
     def Select(self, fun):
         """
         Defines the projection of the selected values by applying the specified function to each element of the collection.
@@ -39,82 +52,166 @@ class List(list):
                     output.append(fun_selector(x))
         return output
 
-    def Where(self, fun):
+    def Where(self, fun, equals=_NONE):
         """
         Defines a sampling filter by applying the specified function to each element of the collection.
 
         Args:
         - fun: The function that specifies the condition for the sampling filter.
+        - equals: If provided, fun is a key selector and the elements whose key equals this value are selected.
+        If an index was created with the same key selector, the elements are found in the index without a scan.
 
         Returns:
         A new list containing the elements of the collection that satisfy the specified condition.
+
+        Example:
+        # >>> rows.CreateIndex('id', get_id)
+        # >>> rows.Where(get_id, equals=42)
         """
 
-        return List(x for x in self if fun(x))
+        if equals is _NONE:
+            return List(x for x in self if fun(x))
+        index = self._find_index(fun)
+        if index is not None:
+            return List(self[i] for i in index.positions(self, equals))
+        return List(x for x in self if fun(x) == equals)
 
-    def GroupBy(self, fun_key_selector):
+    def GroupBy(self, fun_key_selector, fun_element_selector=None, fun_result_selector=None):
         """
         Groups elements by key using the specified key selector function.
+        Grouping is hash based and runs in a single pass, so the input does not need to be sorted.
+        Groups appear in the order in which their keys first occur.
 
         Args:
         - fun_key_selector: The function that selects the key for grouping the elements.
+        - fun_element_selector: The function that maps each element before it is put into its group.
+        - fun_result_selector: The function that receives the key and the List of values of a group
+        and produces the result for that group.
 
         Returns:
         A new list containing groups of elements,
-        where each group is represented by a dictionary with 'key' and 'values' fields.
+        where each group is represented by a dictionary with 'key' and 'values' fields
+        (or by the result of fun_result_selector, if it is provided).
+
+        Example:
+        # >>> List([1, 2, 3, 4]).GroupBy(lambda x: x % 2, fun_result_selector=lambda k, v: (k, v.Sum()))
+        [(1, 4), (0, 6)]
         """
 
-        output = []
-        for key, group in groupby(self, fun_key_selector):
-            group_ = {'key': key, 'values': List([x for x in group])}
-            output.append(group_)
-        return List(output)
+        return List(_group_by(self, fun_key_selector, fun_element_selector, fun_result_selector))
+
+    def GroupAggregate(self, fun_key_selector, aggregates):
+        """
+        Groups elements by key and computes aggregates for each group in a single pass,
+        without storing the elements of the groups.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the elements.
+        - aggregates (dict): Maps a result field name to an aggregate. An aggregate is one of the names
+        'count', 'sum', 'min', 'max', 'average', 'variance', or a tuple (name, selector) where the selector
+        picks the value to aggregate from each element.
+
+        Returns:
+        A new list with one dictionary per group, containing the 'key' field and one field per aggregate.
+
+        Example:
+        # >>> rows = List([{'id': 1, 'm': 6}, {'id': 2, 'm': 7}, {'id': 1, 'm': 8}])
+        # >>> rows.GroupAggregate(lambda r: r['id'], {'n': 'count', 'total': ('sum', lambda r: r['m'])})
+        [{'key': 1, 'n': 2, 'total': 14}, {'key': 2, 'n': 1, 'total': 7}]
+        """
+
+        return List(_group_aggregate(self, fun_key_selector, aggregates))
+
+    def ToLookup(self, fun_key_selector, fun_element_selector=None):
+        """
+        Builds a Lookup that maps each key to the elements that have it.
+        The Lookup can be queried any number of times with O(1) cost per key.
+
+        Args:
+        - fun_key_selector: The function that selects the key of each element.
+        - fun_element_selector: The function that maps each element before it is stored.
+
+        Returns:
+        - Lookup: The index of the elements by key.
+
+        Example:
+        # >>> lookup = List(['a', 'bb', 'cc']).ToLookup(len)
+        # >>> lookup[2]
+        ['bb', 'cc']
+        """
+
+        return Lookup(_hash_group(self, fun_key_selector, fun_element_selector))
 
     def Except(self, input_list):
         """
         Returns a sequence containing all the elements of the first sequence that are not in the second sequence.
+        The second sequence is hashed once and the elements of the first one are probed against it.
+
+        Args:
+        - input_list: The second sequence to be compared.
+
+        Returns:
+        A new list containing the elements of this list that are not present in the second list.
+        """
+
+        return List(_except(self, input_list, None))
+
+    def ExceptBy(self, input_list, fun_key_selector):
+        """
+        Returns the elements of this list whose keys do not occur among the keys of the second sequence.
+        The key selector is applied to the elements of both sequences; the second sequence is hashed once.
 
         Args:
-        - self: The first sequence to be compared.
         - input_list: The second sequence to be compared.
+        - fun_key_selector: The function that selects the comparison key of an element.
 
         Returns:
-        A sequence containing all the elements of the first sequence that are not present in the second sequence.
+        A new list containing the elements of this list whose keys are not present in the second list.
+
+        Example:
+        # >>> List([{'id': 1}, {'id': 2}]).ExceptBy([{'id': 2}], lambda x: x['id'])
+        [{'id': 1}]
         """
-        return List([x for x in self if x not in input_list])
 
-    def Single(self):
+        return List(_except(self, input_list, fun_key_selector))
+
+    def Single(self, fun=None):
         """
-        Selects a single element from the collection.
-        If the collection contains more or less than one element, an exception is thrown.
+        Selects a single element from the collection, or the single element that satisfies a condition.
+        If the collection contains more or less than one such element, an exception is thrown.
+        The scan stops as soon as a second matching element is found.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
         The single element from the collection.
 
         Raises:
-        - Exception: If the collection contains more than one element.
+        - Exception: If the collection contains more than one matching element.
+        - IndexError: If the collection contains no matching element.
         """
 
-        if len(self) > 1:
-            raise Exception("Sequence contains more than one element")
-        return self[0]
+        return _single_or_raise(self, fun)
 
-    def SingleOrDefault(self, default_value):
+    def SingleOrDefault(self, default_value, fun=None):
         """
-        Selects the first element of the collection or returns the default value if the collection is empty or contains
-        more than one element.
+        Selects the single element of the collection (or the single element that satisfies a condition),
+        or returns the default value if the collection does not contain exactly one such element.
+        The scan stops as soon as a second matching element is found.
 
         Args:
-        - default_value: The default value to be returned if the collection is empty or contains more than one element.
+        - default_value: The default value to be returned if the collection does not contain exactly one
+        matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
-        The first element of the collection or the default value.
+        The single matching element of the collection or the default value.
 
         """
 
-        if len(self) != 1:
-            return default_value
-        return self[0]
+        found = _single(self, fun)
+        return default_value if found is _NONE or found is _MANY else found
 
     def Join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
         """
@@ -129,31 +226,80 @@ class List(list):
 
         Returns:
         A list containing the result of the inner join operation.
+
+        The join is a hash join: the inner keys are hashed once and each outer key is probed against them,
+        so every key selector is called once per element. Keys must be hashable.
+        The order of the result is the order of the outer list, and for each outer element the order of the inner list.
         """
 
-        output = List()
-        for n in self:
-            for o in inner_list:
-                if fun_outher_key_selector(n) == fun_inner_key_selector(o):
-                    output.append(result_selector(n, o))
-        return output
+        return List(_join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector))
+
+    def GroupJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+        """
+        Correlates the elements of two lists based on key equality and groups the matching inner elements
+        for each outer element.
+
+        Args:
+        - inner_list: The second list to be joined.
+        - fun_outer_key_selector: A function that selects the key from the elements of the first list.
+        - fun_inner_key_selector: A function that selects the key from the elements of the second list.
+        - result_selector: A function that receives an outer element and the List of its matching inner elements
+        (empty if there are none).
+
+        Returns:
+        A list with one result for each element of the first list.
+
+        Example:
+        # >>> List([1, 2]).GroupJoin([1, 1, 3], lambda n: n, lambda o: o, lambda n, g: (n, g.Count()))
+        [(1, 2), (2, 0)]
+        """
+
+        return List(_group_join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector))
+
+    def LeftJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                 default_value=None):
+        """
+        Performs a left outer join operation, similar to the SQL left join, on two lists.
+
+        Args:
+        - inner_list: The second list to be joined.
+        - fun_outer_key_selector: A function that selects the key from the elements of the first list.
+        - fun_inner_key_selector: A function that selects the key from the elements of the second list.
+        - result_selector: A function that produces the result based on the matching elements from both lists.
+        - default_value: The inner element passed to result_selector for outer elements without a match.
+
+        Returns:
+        A list containing the result of the left join operation.
+
+        Example:
+        # >>> List([1, 2]).LeftJoin([1], lambda n: n, lambda o: o, lambda n, o: (n, o))
+        [(1, 1), (2, None)]
+        """
 
-    def Any(self, fun):
+        return List(_left_join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                               default_value))
+
+    def Any(self, fun=None):
         """
         Determines whether any element of the collection satisfies a given condition specified by the provided function.
+        The scan stops at the first element that satisfies the condition.
 
         Args:
         - fun: The function that specifies the condition to be satisfied.
+        If None, checks whether the collection contains any elements.
 
         Returns:
         True if at least one element satisfies the condition, otherwise False.
         """
 
-        return any([fun(x) for x in self])
+        if fun is None:
+            return len(self) > 0
+        return any(fun(x) for x in self)
 
     def All(self, fun):
         """
         Determines whether all elements of the collection satisfy a given condition specified by the provided function.
+        The scan stops at the first element that does not satisfy the condition.
 
         Args:
         - fun: The function that specifies the condition to be satisfied.
@@ -162,7 +308,7 @@ class List(list):
         True if the condition is satisfied for all elements, otherwise False.
         """
 
-        return all([fun(x) for x in self])
+        return all(fun(x) for x in self)
 
     def Contains(self, element):
         """
@@ -175,17 +321,38 @@ class List(list):
         True if the element is present in the collection, otherwise False.
         """
 
+        index = self._find_index(None)
+        if index is not None:
+            return bool(index.positions(self, element))
         return element in self
 
     def Distinct(self):
         """
-        Returns a new list containing the distinct elements of the collection.
+        Returns the distinct elements of the list in the order of their first occurrence.
+        Unhashable elements (such as dictionaries) are supported.
 
         Returns:
         A new list containing only the distinct elements of the collection.
         """
 
-        return List(list(set(self)))
+        return List(_distinct(self, None))
+
+    def DistinctBy(self, fun_key_selector):
+        """
+        Returns the first element of the list for each distinct key, in the order of their first occurrence.
+
+        Args:
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        A new list containing the first element for each distinct key.
+
+        Example:
+        # >>> List([{'id': 1, 'v': 'a'}, {'id': 1, 'v': 'b'}]).DistinctBy(lambda x: x['id'])
+        [{'id': 1, 'v': 'a'}]
+        """
+
+        return List(_distinct(self, fun_key_selector))
 
     def Concat(self, input_list):
         """
@@ -202,21 +369,36 @@ class List(list):
 
     def Intersect(self, input_list):
         """
-        Returns a new list containing the intersection of two collections, that is,
-        those elements that appear in both collections.
+        Returns the distinct elements that appear in both sequences, in the order of this list.
 
         Args:
-        - input_list: The second collection to find the intersection with the current collection.
+        - input_list: The second sequence to find the intersection with.
 
         Returns:
         A new list containing the elements that appear in both the current collection and the input collection.
         """
 
-        return List(set(self).intersection((set(input_list))))
+        return List(_intersect(self, input_list, None))
+
+    def IntersectBy(self, input_list, fun_key_selector):
+        """
+        Returns the first element of this list for each distinct key that also occurs among the keys
+        of the second sequence. The key selector is applied to the elements of both sequences.
+
+        Args:
+        - input_list: The second sequence to find the intersection with.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        A new list containing the first element for each distinct key that also occurs in the second list.
+        """
+
+        return List(_intersect(self, input_list, fun_key_selector))
 
     def Count(self, fun=None):
         """
         Counts the number of elements of a collection that satisfy a certain condition.
+        No intermediate list is built.
 
         Args:
         - fun: The condition function used to determine which elements to count.
@@ -232,13 +414,15 @@ class List(list):
 
         if fun is None:
             return len(self)
-        else:
-            return len([x for x in self if fun(x)])
+        return sum(1 for x in self if fun(x))
 
-    def Sum(self):
+    def Sum(self, selector=None):
         """
         Calculates the sum of numeric values in a collection.
 
+        Args:
+        - selector: The function that selects the value to sum from each element.
+
         Returns:
         - The sum of numeric values in the collection.
 
@@ -248,12 +432,15 @@ class List(list):
         15
         """
 
-        return sum(self)
+        return sum(self) if selector is None else sum(selector(x) for x in self)
 
-    def Average(self):
+    def Average(self, selector=None):
         """
         Calculates the average of the numeric values in a collection.
 
+        Args:
+        - selector: The function that selects the value to average from each element.
+
         Returns:
         - The average of the numeric values in the collection.
 
@@ -261,14 +448,23 @@ class List(list):
         # >>> lst = List([1, 2, 3, 4, 5])
         # >>> lst.Average()
         3.0
+
+        Raises:
+        - ValueError: If the collection is empty.
         """
 
-        return sum(self) / float(len(self))
+        if len(self) == 0:
+            raise ValueError("Sequence contains no elements")
+        return self.Sum(selector) / float(len(self))
 
-    def Min(self):
+    def Min(self, fun=None, selector=None):
         """
         Finds the minimum value in the collection.
 
+        Args:
+        - fun: If provided, the element with the smallest fun(element) is returned (the same as MinBy).
+        - selector: If provided, the smallest selector(element) value is returned.
+
         Returns:
         - The minimum value in the collection.
 
@@ -278,9 +474,13 @@ class List(list):
         1
         """
 
-        return min(self)
+        if selector is not None:
+            return min(selector(x) for x in self)
+        if fun is None:
+            return min(self)
+        return min(self, key=fun)
 
-    def Max(self, fun=None):
+    def Max(self, fun=None, selector=None):
         """
         The function Max takes an optional argument fun and returns the maximum value from a given input.
         If the fun argument is not provided, it returns the maximum value from the input.
@@ -288,6 +488,7 @@ class List(list):
 
         Args:
         - fun: The condition function used to determine which elements to count.
+        - selector: If provided, the greatest selector(element) value is returned.
 
         Example:
         # Create a list of numbers
@@ -300,12 +501,109 @@ class List(list):
         # Using the Max function with a custom function
         max_value_custom = Max(numbers, fun=lambda x: x % 2)
         print(max_value_custom)  # Output: 8
+
+        # Using the Max function with a selector
+        max_value_selected = Max(numbers, selector=lambda x: -x)
+        print(max_value_selected)  # Output: -3
         """
+        if selector is not None:
+            return max(selector(x) for x in self)
         if fun is None:
             return max(self)
         else:
             return max(self, key=fun)
 
+    def MinBy(self, fun_key_selector):
+        """
+        Returns the element with the smallest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the smallest key.
+
+        Example:
+        # >>> List([{'n': 'a', 'v': 3}, {'n': 'b', 'v': 1}]).MinBy(lambda x: x['v'])
+        {'n': 'b', 'v': 1}
+        """
+
+        return min(self, key=fun_key_selector)
+
+    def MaxBy(self, fun_key_selector):
+        """
+        Returns the element with the greatest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the greatest key.
+
+        Example:
+        # >>> List([{'n': 'a', 'v': 3}, {'n': 'b', 'v': 1}]).MaxBy(lambda x: x['v'])
+        {'n': 'a', 'v': 3}
+        """
+
+        return max(self, key=fun_key_selector)
+
+    def Aggregate(self, seed, func, result_selector=None):
+        """
+        Applies an accumulator function over the collection.
+
+        Args:
+        - seed: The initial accumulator value.
+        - func: The function that receives the accumulator and an element and returns the new accumulator.
+        - result_selector: The function that transforms the final accumulator into the result.
+
+        Returns:
+        The final accumulator value, transformed by result_selector if it is provided.
+
+        Example:
+        # >>> List([1, 2, 3]).Aggregate(1, lambda acc, x: acc * x, lambda acc: acc * 10)
+        60
+        """
+
+        return _aggregate(self, seed, func, result_selector)
+
+    def Stats(self, selector=None):
+        """
+        Computes the count, sum, minimum, maximum, average and variance of the values in a single pass.
+        The variance is computed with Welford's algorithm, which stays accurate for large values.
+
+        Args:
+        - selector: The function that selects the value from each element.
+
+        Returns:
+        - dict: The fields 'count', 'sum', 'min', 'max', 'average', 'variance' (population variance)
+        and 'sample_variance'. For an empty collection all fields except 'count' and 'sum' are None.
+
+        Example:
+        # >>> List([2, 4, 4, 4, 5, 5, 7, 9]).Stats()
+        {'count': 8, 'sum': 40, 'min': 2, 'max': 9, 'average': 5.0, 'variance': 4.0, 'sample_variance': 4.571428571428571}
+        """
+
+        return _stats(self, selector)
+
+    def AggregateMany(self, aggregates):
+        """
+        Computes several aggregates in a single pass over the collection.
+
+        Args:
+        - aggregates (dict): Maps a result field name to one of 'count', 'sum', 'min', 'max', 'average', 'variance',
+        or to a tuple (name, selector) where the selector picks the value to aggregate from each element.
+
+        Returns:
+        - dict: One field per aggregate.
+
+        Example:
+        # >>> rows = List([{'m': 6}, {'m': 8}])
+        # >>> rows.AggregateMany({'n': 'count', 'top': ('max', lambda r: r['m'])})
+        {'n': 2, 'top': 8}
+        """
+
+        return _aggregate_many(self, aggregates)
+
     def Take(self, count_of_elements):
         """
         Selects a certain number of elements from the beginning of the collection.
@@ -386,38 +684,52 @@ class List(list):
             if fun(n) == False:
                 return List(self[i:])
 
-    def First(self):
+    def First(self, fun=None):
         """
-        Selects the first element of the collection.
+        Selects the first element of the collection, or the first element that satisfies a condition.
+        The scan stops at the first matching element.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
-        - The first element of the collection.
+        - The first matching element of the collection.
+
+        Raises:
+        - IndexError: If the collection contains no matching element.
 
         Example:
         # >>> lst = List([1, 2, 3, 4, 5])
-        # >>> lst.First()
-        1
+        # >>> lst.First(lambda x: x > 2)
+        3
         """
 
-        return self[0]
+        if fun is None:
+            return self[0]
+        return _first_or_raise(self, fun)
 
-    def FirstOrDefault(self, default_value):
+    def FirstOrDefault(self, default_value, fun=None):
         """
-        Selects the first element of the collection or returns the default value if the collection is empty.
+        Selects the first element of the collection (or the first element that satisfies a condition)
+        or returns the default value if there is no such element.
 
         Args:
-        - default_value: The default value to return if the collection is empty.
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
-        - The first element of the collection, or the default value if the collection is empty.
+        - The first matching element of the collection, or the default value.
 
         Example:
         # >>> lst = List([1, 2, 3])
-        # >>> lst.FirstOrDefault(0)
-        1
+        # >>> lst.FirstOrDefault(0, lambda x: x > 5)
+        0
         """
 
-        return self[0] if len(self) > 0 else default_value
+        if fun is None:
+            return self[0] if len(self) > 0 else default_value
+        found = _first(self, fun)
+        return default_value if found is _NONE else found
 
     def ElementAt(self, element_index):
         """
@@ -456,30 +768,41 @@ class List(list):
 
         return self[element_index] if element_index < len(self) else default_value
 
-    def Last(self):
+    def Last(self, fun=None):
         """
-        Returns the last element of the collection.
+        Returns the last element of the collection, or the last element that satisfies a condition.
+        The collection is scanned from the end, so the scan stops at the last matching element.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
-        - The last element of the collection.
+        - The last matching element of the collection.
+
+        Raises:
+        - IndexError: If the collection contains no matching element.
 
         Example:
         # >>> lst = List([1, 2, 3, 4, 5])
-        # >>> lst.Last()
-        5
+        # >>> lst.Last(lambda x: x % 2 == 0)
+        4
         """
 
-        return self[-1]
+        if fun is None:
+            return self[-1]
+        return _first_or_raise(reversed(self), fun)
 
-    def LastOrDefault(self, default_value):
+    def LastOrDefault(self, default_value, fun=None):
         """
-        Returns the last element of the collection or the default value if the collection is empty.
+        Returns the last element of the collection (or the last element that satisfies a condition)
+        or the default value if there is no such element.
 
         Args:
-        - default_value: The default value to return if the collection is empty.
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
 
         Returns:
-        - The last element of the collection, or the default value if the collection is empty.
+        - The last matching element of the collection, or the default value.
 
         Example:
         # >>> lst = List([1, 2, 3])
@@ -487,58 +810,57 @@ class List(list):
         3
         """
 
-        return self[-1] if len(self) > 0 else default_value
+        if fun is None:
+            return self[-1] if len(self) > 0 else default_value
+        found = _first(reversed(self), fun)
+        return default_value if found is _NONE else found
 
     def OrderBy(self, fun=None):
         """
         Arranges elements in ascending order.
+        The list is not modified: the result is a lazy sorted view that is sorted when it is enumerated,
+        and can be refined with ThenBy/ThenByDescending.
 
         Args:
         - fun: The function used to specify the sorting order.
 
         Returns:
-        - The list arranged in ascending order.
+        - OrderedEnumerable: The elements arranged in ascending order.
 
         Example:
         # >>> lst = List([3, 1, 2])
-        # >>> lst.OrderBy()
+        # >>> lst.OrderBy().ToList()
         [1, 2, 3]
         """
 
-        if fun is None:
-            self.sort()
-        else:
-            self.sort(key=fun)
-        return self
+        return OrderedEnumerable(self, ((fun, False),))
 
     def OrderByDescending(self, fun=None):
         """
         Arranges elements in descending order.
+        The list is not modified: the result is a lazy sorted view that is sorted when it is enumerated,
+        and can be refined with ThenBy/ThenByDescending.
 
         Args:
         - fun: The function used to specify the sorting order.
 
         Returns:
-        - The list arranged in descending order.
+        - OrderedEnumerable: The elements arranged in descending order.
 
         Example:
         # >>> lst = List([3, 1, 2])
-        # >>> lst.OrderByDescending()
+        # >>> lst.OrderByDescending().ToList()
         [3, 2, 1]
         """
 
-        if fun is None:
-            self.sort(reverse=True)
-        else:
-            self.sort(reverse=True, key=fun)
-        return self
+        return OrderedEnumerable(self, ((fun, True),))
 
     def Reverse(self):
         """
-        Arranges elements in reverse order.
+        Arranges elements in reverse order. The list is not modified.
 
         Returns:
-        - The list arranged in reverse order.
+        - A new list with the elements in reverse order.
 
         Example:
         # >>> lst = List([1, 2, 3])
@@ -546,8 +868,7 @@ class List(list):
         [3, 2, 1]
         """
 
-        self.reverse()
-        return self
+        return List(reversed(self))
 
     def Zip(self, second_list, fun_result_selector):
         """
@@ -588,6 +909,97 @@ class List(list):
 
         return self
 
+    def AsEnumerable(self):
+        """
+        Returns a lazily evaluated view of the list.
+        Operators chained on the result are not executed until the sequence is enumerated.
+
+        Returns:
+        - Enumerable: A lazy sequence over the elements of the list.
+
+        Example:
+        # >>> lst = List([1, 2, 3, 4, 5])
+        # >>> lst.AsEnumerable().Select(lambda x: x * 2).Take(2).ToList()
+        [2, 4]
+        """
+
+        return Enumerable(self)
+
+    def AsParallel(self, workers=None, backend="process", chunk_size=None):
+        """
+        Returns a query whose Select, Where and SelectMany stages run on a pool of processes or threads.
+
+        Args:
+        - workers (int): The number of workers (default is the number of CPUs).
+        - backend (str): "process" for CPU-bound functions or "thread" for functions that release the GIL.
+        - chunk_size (int): The number of elements sent to a worker at once (default is about four chunks per worker).
+
+        Returns:
+        - ParallelQuery: The parallel query over the list.
+
+        Example:
+        # >>> List(range(5)).AsParallel(backend="thread").AsOrdered().Select(lambda x: x * 2).ToList()
+        [0, 2, 4, 6, 8]
+        """
+
+        from python_linq.parallel_like_csharp import ParallelQuery
+        return ParallelQuery(self, workers, backend, chunk_size)
+
+    def AsNumeric(self, dtype='d'):
+        """
+        Copies the numbers of the list into a contiguous buffer with vectorized aggregates
+        (NumPy if it is installed, otherwise the standard array module).
+
+        Args:
+        - dtype (str): The type code of the values, for example 'd' (float64) or 'q' (int64).
+
+        Returns:
+        - NumericList: The numbers of the list.
+
+        Example:
+        # >>> List([1, 2, 3, 4]).AsNumeric('q').Count('>', 2)
+        2
+        """
+
+        from python_linq.numeric_like_csharp import NumericList
+        return NumericList(self, dtype)
+
+    def ToColumnar(self):
+        """
+        Copies a list of dictionaries into a column-wise record store with field-based operators.
+
+        Returns:
+        - RecordList: The records stored column-wise.
+
+        Example:
+        # >>> List([{'id': 1, 'm': 6}, {'id': 2, 'm': 7}]).ToColumnar().Where('m', '>', 6).Select('id')
+        [2]
+        """
+
+        from python_linq.columnar_like_csharp import RecordList
+        return RecordList.FromRecords(self)
+
+    def WithProfiling(self, hook=None):
+        """
+        Returns a profiled view of the list. Every operator called on it, and on the sequences it returns,
+        records its wall time, rows in and out, and the number of calls of the functions passed to it.
+        Lists that are not profiled run without any instrumentation.
+
+        Args:
+        - hook: A function called with each OperatorProfile as soon as it is recorded,
+        for example to forward the measurements to a metrics system.
+
+        Returns:
+        - ProfiledQuery: The profiled list. Call Explain() on any sequence of the chain to see the report.
+
+        Example:
+        # >>> query = List(range(1000)).WithProfiling().Select(lambda x: x * 2).Where(lambda x: x > 10)
+        # >>> print(query.Explain())
+        """
+
+        from python_linq.profiling_like_csharp import ProfiledQuery, QueryProfile
+        return ProfiledQuery(self, QueryProfile(hook))
+
     def ForEach(self, fun):
         """
         Applies a function to each element of the list.
@@ -606,6 +1018,62 @@ class List(list):
         for n in self:
             fun(n)
 
+    def Chunk(self, size):
+        """
+        Lazily splits the list into chunks of a fixed size. Each chunk is sliced only when it is reached,
+        so the rest of the list is never copied; the last chunk may be shorter.
+
+        Args:
+        - size (int): The number of elements in a chunk.
+
+        Returns:
+        - Enumerable: A lazy sequence of Lists.
+
+        Example:
+        # >>> List([1, 2, 3, 4, 5]).Chunk(2).ToList()
+        [[1, 2], [3, 4], [5]]
+        """
+
+        return Enumerable(_Deferred(_chunk, (self, _positive(size))))
+
+    def Batch(self, size, max_bytes=None, max_wait=None):
+        """
+        Lazily groups the elements into batches that are closed when any limit is reached.
+
+        Args:
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch, counted as len() for strings and bytes
+        and sys.getsizeof() for other elements. A single larger element forms a batch of its own.
+        - max_wait (float): The maximum number of seconds between the first element of a batch and the element
+        that closes it. The time is checked as elements arrive, so a slow source closes a batch on the next element.
+
+        Returns:
+        - Enumerable: A lazy sequence of Lists.
+
+        Example:
+        # >>> List(["ab", "cd", "efg"]).Batch(10, max_bytes=4).ToList()
+        [['ab', 'cd'], ['efg']]
+        """
+
+        return Enumerable(_Deferred(_batch, (self, _positive(size), max_bytes, max_wait)))
+
+    def ForEachBatch(self, fun, size=1000, max_bytes=None, max_wait=None):
+        """
+        Applies a function to batches of elements, for example to insert or write them in bulk.
+
+        Args:
+        - fun: The function to be applied to each batch (a List).
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch (see Batch).
+        - max_wait (float): The maximum number of seconds a batch is kept open (see Batch).
+
+        Example:
+        # >>> lines.ForEachBatch(lambda batch: File.AppendAllLines("out.txt", batch), size=10000)
+        """
+
+        for batch in _batch(self, _positive(size), max_bytes, max_wait):
+            fun(batch)
+
     def Add(self, new_element):
         """
         Adds a new element to the list.
@@ -614,7 +1082,11 @@ class List(list):
         - new_element: The new element to be added to the list.
         """
 
+        if self._indexes:
+            self._check_indexes((new_element,))
         self.append(new_element)
+        if self._indexes:
+            self._index_inserted(len(self) - 1, (new_element,))
 
     def AddRange(self, input_list):
         """
@@ -627,12 +1099,14 @@ class List(list):
         - ValueError: If the input is not a valid list or List object.
         """
 
-        if type(input_list) is list:
-            self.extend(input_list)
-        if type(input_list) is List:
-            self.extend(input_list.ToPythonList())
-        else:
+        if type(input_list) is not list and type(input_list) is not List:
             raise ValueError()
+        if self._indexes:
+            self._check_indexes(input_list)
+        start = len(self)
+        self.extend(input_list)
+        if self._indexes:
+            self._index_inserted(start, self[start:])
 
     def IndexOf(self, element):
         """
@@ -643,9 +1117,18 @@ class List(list):
 
         Returns:
         - int: The index of the first occurrence of the element.
+
+        Raises:
+        - ValueError: If the element is not in the list.
         """
 
-        self.index(element)
+        index = self._find_index(None)
+        if index is not None:
+            positions = index.positions(self, element)
+            if not positions:
+                raise ValueError("{!r} is not in list".format(element))
+            return positions[0]
+        return self.index(element)
 
     def Insert(self, index, element):
         """
@@ -656,7 +1139,13 @@ class List(list):
         - element: The element to be inserted.
         """
 
+        if not self._indexes:
+            self.insert(index, element)
+            return
+        self._check_indexes((element,))
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
         self.insert(index, element)
+        self._index_inserted(index, (element,))
 
     def Remove(self, element):
         """
@@ -666,7 +1155,10 @@ class List(list):
         - element: The element to be removed.
         """
 
-        self.remove(element)
+        if self._indexes:
+            self.RemoveAt(self.IndexOf(element))
+        else:
+            self.remove(element)
 
     def RemoveAt(self, index):
         """
@@ -676,17 +1168,2180 @@ class List(list):
         - index (int): The index of the element to be removed.
         """
 
-        del self[index]
+        if not self._indexes:
+            del self[index]
+            return
+        if index < 0:
+            index += len(self)
+        element = self.pop(index)
+        for hash_index in self._indexes.values():
+            hash_index.removed(index, element, len(self))
+
+    def CreateIndex(self, name, key_selector=None, unique=False):
+        """
+        Creates a hash index on the keys of the elements. The index is kept up to date by Add, AddRange, Insert,
+        Remove and RemoveAt (changes made with the methods of the Python list, such as append, are not tracked)
+        and is used by Lookup, by Where(key_selector, equals=key) and, for an index without key selector,
+        by Contains and IndexOf.
+
+        Args:
+        - name (str): The name of the index.
+        - key_selector: The function that selects the key of an element. If None, the element itself is the key.
+        - unique (bool): If True, adding an element whose key is already in the list raises ValueError.
+
+        Raises:
+        - ValueError: If the index is unique and the list already contains duplicate keys.
+
+        Example:
+        # >>> users.CreateIndex('id', lambda u: u['id'], unique=True)
+        # >>> users.Lookup('id', 42)
+        [{'id': 42, 'name': 'Ann'}]
+        """
+
+        index = _HashIndex(key_selector, unique)
+        index.positions(self, None)
+        if self._indexes is None:
+            self._indexes = {}
+        self._indexes[name] = index
+
+    def DropIndex(self, name):
+        """
+        Removes an index created by CreateIndex.
+
+        Args:
+        - name (str): The name of the index.
+        """
+
+        if self._indexes and name in self._indexes:
+            del self._indexes[name]
+
+    def Lookup(self, name, key):
+        """
+        Returns the elements with the specified key using an index created by CreateIndex.
+
+        Args:
+        - name (str): The name of the index.
+        - key: The key to look up.
+
+        Returns:
+        - List: The elements with the key, in list order.
+
+        Raises:
+        - KeyError: If there is no index with that name.
+        """
+
+        try:
+            index = (self._indexes or {})[name]
+        except KeyError:
+            raise KeyError("Unknown index '{}'".format(name))
+        return List(self[i] for i in index.positions(self, key))
+
+    def _find_index(self, key_selector):
+        if self._indexes:
+            for index in self._indexes.values():
+                if index.key is key_selector:
+                    return index
+        return None
+
+    def _check_indexes(self, elements):
+        for index in self._indexes.values():
+            if index.unique:
+                index.check(self, elements)
+
+    def _index_inserted(self, start, elements):
+        appended = start + len(elements) == len(self)
+        for index in self._indexes.values():
+            index.inserted(start, elements, appended)
+
+    def _invalidate_indexes(self):
+        for index in self._indexes.values():
+            index.invalidate()
 
     def Union(self, second_list):
         """
-        Returns a new list containing the union of elements from two source lists.
+        Returns the distinct elements of both sequences in the order of their first occurrence.
 
         Args:
-        - second_list (list): The second list to form the union with.
+        - second_list: The second sequence to form the union with.
 
         Returns:
         - list: A new list containing the union of elements from both lists.
         """
 
-        return List(list(set(self + second_list)))
+        return List(_union(self, second_list, None))
+
+    def UnionBy(self, second_list, fun_key_selector):
+        """
+        Returns the first element for each distinct key of both sequences, in the order of their first occurrence.
+
+        Args:
+        - second_list: The second sequence to form the union with.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        A new list containing the first element for each distinct key of both lists.
+        """
+
+        return List(_union(self, second_list, fun_key_selector))
+
+
+class _Deferred:
+    """
+    Re-iterable wrapper around a generator function, so that every enumeration of a pipeline starts over.
+    """
+
+    __slots__ = ('_generator', '_args', '_version')
+
+    def __init__(self, generator, args, version=None):
+        self._generator = generator
+        self._args = args
+        # function returning the current version of the source (for example the mtime of a file), used by Cached
+        self._version = version
+
+    def __iter__(self):
+        return self._generator(*self._args)
+
+
+class _Memoized:
+    """
+    Buffers the elements of a source as they are first enumerated. Every enumeration, including concurrent ones
+    from other threads, replays the buffer and only pulls from the source the elements nobody has read yet.
+    """
+
+    __slots__ = ('_source', '_iterator', '_buffer', '_done', '_error', '_lock')
+
+    def __init__(self, source):
+        self._source = source
+        self._iterator = None
+        self._buffer = []
+        self._done = False
+        self._error = None
+        self._lock = Lock()
+
+    def _fill(self, index):
+        with self._lock:
+            while len(self._buffer) <= index and not self._done:
+                if self._error is not None:
+                    raise self._error
+                if self._iterator is None:
+                    self._iterator = iter(self._source)
+                try:
+                    self._buffer.append(next(self._iterator))
+                except StopIteration:
+                    self._done = True
+                    self._iterator = None
+                except Exception as e:
+                    self._error = e
+                    raise
+            return index < len(self._buffer)
+
+    def __iter__(self):
+        buffer = self._buffer
+        i = 0
+        while i < len(buffer) or self._fill(i):
+            yield buffer[i]
+            i += 1
+
+
+class _Shared:
+    """
+    A single enumeration of a source shared by all consumers: each element is read from the source once
+    and handed to whichever consumer asks for the next element.
+    """
+
+    __slots__ = ('_source', '_iterator', '_lock')
+
+    def __init__(self, source):
+        self._source = source
+        self._iterator = None
+        self._lock = Lock()
+
+    def _next(self):
+        with self._lock:
+            if self._iterator is None:
+                self._iterator = iter(self._source)
+            return next(self._iterator, _NONE)
+
+    def __iter__(self):
+        while True:
+            x = self._next()
+            if x is _NONE:
+                return
+            yield x
+
+
+_KEYABLE_SOURCES = (tuple, range, str, bytes, frozenset)
+
+# how deep functions that call other functions are described before they are compared by identity instead
+_FUNCTION_KEY_DEPTH = 4
+
+
+class _Identity:
+    """
+    Compares an unhashable object by identity, so that it can be part of a cache key.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return isinstance(other, _Identity) and self.value is other.value
+
+    def __hash__(self):
+        return id(self.value)
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, 'co_names'):
+            names |= _global_names(const)
+    return names
+
+
+def _value_key(value, depth):
+    if hasattr(value, '__code__') or hasattr(value, '__func__'):
+        return _function_key(value, depth)
+    if isinstance(value, tuple):
+        return tuple(_value_key(x, depth) for x in value)
+    try:
+        hash(value)
+    except TypeError:
+        return _Identity(value)
+    return value
+
+
+def _function_key(fun, depth=0):
+    """
+    Describes a Python function by what it computes instead of by its identity: its code, the values of the
+    variables it closes over, its default arguments and the values of the global names it reads. An inline
+    lambda created again each time a query is built therefore gets the same key as long as it sees the same
+    values. Unhashable values (a list, a dict, ...) are compared by identity, so changes made to them in place
+    are not detected. Other callables (builtins, itemgetter, ...) are compared as they are.
+    """
+
+    if depth >= _FUNCTION_KEY_DEPTH:
+        return _Identity(fun)
+    if hasattr(fun, '__func__'):
+        return _function_key(fun.__func__, depth + 1), _value_key(fun.__self__, depth + 1)
+    code = getattr(fun, '__code__', None)
+    if code is None:
+        return fun
+    try:
+        closure = tuple(_value_key(cell.cell_contents, depth + 1) for cell in fun.__closure__ or ())
+    except ValueError:
+        # a variable of the closure is not assigned yet
+        return _Identity(fun)
+    namespace = getattr(fun, '__globals__', {})
+    names = tuple(sorted((name, _value_key(namespace[name], depth + 1))
+                         for name in _global_names(code) if name in namespace))
+    kwdefaults = tuple(sorted((fun.__kwdefaults__ or {}).items()))
+    return code, closure, _value_key(fun.__defaults__, depth + 1), _value_key(kwdefaults, depth + 1), names
+
+
+def _argument_key(arg, versions):
+    """
+    Describes an argument of a pipeline stage: nested pipelines and functions are described recursively,
+    also inside tuples, lists and dictionaries (for example the orderings of OrderBy or the aggregates of
+    GroupAggregate); lists and dictionaries are described by their current content.
+    """
+
+    if isinstance(arg, (Enumerable, _Deferred)):
+        return _pipeline_key(arg, versions)
+    if callable(arg) and not isinstance(arg, type):
+        return _function_key(arg)
+    if isinstance(arg, (tuple, list)):
+        parts = tuple(_argument_key(x, versions) for x in arg)
+        if any(part is _NONE for part in parts):
+            return _NONE
+        return parts if isinstance(arg, tuple) else (list, parts)
+    if isinstance(arg, dict):
+        items = tuple((name, _argument_key(value, versions)) for name, value in arg.items())
+        if any(value is _NONE for _, value in items):
+            return _NONE
+        return dict, items
+    return arg
+
+
+def _pipeline_key(iterable, versions):
+    """
+    Describes a lazy pipeline as a hashable tuple of its generators and arguments. Functions are described by
+    _function_key, so a query built again from equivalent functions, including inline lambdas, gets the same key.
+    The versions of the sources are appended to versions. Returns _NONE if a stage or a source cannot
+    be described, for example a List source, which can change without notice.
+    """
+
+    if isinstance(iterable, Enumerable):
+        iterable = iterable._iterable
+    if isinstance(iterable, _Deferred):
+        if iterable._version is not None:
+            versions.append(iterable._version())
+        parts = [iterable._generator]
+        for arg in iterable._args:
+            parts.append(_argument_key(arg, versions))
+        key = tuple(parts)
+        if any(part is _NONE for part in parts):
+            return _NONE
+        try:
+            hash(key)
+        except TypeError:
+            return _NONE
+        return key
+    if isinstance(iterable, _KEYABLE_SOURCES):
+        return iterable
+    return _NONE
+
+
+def _cached(source, key, cache):
+    # the key and the versions of the file sources are taken at enumeration, so a changed file is read again
+    versions = []
+    pipeline = _pipeline_key(source, versions)
+    return iter(cache.GetOrAdd((pipeline if key is None else key, tuple(versions)), source.ToPythonList))
+
+
+class _HashIndex:
+    """
+    Maps the keys of the elements of a List to their positions, in ascending order. Appending and removing
+    the last element update it in place; other changes shift positions, so it is rebuilt on next use instead.
+    """
+
+    __slots__ = ('key', 'unique', '_positions')
+
+    def __init__(self, key, unique):
+        self.key = key
+        self.unique = unique
+        self._positions = None
+
+    def _key(self, element):
+        return element if self.key is None else self.key(element)
+
+    def _build(self, items):
+        positions = {}
+        keys = items if self.key is None else map(self.key, items)
+        for i, key in enumerate(keys):
+            group = positions.get(key)
+            if group is None:
+                positions[key] = [i]
+            elif self.unique:
+                raise ValueError("Duplicate key {!r} in unique index".format(key))
+            else:
+                group.append(i)
+        self._positions = positions
+
+    def positions(self, items, key):
+        if self._positions is None:
+            self._build(items)
+        try:
+            return self._positions.get(key, ())
+        except TypeError:  # an unhashable key cannot be in the index
+            return ()
+
+    def invalidate(self):
+        self._positions = None
+
+    def check(self, items, elements):
+        seen = set()
+        for element in elements:
+            key = self._key(element)
+            if key in seen or self.positions(items, key):
+                raise ValueError("Duplicate key {!r} in unique index".format(key))
+            seen.add(key)
+
+    def inserted(self, start, elements, appended):
+        if self._positions is None:
+            return
+        if not appended:
+            self._positions = None
+            return
+        for i, element in enumerate(elements, start):
+            key = self._key(element)
+            if key in self._positions:
+                self._positions[key].append(i)
+            else:
+                self._positions[key] = [i]
+
+    def removed(self, index, element, length):
+        if self._positions is None:
+            return
+        if index != length:
+            self._positions = None
+            return
+        key = self._key(element)
+        positions = self._positions[key]
+        positions.pop()
+        if not positions:
+            del self._positions[key]
+
+
+class _KeySet:
+    """
+    Set of keys used by the set operators. Hashable keys are kept in a set; unhashable ones (such as
+    dictionaries) fall back to a list, so they still work, with linear lookups.
+    """
+
+    __slots__ = ('_hashed', '_unhashable')
+
+    def __init__(self, keys=()):
+        self._hashed = set()
+        self._unhashable = []
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        try:
+            return key in self._hashed
+        except TypeError:
+            return key in self._unhashable
+
+    def add(self, key):
+        """
+        Adds the key and returns True if it was not in the set yet.
+        """
+
+        try:
+            if key in self._hashed:
+                return False
+            self._hashed.add(key)
+        except TypeError:
+            if key in self._unhashable:
+                return False
+            self._unhashable.append(key)
+        return True
+
+
+def _first(source, fun):
+    if fun is None:
+        for x in source:
+            return x
+    else:
+        for x in source:
+            if fun(x):
+                return x
+    return _NONE
+
+
+def _first_or_raise(source, fun):
+    found = _first(source, fun)
+    if found is _NONE:
+        raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+    return found
+
+
+def _last(source, fun):
+    found = _NONE
+    if fun is None:
+        for found in source:
+            pass
+    else:
+        for x in source:
+            if fun(x):
+                found = x
+    return found
+
+
+def _single(source, fun):
+    found = _NONE
+    for x in source:
+        if fun is None or fun(x):
+            if found is not _NONE:
+                return _MANY
+            found = x
+    return found
+
+
+def _single_or_raise(source, fun):
+    found = _single(source, fun)
+    if found is _MANY:
+        raise Exception("Sequence contains more than one element")
+    if found is _NONE:
+        raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+    return found
+
+
+def _select(source, fun):
+    for x in source:
+        yield fun(x)
+
+
+def _select_many(source, fun_selector):
+    for n in source:
+        for x in n:
+            yield x if fun_selector is None else fun_selector(x)
+
+
+def _where(source, fun):
+    for x in source:
+        if fun(x):
+            yield x
+
+
+def _where_equals(source, fun_key_selector, value):
+    for x in source:
+        if fun_key_selector(x) == value:
+            yield x
+
+
+def _hash_group(source, fun_key_selector, fun_element_selector=None):
+    groups = {}
+    for x in source:
+        key = fun_key_selector(x)
+        value = x if fun_element_selector is None else fun_element_selector(x)
+        if key in groups:
+            groups[key].append(value)
+        else:
+            groups[key] = List([value])
+    return groups
+
+
+def _group_by(source, fun_key_selector, fun_element_selector, fun_result_selector):
+    for key, values in _hash_group(source, fun_key_selector, fun_element_selector).items():
+        if fun_result_selector is None:
+            yield {'key': key, 'values': values}
+        else:
+            yield fun_result_selector(key, values)
+
+
+class _CountAggregate:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, x):
+        self.value += 1
+
+    def merge(self, other):
+        self.value += other.value
+
+    def result(self):
+        return self.value
+
+
+class _SumAggregate:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, x):
+        self.value += x
+
+    def merge(self, other):
+        self.value += other.value
+
+    def result(self):
+        return self.value
+
+
+class _MinAggregate:
+    __slots__ = ('value', 'empty')
+
+    def __init__(self):
+        self.value = None
+        self.empty = True
+
+    def add(self, x):
+        if self.empty or x < self.value:
+            self.value = x
+            self.empty = False
+
+    def merge(self, other):
+        if not other.empty:
+            self.add(other.value)
+
+    def result(self):
+        return self.value
+
+
+class _MaxAggregate(_MinAggregate):
+    __slots__ = ()
+
+    def add(self, x):
+        if self.empty or x > self.value:
+            self.value = x
+            self.empty = False
+
+
+class _AverageAggregate:
+    __slots__ = ('total', 'count')
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def add(self, x):
+        self.total += x
+        self.count += 1
+
+    def merge(self, other):
+        self.total += other.total
+        self.count += other.count
+
+    def result(self):
+        return self.total / float(self.count) if self.count else None
+
+
+class _VarianceAggregate:
+    """
+    Population variance with Welford's online algorithm.
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        # Chan et al.: combines the moments of two disjoint parts
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    def result(self):
+        return self.m2 / self.count if self.count else None
+
+
+_AGGREGATES = {
+    'count': _CountAggregate,
+    'sum': _SumAggregate,
+    'min': _MinAggregate,
+    'max': _MaxAggregate,
+    'average': _AverageAggregate,
+    'variance': _VarianceAggregate,
+}
+
+
+def _parse_aggregates(aggregates):
+    parsed = []
+    for name, spec in aggregates.items():
+        kind, selector = (spec, None) if isinstance(spec, str) else spec
+        if kind not in _AGGREGATES:
+            raise ValueError("Unknown aggregate '{}'".format(kind))
+        parsed.append((name, _AGGREGATES[kind], selector))
+    return parsed
+
+
+def _group_states(source, fun_key_selector, parsed):
+    """
+    Returns the aggregate states of each group. The states of disjoint parts of a sequence can be merged.
+    """
+
+    groups = {}
+    for x in source:
+        key = fun_key_selector(x)
+        states = groups.get(key)
+        if states is None:
+            states = groups[key] = [aggregate() for _, aggregate, _ in parsed]
+        for state, (_, _, selector) in zip(states, parsed):
+            state.add(x if selector is None else selector(x))
+    return groups
+
+
+def _group_results(groups, parsed):
+    for key, states in groups.items():
+        group = {'key': key}
+        for state, (name, _, _) in zip(states, parsed):
+            group[name] = state.result()
+        yield group
+
+
+def _group_aggregate(source, fun_key_selector, aggregates):
+    parsed = _parse_aggregates(aggregates)
+    return _group_results(_group_states(source, fun_key_selector, parsed), parsed)
+
+
+def _aggregate_states(source, parsed):
+    states = [(aggregate(), selector) for _, aggregate, selector in parsed]
+    for x in source:
+        for state, selector in states:
+            state.add(x if selector is None else selector(x))
+    return [state for state, _ in states]
+
+
+def _aggregate_many(source, aggregates):
+    parsed = _parse_aggregates(aggregates)
+    states = _aggregate_states(source, parsed)
+    return {name: state.result() for (name, _, _), state in zip(parsed, states)}
+
+
+def _aggregate(source, seed, func, result_selector):
+    accumulator = seed
+    for x in source:
+        accumulator = func(accumulator, x)
+    return accumulator if result_selector is None else result_selector(accumulator)
+
+
+def _stats(source, selector):
+    count = 0
+    total = 0
+    low = high = None
+    mean = 0.0
+    m2 = 0.0
+    for x in source:
+        if selector is not None:
+            x = selector(x)
+        count += 1
+        total += x
+        if count == 1:
+            low = high = x
+        elif x < low:
+            low = x
+        elif x > high:
+            high = x
+        delta = x - mean
+        mean += delta / count
+        m2 += delta * (x - mean)
+    return {
+        'count': count,
+        'sum': total,
+        'min': low,
+        'max': high,
+        'average': total / float(count) if count else None,
+        'variance': m2 / count if count else None,
+        'sample_variance': m2 / (count - 1) if count > 1 else None,
+    }
+
+
+class Lookup:
+    """
+    A read-only index that maps keys to the List of elements with that key. Created by ToLookup.
+
+    Example:
+    # >>> lookup = List([1, 2, 3, 4]).ToLookup(lambda x: x % 2)
+    # >>> lookup[1], lookup[5], 0 in lookup, len(lookup)
+    ([1, 3], [], True, 2)
+    """
+
+    def __init__(self, groups):
+        self._groups = groups
+
+    def __getitem__(self, key):
+        return self._groups.get(key, List())
+
+    def __contains__(self, key):
+        return key in self._groups
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __iter__(self):
+        for key, values in self._groups.items():
+            yield {'key': key, 'values': values}
+
+    def Contains(self, key):
+        """
+        Determines whether the lookup has elements with the specified key.
+
+        Args:
+        - key: The key to look for.
+
+        Returns:
+        True if the key is present, otherwise False.
+        """
+
+        return key in self._groups
+
+    def Keys(self):
+        """
+        Returns the keys of the lookup in the order of their first occurrence.
+
+        Returns:
+        - List: The keys.
+        """
+
+        return List(self._groups)
+
+    def Count(self):
+        """
+        Returns the number of distinct keys.
+
+        Returns:
+        - int: The number of keys.
+        """
+
+        return len(self._groups)
+
+
+def _except(source, input_list, fun_key_selector):
+    if fun_key_selector is None:
+        excluded = _KeySet(input_list)
+        for x in source:
+            if x not in excluded:
+                yield x
+    else:
+        excluded = _KeySet(fun_key_selector(x) for x in input_list)
+        for x in source:
+            if fun_key_selector(x) not in excluded:
+                yield x
+
+
+def _hash_inner(inner_list, fun_inner_key_selector):
+    lookup = {}
+    for o in inner_list:
+        key = fun_inner_key_selector(o)
+        if key in lookup:
+            lookup[key].append(o)
+        else:
+            lookup[key] = [o]
+    return lookup
+
+
+def _join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+    lookup = _hash_inner(inner_list, fun_inner_key_selector)
+    for n in source:
+        for o in lookup.get(fun_outher_key_selector(n), ()):
+            yield result_selector(n, o)
+
+
+def _group_join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+    lookup = _hash_inner(inner_list, fun_inner_key_selector)
+    for n in source:
+        yield result_selector(n, List(lookup.get(fun_outher_key_selector(n), ())))
+
+
+def _left_join(source, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector, default_value):
+    lookup = _hash_inner(inner_list, fun_inner_key_selector)
+    for n in source:
+        matches = lookup.get(fun_outher_key_selector(n))
+        if matches is None:
+            yield result_selector(n, default_value)
+        else:
+            for o in matches:
+                yield result_selector(n, o)
+
+
+def _distinct(source, fun_key_selector):
+    seen = _KeySet()
+    for x in source:
+        if seen.add(x if fun_key_selector is None else fun_key_selector(x)):
+            yield x
+
+
+def _intersect(source, input_list, fun_key_selector):
+    if fun_key_selector is None:
+        second = _KeySet(input_list)
+    else:
+        second = _KeySet(fun_key_selector(x) for x in input_list)
+    seen = _KeySet()
+    for x in source:
+        key = x if fun_key_selector is None else fun_key_selector(x)
+        if key in second and seen.add(key):
+            yield x
+
+
+def _union(source, second_list, fun_key_selector):
+    return _distinct(chain(source, second_list), fun_key_selector)
+
+
+def _reversed(source):
+    return reversed(list(source))
+
+
+def _positive(size):
+    if size <= 0:
+        raise ValueError("size must be positive")
+    return size
+
+
+def _memory_limit(memory_limit):
+    if memory_limit is not None and memory_limit <= 0:
+        raise ValueError("memory_limit must be positive")
+    return memory_limit
+
+
+def _chunk(source, size):
+    if isinstance(source, list):
+        for start in range(0, len(source), size):
+            yield List(source[start:start + size])
+        return
+    iterator = iter(source)
+    while True:
+        chunk = List(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _byte_size(x):
+    if isinstance(x, (str, bytes, bytearray, memoryview)):
+        return len(x)
+    return sys.getsizeof(x)
+
+
+def _batch(source, size, max_bytes, max_wait):
+    if max_bytes is None and max_wait is None:
+        yield from _chunk(source, size)
+        return
+    batch = List()
+    batch_bytes = 0
+    started = 0.0
+    for x in source:
+        x_bytes = 0 if max_bytes is None else _byte_size(x)
+        if batch and ((max_bytes is not None and batch_bytes + x_bytes > max_bytes)
+                      or (max_wait is not None and monotonic() - started >= max_wait)):
+            yield batch
+            batch = List()
+            batch_bytes = 0
+        if not batch and max_wait is not None:
+            started = monotonic()
+        batch.append(x)
+        batch_bytes += x_bytes
+        if len(batch) >= size:
+            yield batch
+            batch = List()
+            batch_bytes = 0
+    if batch:
+        yield batch
+
+
+class Enumerable:
+    """
+    A lazily evaluated sequence with the same methods as List.
+
+    Operators such as Select, Where or Take do not produce intermediate lists. They build a generator pipeline
+    that runs only when the sequence is enumerated or a terminal operator (ToList, First, Count, ...) is called,
+    so a chain holds one element at a time and Take/First stop reading the source early.
+    An Enumerable can be enumerated any number of times; each enumeration re-reads the source
+    (unless the source itself is a one-shot iterator such as a generator).
+
+    Example:
+    # >>> Enumerable.From(range(10 ** 9)).Select(lambda x: x * 2).Where(lambda x: x % 3 == 0).Take(3).ToList()
+    [0, 6, 12]
+    """
+
+    def __init__(self, iterable=()):
+        self._iterable = iterable
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    @staticmethod
+    def From(iterable):
+        """
+        Creates a lazy sequence over any iterable.
+
+        Args:
+        - iterable: The source of the elements.
+
+        Returns:
+        - Enumerable: A lazy sequence over the source.
+        """
+
+        return Enumerable(iterable)
+
+    def _defer(self, generator, *args):
+        return Enumerable(_Deferred(generator, (self,) + args))
+
+    def Select(self, fun):
+        """
+        Lazily applies the specified function to each element of the sequence.
+
+        Args:
+        - fun: The function that specifies the projection to be applied to each element.
+
+        Returns:
+        - Enumerable: The projected sequence.
+        """
+
+        return self._defer(_select, fun)
+
+    def SelectMany(self, fun_selector=None):
+        """
+        Lazily flattens the sequence, optionally projecting each inner element.
+
+        Args:
+        - fun_selector: The function applied to each inner element. If None, the elements are flattened as is.
+
+        Returns:
+        - Enumerable: The flattened sequence.
+        """
+
+        return self._defer(_select_many, fun_selector)
+
+    def Where(self, fun, equals=_NONE):
+        """
+        Lazily filters the sequence.
+
+        Args:
+        - fun: The function that specifies the condition for the sampling filter.
+        - equals: If provided, fun is a key selector and the elements whose key equals this value are selected.
+
+        Returns:
+        - Enumerable: The elements that satisfy the condition.
+        """
+
+        if equals is _NONE:
+            return self._defer(_where, fun)
+        return self._defer(_where_equals, fun, equals)
+
+    def GroupBy(self, fun_key_selector, fun_element_selector=None, fun_result_selector=None):
+        """
+        Groups elements by key with a single hash-based pass over the sequence when it is enumerated.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the elements.
+        - fun_element_selector: The function that maps each element before it is put into its group.
+        - fun_result_selector: The function that receives the key and the List of values of a group
+        and produces the result for that group.
+
+        Returns:
+        - Enumerable: Groups represented by dictionaries with 'key' and 'values' fields
+        (or by the result of fun_result_selector).
+        """
+
+        return self._defer(_group_by, fun_key_selector, fun_element_selector, fun_result_selector)
+
+    def GroupAggregate(self, fun_key_selector, aggregates):
+        """
+        Groups elements by key and computes aggregates for each group without storing the elements of the groups.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the elements.
+        - aggregates (dict): Maps a result field name to 'count', 'sum', 'min', 'max', 'average', 'variance'
+        or to a tuple (name, selector).
+
+        Returns:
+        - Enumerable: One dictionary per group with the 'key' field and one field per aggregate.
+        """
+
+        return self._defer(_group_aggregate, fun_key_selector, aggregates)
+
+    def ToLookup(self, fun_key_selector, fun_element_selector=None):
+        """
+        Enumerates the sequence and builds a Lookup that maps each key to the elements that have it.
+
+        Args:
+        - fun_key_selector: The function that selects the key of each element.
+        - fun_element_selector: The function that maps each element before it is stored.
+
+        Returns:
+        - Lookup: The index of the elements by key.
+        """
+
+        return Lookup(_hash_group(self, fun_key_selector, fun_element_selector))
+
+    def Except(self, input_list):
+        """
+        Lazily returns a sequence containing all the elements of the first sequence that are not in the second sequence.
+        The second sequence is hashed once and the elements of the first one are probed against it.
+
+        Args:
+        - input_list: The second sequence to be compared.
+
+        Returns:
+        - Enumerable: The elements that are not present in the second sequence.
+        """
+
+        return self._defer(_except, input_list, None)
+
+    def ExceptBy(self, input_list, fun_key_selector):
+        """
+        Lazily returns the elements of this sequence whose keys do not occur among the keys of the second sequence.
+        The key selector is applied to the elements of both sequences; the second sequence is hashed once.
+
+        Args:
+        - input_list: The second sequence to be compared.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - Enumerable: The elements whose keys are not present in the second sequence.
+
+        Example:
+        # >>> List([{'id': 1}, {'id': 2}]).ExceptBy([{'id': 2}], lambda x: x['id'])
+        [{'id': 1}]
+        """
+
+        return self._defer(_except, input_list, fun_key_selector)
+
+    def Join(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+        """
+        Lazily performs a hash join of the sequence with another sequence.
+        The second sequence is hashed on first enumeration; this sequence is streamed.
+
+        Args:
+        - inner_list: The second sequence to be joined.
+        - fun_outer_key_selector: A function that selects the key from the elements of this sequence.
+        - fun_inner_key_selector: A function that selects the key from the elements of the second sequence.
+        - result_selector: A function that produces the result based on the matching elements from both sequences.
+
+        Returns:
+        - Enumerable: The result of the inner join.
+        """
+
+        return self._defer(_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector)
+
+    def GroupJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector):
+        """
+        Lazily correlates the sequence with another sequence and groups the matching inner elements
+        for each outer element.
+
+        Args:
+        - inner_list: The second sequence to be joined.
+        - fun_outer_key_selector: A function that selects the key from the elements of this sequence.
+        - fun_inner_key_selector: A function that selects the key from the elements of the second sequence.
+        - result_selector: A function that receives an outer element and the List of its matching inner elements.
+
+        Returns:
+        - Enumerable: One result for each element of this sequence.
+        """
+
+        return self._defer(_group_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector)
+
+    def LeftJoin(self, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                 default_value=None):
+        """
+        Lazily performs a left outer join of the sequence with another sequence.
+
+        Args:
+        - inner_list: The second sequence to be joined.
+        - fun_outer_key_selector: A function that selects the key from the elements of this sequence.
+        - fun_inner_key_selector: A function that selects the key from the elements of the second sequence.
+        - result_selector: A function that produces the result based on the matching elements from both sequences.
+        - default_value: The inner element passed to result_selector for outer elements without a match.
+
+        Returns:
+        - Enumerable: The result of the left join.
+        """
+
+        return self._defer(_left_join, inner_list, fun_outher_key_selector, fun_inner_key_selector, result_selector,
+                           default_value)
+
+    def Distinct(self):
+        """
+        Lazily returns the distinct elements of the sequence in the order of their first occurrence.
+        Unhashable elements (such as dictionaries) are supported.
+
+        Returns:
+        - Enumerable: The distinct elements.
+        """
+
+        return self._defer(_distinct, None)
+
+    def DistinctBy(self, fun_key_selector):
+        """
+        Lazily returns the first element of the sequence for each distinct key, in the order of their first occurrence.
+
+        Args:
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - Enumerable: The first element for each distinct key.
+
+        Example:
+        # >>> List([{'id': 1, 'v': 'a'}, {'id': 1, 'v': 'b'}]).DistinctBy(lambda x: x['id'])
+        [{'id': 1, 'v': 'a'}]
+        """
+
+        return self._defer(_distinct, fun_key_selector)
+
+    def Concat(self, input_list):
+        """
+        Lazily appends a second sequence to this one.
+
+        Args:
+        - input_list: The sequence to be appended.
+
+        Returns:
+        - Enumerable: The elements of both sequences.
+        """
+
+        return self._defer(chain, input_list)
+
+    def Intersect(self, input_list):
+        """
+        Lazily returns the distinct elements that appear in both sequences, in the order of this sequence.
+
+        Args:
+        - input_list: The second sequence to find the intersection with.
+
+        Returns:
+        - Enumerable: The elements that appear in both sequences.
+        """
+
+        return self._defer(_intersect, input_list, None)
+
+    def IntersectBy(self, input_list, fun_key_selector):
+        """
+        Lazily returns the first element of this sequence for each distinct key that also occurs among the keys
+        of the second sequence. The key selector is applied to the elements of both sequences.
+
+        Args:
+        - input_list: The second sequence to find the intersection with.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - Enumerable: The first element for each distinct key that also occurs in the second sequence.
+        """
+
+        return self._defer(_intersect, input_list, fun_key_selector)
+
+    def Union(self, second_list):
+        """
+        Lazily returns the distinct elements of both sequences in the order of their first occurrence.
+
+        Args:
+        - second_list: The second sequence to form the union with.
+
+        Returns:
+        - Enumerable: The union of both sequences.
+        """
+
+        return self._defer(_union, second_list, None)
+
+    def UnionBy(self, second_list, fun_key_selector):
+        """
+        Lazily returns the first element for each distinct key of both sequences, in the order of their first occurrence.
+
+        Args:
+        - second_list: The second sequence to form the union with.
+        - fun_key_selector: The function that selects the comparison key of an element.
+
+        Returns:
+        - Enumerable: The first element for each distinct key of both sequences.
+        """
+
+        return self._defer(_union, second_list, fun_key_selector)
+
+    def Take(self, count_of_elements):
+        """
+        Lazily selects a certain number of elements from the beginning of the sequence.
+        The source is not read past the last taken element.
+
+        Args:
+        - count_of_elements (int): The number of elements to select.
+
+        Returns:
+        - Enumerable: The first elements of the sequence.
+        """
+
+        return self._defer(islice, max(count_of_elements, 0))
+
+    def Skip(self, count_of_elements):
+        """
+        Lazily skips a certain number of elements from the beginning of the sequence.
+
+        Args:
+        - count_of_elements (int): The number of elements to skip.
+
+        Returns:
+        - Enumerable: The remaining elements.
+        """
+
+        return self._defer(islice, max(count_of_elements, 0), None)
+
+    def TakeWhile(self, fun):
+        """
+        Lazily returns elements as long as the condition is true.
+
+        Args:
+        - fun: The condition function used to determine whether to include an element.
+
+        Returns:
+        - Enumerable: The leading elements that satisfy the condition.
+        """
+
+        return Enumerable(_Deferred(takewhile, (fun, self)))
+
+    def SkipWhile(self, fun):
+        """
+        Lazily skips elements as long as the condition is true and returns the rest.
+
+        Args:
+        - fun: The condition function used to determine whether to skip an element.
+
+        Returns:
+        - Enumerable: The remaining elements.
+        """
+
+        return Enumerable(_Deferred(dropwhile, (fun, self)))
+
+    def OrderBy(self, fun=None, memory_limit=None):
+        """
+        Arranges elements in ascending order. The sort runs when the sequence is enumerated.
+        With a memory_limit, a sequence that does not fit is sorted with an external merge sort.
+
+        Args:
+        - fun: The function used to specify the sorting order.
+        - memory_limit (int): The estimated number of bytes of elements and keys held in memory before a sorted
+        run is spilled to a temporary file. If None, the whole sequence is sorted in memory.
+
+        Returns:
+        - OrderedEnumerable: The sorted sequence.
+
+        Example:
+        # >>> lines = File.ReadLines("huge.log").OrderBy(lambda x: x[:19], memory_limit=512 * 1024 * 1024)
+        # >>> File.WriteLines("sorted.log", lines)
+        """
+
+        return OrderedEnumerable(self, ((fun, False),), _memory_limit(memory_limit))
+
+    def OrderByDescending(self, fun=None, memory_limit=None):
+        """
+        Arranges elements in descending order. The sort runs when the sequence is enumerated.
+        With a memory_limit, a sequence that does not fit is sorted with an external merge sort.
+
+        Args:
+        - fun: The function used to specify the sorting order.
+        - memory_limit (int): The estimated number of bytes of elements and keys held in memory before a sorted
+        run is spilled to a temporary file. If None, the whole sequence is sorted in memory.
+
+        Returns:
+        - OrderedEnumerable: The sorted sequence.
+        """
+
+        return OrderedEnumerable(self, ((fun, True),), _memory_limit(memory_limit))
+
+    def Reverse(self):
+        """
+        Arranges elements in reverse order when the sequence is enumerated.
+
+        Returns:
+        - Enumerable: The reversed sequence.
+        """
+
+        return self._defer(_reversed)
+
+    def Zip(self, second_list, fun_result_selector):
+        """
+        Lazily combines two sequences element by element, stopping at the end of the shorter one.
+
+        Args:
+        - second_list: The second sequence.
+        - fun_result_selector: The function used to combine a pair of elements.
+
+        Returns:
+        - Enumerable: The combined elements.
+        """
+
+        return Enumerable(_Deferred(map, (fun_result_selector, self, second_list)))
+
+    def Single(self, fun=None):
+        """
+        Returns the only element of the sequence, or the only element that satisfies a condition.
+        The scan stops as soon as a second matching element is found.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        The single matching element from the sequence.
+
+        Raises:
+        - Exception: If the sequence contains more than one matching element.
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        return _single_or_raise(self, fun)
+
+    def SingleOrDefault(self, default_value, fun=None):
+        """
+        Returns the only element of the sequence (or the only element that satisfies a condition),
+        or the default value if the sequence does not contain exactly one such element.
+        The scan stops as soon as a second matching element is found.
+
+        Args:
+        - default_value: The value to be returned if the sequence does not contain exactly one matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        The single matching element of the sequence or the default value.
+        """
+
+        found = _single(self, fun)
+        return default_value if found is _NONE or found is _MANY else found
+
+    def Any(self, fun=None):
+        """
+        Determines whether any element satisfies the condition. Stops at the first match.
+
+        Args:
+        - fun: The function that specifies the condition to be satisfied.
+        If None, checks whether the sequence contains any elements, reading at most one element.
+
+        Returns:
+        True if at least one element satisfies the condition, otherwise False.
+        """
+
+        return _first(self, fun) is not _NONE
+
+    def All(self, fun):
+        """
+        Determines whether all elements satisfy the condition. Stops at the first mismatch.
+
+        Args:
+        - fun: The function that specifies the condition to be satisfied.
+
+        Returns:
+        True if the condition is satisfied for all elements, otherwise False.
+        """
+
+        return all(fun(x) for x in self)
+
+    def Contains(self, element):
+        """
+        Determines whether the sequence contains a specific element. Stops at the first match.
+
+        Args:
+        - element: The element to look for.
+
+        Returns:
+        True if the element is present in the sequence, otherwise False.
+        """
+
+        return any(x == element for x in self)
+
+    def Count(self, fun=None):
+        """
+        Counts the elements of the sequence that satisfy a condition without materializing them.
+
+        Args:
+        - fun: The condition function used to determine which elements to count.
+
+        Returns:
+        - int: The number of elements that satisfy the condition.
+        """
+
+        if fun is None:
+            return sum(1 for _ in self)
+        return sum(1 for x in self if fun(x))
+
+    def Sum(self, selector=None):
+        """
+        Calculates the sum of the numeric values in the sequence.
+
+        Args:
+        - selector: The function that selects the value to sum from each element.
+
+        Returns:
+        - The sum of the values.
+        """
+
+        return sum(self) if selector is None else sum(selector(x) for x in self)
+
+    def Average(self, selector=None):
+        """
+        Calculates the average of the numeric values in the sequence in a single pass.
+
+        Args:
+        - selector: The function that selects the value to average from each element.
+
+        Returns:
+        - The average of the values.
+
+        Raises:
+        - ValueError: If the sequence is empty.
+        """
+
+        total = 0
+        count = 0
+        for x in self:
+            total += x if selector is None else selector(x)
+            count += 1
+        if count == 0:
+            raise ValueError("Sequence contains no elements")
+        return total / float(count)
+
+    def Min(self, fun=None, selector=None):
+        """
+        Finds the minimum value in the sequence.
+
+        Args:
+        - fun: If provided, the element with the smallest fun(element) is returned (the same as MinBy).
+        - selector: If provided, the smallest selector(element) value is returned.
+
+        Returns:
+        - The minimum value.
+        """
+
+        if selector is not None:
+            return min(selector(x) for x in self)
+        if fun is None:
+            return min(self)
+        return min(self, key=fun)
+
+    def Max(self, fun=None, selector=None):
+        """
+        Finds the maximum value in the sequence.
+
+        Args:
+        - fun: If provided, the element with the greatest fun(element) is returned (the same as MaxBy).
+        - selector: If provided, the greatest selector(element) value is returned.
+
+        Returns:
+        - The maximum value.
+        """
+
+        if selector is not None:
+            return max(selector(x) for x in self)
+        if fun is None:
+            return max(self)
+        return max(self, key=fun)
+
+    def MinBy(self, fun_key_selector):
+        """
+        Returns the element with the smallest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the smallest key.
+        """
+
+        return min(self, key=fun_key_selector)
+
+    def MaxBy(self, fun_key_selector):
+        """
+        Returns the element with the greatest key. If several elements share it, the first one is returned.
+
+        Args:
+        - fun_key_selector: The function that selects the key to compare.
+
+        Returns:
+        - The element with the greatest key.
+        """
+
+        return max(self, key=fun_key_selector)
+
+    def Aggregate(self, seed, func, result_selector=None):
+        """
+        Applies an accumulator function over the sequence.
+
+        Args:
+        - seed: The initial accumulator value.
+        - func: The function that receives the accumulator and an element and returns the new accumulator.
+        - result_selector: The function that transforms the final accumulator into the result.
+
+        Returns:
+        The final accumulator value, transformed by result_selector if it is provided.
+        """
+
+        return _aggregate(self, seed, func, result_selector)
+
+    def Stats(self, selector=None):
+        """
+        Computes the count, sum, minimum, maximum, average and variance of the values in a single pass.
+
+        Args:
+        - selector: The function that selects the value from each element.
+
+        Returns:
+        - dict: The fields 'count', 'sum', 'min', 'max', 'average', 'variance' and 'sample_variance'.
+        """
+
+        return _stats(self, selector)
+
+    def AggregateMany(self, aggregates):
+        """
+        Computes several aggregates in a single pass over the sequence.
+
+        Args:
+        - aggregates (dict): Maps a result field name to one of 'count', 'sum', 'min', 'max', 'average', 'variance',
+        or to a tuple (name, selector).
+
+        Returns:
+        - dict: One field per aggregate.
+        """
+
+        return _aggregate_many(self, aggregates)
+
+    def First(self, fun=None):
+        """
+        Returns the first element of the sequence, or the first element that satisfies a condition.
+        The source is read only up to the first matching element.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sequence.
+
+        Raises:
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        return _first_or_raise(self, fun)
+
+    def FirstOrDefault(self, default_value, fun=None):
+        """
+        Returns the first element of the sequence (or the first element that satisfies a condition)
+        or the default value if there is no such element.
+
+        Args:
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sequence, or the default value.
+        """
+
+        found = _first(self, fun)
+        return default_value if found is _NONE else found
+
+    def ElementAt(self, element_index):
+        """
+        Returns the element at a specific index. The source is read up to that index only.
+
+        Args:
+        - element_index (int): The index of the element to select.
+
+        Returns:
+        - The element at the specified index.
+
+        Raises:
+        - IndexError: If the index is out of range.
+        """
+
+        if element_index >= 0:
+            for x in islice(self, element_index, None):
+                return x
+        raise IndexError("Index was out of range")
+
+    def ElementAtOrDefault(self, element_index, default_value):
+        """
+        Returns the element at a specific index or the default value if the index is out of range.
+
+        Args:
+        - element_index (int): The index of the element to select.
+        - default_value: The default value to return if the index is out of range.
+
+        Returns:
+        - The element at the specified index, or the default value.
+        """
+
+        if element_index < 0:
+            return default_value
+        return next(islice(self, element_index, None), default_value)
+
+    def Last(self, fun=None):
+        """
+        Returns the last element of the sequence, or the last element that satisfies a condition.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The last matching element of the sequence.
+
+        Raises:
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        found = _last(self, fun)
+        if found is _NONE:
+            raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+        return found
+
+    def LastOrDefault(self, default_value, fun=None):
+        """
+        Returns the last element of the sequence (or the last element that satisfies a condition)
+        or the default value if there is no such element.
+
+        Args:
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The last matching element of the sequence, or the default value.
+        """
+
+        found = _last(self, fun)
+        return default_value if found is _NONE else found
+
+    def ForEach(self, fun):
+        """
+        Applies a function to each element of the sequence.
+
+        Args:
+        - fun: The function to be applied to each element.
+        """
+
+        for n in self:
+            fun(n)
+
+    def Chunk(self, size):
+        """
+        Lazily splits the sequence into chunks of a fixed size; the last chunk may be shorter.
+
+        Args:
+        - size (int): The number of elements in a chunk.
+
+        Returns:
+        - Enumerable: A lazy sequence of Lists.
+        """
+
+        return self._defer(_chunk, _positive(size))
+
+    def Batch(self, size, max_bytes=None, max_wait=None):
+        """
+        Lazily groups the elements into batches that are closed when any limit is reached.
+
+        Args:
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch, counted as len() for strings and bytes
+        and sys.getsizeof() for other elements. A single larger element forms a batch of its own.
+        - max_wait (float): The maximum number of seconds between the first element of a batch and the element
+        that closes it. The time is checked as elements arrive, so a slow source closes a batch on the next element.
+
+        Returns:
+        - Enumerable: A lazy sequence of Lists.
+        """
+
+        return self._defer(_batch, _positive(size), max_bytes, max_wait)
+
+    def ForEachBatch(self, fun, size=1000, max_bytes=None, max_wait=None):
+        """
+        Applies a function to batches of elements as they are read, for example to insert or write them in bulk.
+
+        Args:
+        - fun: The function to be applied to each batch (a List).
+        - size (int): The maximum number of elements in a batch.
+        - max_bytes (int): The maximum size of a batch (see Batch).
+        - max_wait (float): The maximum number of seconds a batch is kept open (see Batch).
+        """
+
+        for batch in _batch(self, _positive(size), max_bytes, max_wait):
+            fun(batch)
+
+    def AsEnumerable(self):
+        """
+        Returns the sequence itself.
+
+        Returns:
+        - Enumerable: This sequence.
+        """
+
+        return self
+
+    def AsParallel(self, workers=None, backend="process", chunk_size=None):
+        """
+        Returns a query whose Select, Where and SelectMany stages run on a pool of processes or threads.
+        The sequence is read in chunks as the chunks are handed to the workers.
+
+        Args:
+        - workers (int): The number of workers (default is the number of CPUs).
+        - backend (str): "process" for CPU-bound functions or "thread" for functions that release the GIL.
+        - chunk_size (int): The number of elements sent to a worker at once.
+
+        Returns:
+        - ParallelQuery: The parallel query over the sequence.
+        """
+
+        from python_linq.parallel_like_csharp import ParallelQuery
+        return ParallelQuery(self, workers, backend, chunk_size)
+
+    def AsNumeric(self, dtype='d'):
+        """
+        Enumerates the sequence into a contiguous numeric buffer with vectorized aggregates.
+
+        Args:
+        - dtype (str): The type code of the values, for example 'd' (float64) or 'q' (int64).
+
+        Returns:
+        - NumericList: The numbers of the sequence.
+        """
+
+        from python_linq.numeric_like_csharp import NumericList
+        return NumericList(iter(self), dtype)
+
+    def WithProfiling(self, hook=None):
+        """
+        Returns a profiled view of the sequence. Every operator called on it, and on the sequences it returns,
+        is recorded in a shared report. Lazy operators are timed and their rows counted while they are enumerated.
+
+        Args:
+        - hook: A function called with each OperatorProfile as soon as it is recorded.
+
+        Returns:
+        - ProfiledQuery: The profiled sequence. Call Explain() on any sequence of the chain to see the report.
+        """
+
+        from python_linq.profiling_like_csharp import ProfiledQuery, QueryProfile
+        return ProfiledQuery(self, QueryProfile(hook))
+
+    def Memoize(self):
+        """
+        Returns a sequence that buffers the elements of this one as they are first enumerated.
+        Later and concurrent enumerations replay the buffer instead of running the pipeline again,
+        and the pipeline is only run as far as the consumers have read.
+
+        Returns:
+        - Enumerable: The buffered sequence.
+
+        Example:
+        # >>> rows = File.ReadLines("data.csv").Select(parse).Where(valid).Memoize()
+        # >>> rows.Count(), rows.Sum(lambda r: r.amount)  # the file is read once
+        """
+
+        return Enumerable(_Memoized(self))
+
+    def Share(self):
+        """
+        Returns a sequence backed by a single enumeration of this one that all consumers share.
+        Each element is computed once and handed to the consumer that asks for it next, so consumers
+        (for example worker threads) split the elements between them instead of each reading all of them.
+        Use Memoize() for every consumer to see every element.
+
+        Returns:
+        - Enumerable: The shared sequence.
+
+        Example:
+        # >>> shared = Enumerable.From(range(5)).Share()
+        # >>> shared.Take(2).ToList(), shared.ToList()
+        ([0, 1], [2, 3, 4])
+        """
+
+        return Enumerable(_Shared(self))
+
+    def Cached(self, key=None, cache=None):
+        """
+        Returns the result of the pipeline from a process-wide LRU cache, running the pipeline only on a miss.
+        Like the other operators it is lazy: the cache is looked up when the returned sequence is enumerated,
+        and again on every enumeration. The entry is keyed on the pipeline or on the given key, plus the versions of its file sources
+        (path, modification time and size), so a query over a file that has changed is run again.
+        A pipeline is described by its operators and their functions; a function is identified by its code,
+        the values it closes over, its default arguments and the global values it reads, so an inline lambda
+        in a query that is built again hits the cache. Lists, dictionaries and other unhashable values read by
+        a function are compared by identity: pass a key, or clear the cache, if they change in place.
+
+        Args:
+        - key: A hashable key identifying the query. Required when the pipeline cannot be described
+        (for example when its source is a List, which can change without notice).
+        - cache (QueryCache): The cache to use (default is the process-wide cache).
+
+        Returns:
+        - Enumerable: A sequence over the cached result.
+
+        Raises:
+        - ValueError: If no key is given and the pipeline cannot be described.
+
+        Example:
+        # >>> File.ReadLines("events.log").Where(is_error).Select(parse).Cached("errors").Count()
+        """
+
+        from python_linq.cache_like_csharp import DEFAULT_CACHE
+        if cache is None:
+            cache = DEFAULT_CACHE
+        if key is None and _pipeline_key(self, []) is _NONE:
+            raise ValueError("The pipeline cannot be used as a cache key; pass a key")
+        return Enumerable(_Deferred(_cached, (self, key, cache)))
+
+    def ToList(self):
+        """
+        Runs the pipeline and stores the result in a List.
+
+        Returns:
+        - List: The elements of the sequence.
+        """
+
+        return List(self)
+
+    def ToPythonList(self):
+        """
+        Runs the pipeline and stores the result in a standard Python list.
+
+        Returns:
+        - list: The elements of the sequence.
+        """
+
+        return list(self)
+
+
+class _SortKey:
+    """
+    Composite sort key with a direction per level, for heap selection over mixed ascending/descending keys.
+    """
+
+    __slots__ = ('keys', 'descending')
+
+    def __init__(self, keys, descending):
+        self.keys = keys
+        self.descending = descending
+
+    def __lt__(self, other):
+        for a, b, descending in zip(self.keys, other.keys, self.descending):
+            if a < b:
+                return not descending
+            if b < a:
+                return descending
+        return False
+
+    def __eq__(self, other):
+        return self.keys == other.keys
+
+
+def _key_function(orderings):
+    funs = tuple(fun for fun, _ in orderings)
+    if len(funs) == 1:
+        fun = funs[0]
+        return (lambda x: x) if fun is None else fun
+    return lambda x: tuple(x if fun is None else fun(x) for fun in funs)
+
+
+def _order(source, orderings, memory_limit=None):
+    if memory_limit is not None:
+        return _external_order(source, orderings, memory_limit)
+    descending = [d for _, d in orderings]
+    key = _key_function(orderings)
+    if all(descending) or not any(descending):
+        return iter(sorted(source, key=key, reverse=descending[0]))
+    # mixed directions: compute the keys once, then stable sorts from the last level to the first
+    decorated = [(key(x), x) for x in source]
+    for level in range(len(orderings) - 1, -1, -1):
+        decorated.sort(key=lambda d: d[0][level], reverse=descending[level])
+    return (x for _, x in decorated)
+
+
+# elements that an external sort buffers between two checks of the memory limit, and pickles together in a run
+_RUN_BATCH = 1024
+
+# runs merged at once; more runs are first merged in groups, so the number of open files stays bounded
+_MERGE_FAN_IN = 64
+
+# estimated memory of one buffered element besides the element and its key: the pair and the list slot
+_ENTRY_OVERHEAD = 72
+
+
+def _entry_key(orderings):
+    """
+    Returns the function that gives the sort key of a buffered entry, or None if the entries are the elements
+    themselves (a single ordering without a key selector). Entries are otherwise (key, element) pairs,
+    which are sorted by key only, so the elements are never compared.
+    """
+
+    return None if len(orderings) == 1 and orderings[0][0] is None else itemgetter(0)
+
+
+def _sort_entries(entries, orderings):
+    """
+    Stably sorts buffered entries, with a direction per key level.
+    """
+
+    descending = [d for _, d in orderings]
+    if all(descending) or not any(descending):
+        entries.sort(key=_entry_key(orderings), reverse=descending[0])
+    else:
+        for level in range(len(descending) - 1, -1, -1):
+            entries.sort(key=lambda e: e[0][level], reverse=descending[level])
+    return entries
+
+
+def _write_run(entries):
+    """
+    Writes sorted entries to an anonymous temporary file, pickled in batches.
+    """
+
+    f = tempfile.TemporaryFile()
+    try:
+        iterator = iter(entries)
+        while True:
+            batch = list(islice(iterator, _RUN_BATCH))
+            if not batch:
+                break
+            pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+        f.seek(0)
+    except BaseException:
+        f.close()
+        raise
+    return f
+
+
+def _read_run(f):
+    while True:
+        try:
+            batch = pickle.load(f)
+        except EOFError:
+            return
+        yield from batch
+
+
+def _merge_runs(runs, orderings):
+    # heapq.merge takes equal keys from the earlier runs first, so the merge is stable
+    readers = [_read_run(f) for f in runs]
+    descending = tuple(d for _, d in orderings)
+    if all(descending) or not any(descending):
+        return merge(*readers, key=_entry_key(orderings), reverse=descending[0])
+    return merge(*readers, key=lambda e: _SortKey(e[0], descending))
+
+
+def _spill(runs, entries, orderings):
+    """
+    Adds a sorted run to runs, a list of (level, file) pairs. When the last _MERGE_FAN_IN runs have the same level,
+    they are merged into one run of the next level, so the number of open files grows only logarithmically.
+    The merged runs are adjacent and the result takes their place, which keeps the sort stable.
+    """
+
+    runs.append((0, _write_run(entries)))
+    while len(runs) >= _MERGE_FAN_IN and all(level == runs[-1][0] for level, _ in runs[-_MERGE_FAN_IN:]):
+        level = runs[-1][0]
+        group = [f for _, f in runs[-_MERGE_FAN_IN:]]
+        merged = _write_run(_merge_runs(group, orderings))
+        del runs[-_MERGE_FAN_IN:]
+        for f in group:
+            f.close()
+        runs.append((level + 1, merged))
+
+
+def _external_order(source, orderings, memory_limit):
+    """
+    Sorts a sequence that may not fit in memory. The elements and their keys are buffered until their estimated
+    size (measured every _RUN_BATCH elements) exceeds memory_limit; each full buffer is sorted and spilled
+    to a temporary file as a run, and the runs are merged lazily. If the sequence fits in the limit,
+    nothing is written.
+    """
+
+    key = None if _entry_key(orderings) is None else _key_function(orderings)
+    getsizeof = sys.getsizeof
+    iterator = iter(source)
+    runs = []
+    try:
+        entries = []
+        size = 0
+        # the elements are buffered in blocks, so the keys and sizes are computed by map instead of a Python loop
+        for block in iter(lambda: list(islice(iterator, _RUN_BATCH)), []):
+            size += sum(map(getsizeof, block)) + _ENTRY_OVERHEAD * len(block)
+            if key is None:
+                entries += block
+            else:
+                keys = list(map(key, block))
+                size += sum(map(getsizeof, keys))
+                entries += zip(keys, block)
+            if size > memory_limit:
+                _spill(runs, _sort_entries(entries, orderings), orderings)
+                entries = []
+                size = 0
+        _sort_entries(entries, orderings)
+        if runs:
+            if entries:
+                _spill(runs, entries, orderings)
+            entries = _merge_runs([f for _, f in runs], orderings)
+        yield from entries if key is None else map(itemgetter(1), entries)
+    finally:
+        for _, f in runs:
+            f.close()
+
+
+def _top(source, orderings, count_of_elements):
+    descending = tuple(d for _, d in orderings)
+    key = _key_function(orderings)
+    if not any(descending):
+        return iter(nsmallest(count_of_elements, source, key=key))
+    if all(descending):
+        return iter(nlargest(count_of_elements, source, key=key))
+    return iter(nsmallest(count_of_elements, source, key=lambda x: _SortKey(key(x), descending)))
+
+
+class OrderedEnumerable(Enumerable):
+    """
+    A lazily sorted sequence created by OrderBy or OrderByDescending.
+
+    The source is not modified and is sorted only when the sequence is enumerated. ThenBy and ThenByDescending
+    add secondary sort keys; every key is computed once per element. The sort is stable.
+    Take(k), First() and FirstOrDefault() select the first elements with a heap in O(n log k)
+    instead of sorting the whole sequence.
+
+    With a memory_limit, a sequence larger than the limit is sorted externally: sorted runs of elements
+    are pickled to temporary files (in the directory given by TMPDIR) and merged lazily, so the elements
+    and their keys must be picklable.
+
+    Example:
+    # >>> rows = List([{'score': 5, 'ts': 2}, {'score': 9, 'ts': 1}, {'score': 5, 'ts': 1}])
+    # >>> rows.OrderByDescending(lambda r: r['score']).ThenBy(lambda r: r['ts']).Take(2).ToList()
+    [{'score': 9, 'ts': 1}, {'score': 5, 'ts': 1}]
+    """
+
+    def __init__(self, source, orderings, memory_limit=None):
+        super().__init__(_Deferred(_order, (source, orderings, memory_limit)))
+        self._source = source
+        self._orderings = orderings
+        self._memory_limit = memory_limit
+
+    def ThenBy(self, fun=None):
+        """
+        Adds a secondary sort key in ascending order.
+
+        Args:
+        - fun: The function used to specify the sorting order among elements with equal previous keys.
+
+        Returns:
+        - OrderedEnumerable: The sequence sorted by all the keys.
+        """
+
+        return OrderedEnumerable(self._source, self._orderings + ((fun, False),), self._memory_limit)
+
+    def ThenByDescending(self, fun=None):
+        """
+        Adds a secondary sort key in descending order.
+
+        Args:
+        - fun: The function used to specify the sorting order among elements with equal previous keys.
+
+        Returns:
+        - OrderedEnumerable: The sequence sorted by all the keys.
+        """
+
+        return OrderedEnumerable(self._source, self._orderings + ((fun, True),), self._memory_limit)
+
+    def Take(self, count_of_elements):
+        """
+        Lazily selects the first elements of the sorted sequence with a partial heap sort in O(n log k).
+
+        Args:
+        - count_of_elements (int): The number of elements to select.
+
+        Returns:
+        - Enumerable: The first elements of the sorted sequence.
+        """
+
+        return Enumerable(_Deferred(_top, (self._source, self._orderings, max(count_of_elements, 0))))
+
+    def First(self, fun=None):
+        """
+        Returns the first element of the sorted sequence (or the first one that satisfies a condition)
+        in a single pass, without sorting.
+
+        Args:
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sorted sequence.
+
+        Raises:
+        - IndexError: If the sequence contains no matching element.
+        """
+
+        source = self._source if fun is None else _where(self._source, fun)
+        found = next(_top(source, self._orderings, 1), _NONE)
+        if found is _NONE:
+            raise IndexError("Sequence contains no matching element" if fun else "Sequence contains no elements")
+        return found
+
+    def FirstOrDefault(self, default_value, fun=None):
+        """
+        Returns the first element of the sorted sequence (or the first one that satisfies a condition)
+        in a single pass, without sorting, or the default value if there is no such element.
+
+        Args:
+        - default_value: The default value to return if there is no matching element.
+        - fun: The condition function used to select the element. If None, every element matches.
+
+        Returns:
+        - The first matching element of the sorted sequence, or the default value.
+        """
+
+        source = self._source if fun is None else _where(self._source, fun)
+        return next(_top(source, self._orderings, 1), default_value)
@@ -0,0 +1,291 @@
+import operator
+from array import array
+
+from python_linq.linq_like_csharp import List, Enumerable
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; the standard array module is used instead
+    numpy = None
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def _operator(name):
+    try:
+        return OPERATORS[name]
+    except KeyError:
+        raise ValueError("Unknown operator '{}'".format(name))
+
+
+class NumericList:
+    """
+    A list of numbers stored in one contiguous buffer: a NumPy array when NumPy is installed,
+    otherwise a standard library array.array. Created by List.AsNumeric(dtype) or NumericList(values, dtype).
+
+    Sum, Average, Min, Max and Count run over the buffer instead of over boxed Python objects, and with NumPy
+    they are vectorized. Where and Count accept comparison expressions such as Where('>', 5), which run as
+    masks over the whole buffer. Functions are called once per element, as on a List, so they behave the same;
+    Select(fun, vectorized=True) instead calls fun once with the whole NumPy array.
+
+    Aggregates with a selector, and any other List method (OrderBy, GroupBy, ...), transparently run on
+    a generic List copy of the values.
+
+    Example:
+    # >>> values = List([1.5, 2.5, 8.0]).AsNumeric()
+    # >>> values.Where('>', 2).Sum()
+    10.5
+    """
+
+    def __init__(self, values=(), dtype='d'):
+        if numpy is not None:
+            if isinstance(values, numpy.ndarray):
+                self._data = values
+            elif numpy.dtype(dtype).kind in 'iu':
+                # numpy.asarray(values, dtype) would truncate floats silently; array.array raises instead
+                data = numpy.asarray(values if hasattr(values, '__len__') else list(values))
+                if data.dtype.kind not in 'iubO':
+                    raise TypeError("Integer NumericList cannot store values of type {}".format(data.dtype))
+                self._data = data.astype(dtype)
+            elif hasattr(values, '__len__'):
+                self._data = numpy.asarray(values, dtype=dtype)
+            else:
+                self._data = numpy.fromiter(values, dtype=dtype)
+        else:
+            self._data = values if isinstance(values, array) else array(dtype, values)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        if numpy is not None:
+            return iter(self._data.tolist())
+        return iter(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NumericList(self._data[index])
+        value = self._data[index]
+        return value.item() if numpy is not None else value
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __getattr__(self, name):
+        # methods that have no numeric implementation fall back to a generic List
+        if name[:1].isupper() and hasattr(List, name):
+            return getattr(self.ToList(), name)
+        raise AttributeError(name)
+
+    def _mask(self, fun, value):
+        if isinstance(fun, str):
+            compare = _operator(fun)
+            if numpy is not None:
+                return compare(self._data, value)
+            return [compare(x, value) for x in self._data]
+        return [bool(fun(x)) for x in self]
+
+    def Select(self, fun, vectorized=False):
+        """
+        Applies the specified function to each element.
+
+        Args:
+        - fun: The function that specifies the projection to be applied to each element.
+        - vectorized (bool): If True and NumPy is available, fun is called once with the whole NumPy array
+        and must return an array with one value per element. NumPy arithmetic then applies: integers wrap
+        around on overflow and division by zero gives inf instead of raising.
+
+        Returns:
+        - NumericList: The projected values, if they are numeric.
+        - List: The projected values otherwise.
+
+        Example:
+        # >>> List([1, 2, 3]).AsNumeric('q').Select(lambda v: v * 2 + 1, vectorized=True)
+        [3, 5, 7]
+        """
+
+        if vectorized and numpy is not None:
+            result = numpy.asarray(fun(self._data))
+            if result.shape != self._data.shape:
+                raise ValueError("A vectorized projection must return one value per element")
+            return NumericList(result) if result.dtype.kind in 'iuf' else List(result.tolist())
+        values = [fun(x) for x in self]
+        if not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in values):
+            return List(values)
+        if numpy is not None:
+            return NumericList(numpy.asarray(values))
+        integers = all(isinstance(x, int) for x in values)
+        typecode = self._data.typecode if integers or self._data.typecode in 'fd' else 'd'
+        try:
+            return NumericList(values, typecode)
+        except OverflowError:
+            return List(values)
+
+    def Where(self, fun, value=None):
+        """
+        Filters the values. The condition is either a function or a comparison operator
+        ('<', '<=', '>', '>=', '==', '!=') with a value, which runs as a mask.
+
+        Args:
+        - fun: The condition function, or the name of the comparison operator.
+        - value: The right-hand side of the comparison, if fun is an operator.
+
+        Returns:
+        - NumericList: The values that satisfy the condition.
+
+        Example:
+        # >>> NumericList([1, 5, 9]).Where('>=', 5)
+        [5.0, 9.0]
+        """
+
+        mask = self._mask(fun, value)
+        if numpy is not None:
+            return NumericList(self._data[numpy.asarray(mask, dtype=bool)])
+        return NumericList(array(self._data.typecode, (x for x, keep in zip(self._data, mask) if keep)))
+
+    def Count(self, fun=None, value=None):
+        """
+        Counts the values that satisfy a condition.
+
+        Args:
+        - fun: The condition function, or the name of a comparison operator. If None, all values are counted.
+        - value: The right-hand side of the comparison, if fun is an operator.
+
+        Returns:
+        - int: The number of values that satisfy the condition.
+        """
+
+        if fun is None:
+            return len(self._data)
+        mask = self._mask(fun, value)
+        if numpy is not None:
+            return int(numpy.count_nonzero(mask))
+        return sum(mask)
+
+    def Sum(self, selector=None):
+        """
+        Calculates the sum of the values.
+
+        Args:
+        - selector: The function that selects the value to sum from each element; runs on a List copy.
+
+        Returns:
+        - The sum of the values.
+        """
+
+        if selector is not None:
+            return self.ToList().Sum(selector)
+        if numpy is not None:
+            if self._data.dtype.kind in 'iu' and abs(self._data.sum(dtype=numpy.float64)) >= 2 ** 62:
+                # the integer sum may have wrapped around; Python integers do not
+                return sum(self._data.tolist())
+            return self._data.sum().item()
+        return sum(self._data)
+
+    def Average(self, selector=None):
+        """
+        Calculates the average of the values.
+
+        Args:
+        - selector: The function that selects the value to average from each element; runs on a List copy.
+
+        Returns:
+        - float: The average of the values.
+
+        Raises:
+        - ValueError: If the list is empty.
+        """
+
+        if selector is not None:
+            return self.ToList().Average(selector)
+        if len(self._data) == 0:
+            raise ValueError("Sequence contains no elements")
+        if numpy is not None:
+            return float(self._data.mean())
+        return sum(self._data) / float(len(self._data))
+
+    def Min(self, fun=None, selector=None):
+        """
+        Finds the minimum value.
+
+        Args:
+        - fun: If provided, the element with the smallest fun(element) is returned; runs on a List copy.
+        - selector: If provided, the smallest selector(element) value is returned; runs on a List copy.
+
+        Returns:
+        - The minimum value.
+
+        Raises:
+        - ValueError: If the list is empty.
+        """
+
+        if fun is not None or selector is not None:
+            return self.ToList().Min(fun, selector)
+        if len(self._data) == 0:
+            raise ValueError("Sequence contains no elements")
+        if numpy is not None:
+            return self._data.min().item()
+        return min(self._data)
+
+    def Max(self, fun=None, selector=None):
+        """
+        Finds the maximum value.
+
+        Args:
+        - fun: If provided, the element with the greatest fun(element) is returned; runs on a List copy.
+        - selector: If provided, the greatest selector(element) value is returned; runs on a List copy.
+
+        Returns:
+        - The maximum value.
+
+        Raises:
+        - ValueError: If the list is empty.
+        """
+
+        if fun is not None or selector is not None:
+            return self.ToList().Max(fun, selector)
+        if len(self._data) == 0:
+            raise ValueError("Sequence contains no elements")
+        if numpy is not None:
+            return self._data.max().item()
+        return max(self._data)
+
+    def AsEnumerable(self):
+        """
+        Returns a lazy sequence over the values.
+
+        Returns:
+        - Enumerable: A lazy sequence over the values.
+        """
+
+        return Enumerable(self)
+
+    def ToList(self):
+        """
+        Converts the values to a generic List.
+
+        Returns:
+        - List: The values.
+        """
+
+        return List(self)
+
+    def ToPythonList(self):
+        """
+        Converts the values to a standard Python list.
+
+        Returns:
+        - list: The values.
+        """
+
+        return list(self)
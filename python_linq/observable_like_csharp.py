@@ -0,0 +1,598 @@
+import heapq
+from collections import Counter
+from weakref import WeakSet
+
+from python_linq.linq_like_csharp import List
+
+
+class _Observable:
+    """
+    Notifies the live views built on a sequence of every inserted and removed element.
+    Views are referenced weakly, so a view that is no longer used stops being updated and is collected.
+    The Live* methods have their own names so that the List methods keep their usual signatures and results.
+    """
+
+    def _subscribe(self, observer):
+        self._observers.add(observer)
+        for index, item in enumerate(self):
+            observer._inserted(index, item)
+
+    def _notify_inserted(self, index, item):
+        for observer in list(self._observers):
+            observer._inserted(index, item)
+
+    def _notify_removed(self, index, item):
+        for observer in list(self._observers):
+            observer._removed(index, item)
+
+    def LiveWhere(self, fun):
+        """
+        Returns a live view of the elements that satisfy a condition, kept up to date as the source changes.
+
+        Args:
+        - fun: The condition function.
+
+        Returns:
+        - LiveList: The live view.
+        """
+
+        return LiveList(self, _WhereView(fun))
+
+    def LiveSelect(self, fun):
+        """
+        Returns a live view of the projected elements, kept up to date as the source changes.
+
+        Args:
+        - fun: The projection function.
+
+        Returns:
+        - LiveList: The live view.
+        """
+
+        return LiveList(self, _SelectView(fun))
+
+    def LiveGroupBy(self, key):
+        """
+        Groups the elements by key for live per-group aggregates.
+
+        Args:
+        - key: The function that selects the key of an element.
+
+        Returns:
+        - LiveGrouping: The groups, on which Count, Sum, Average, Min and Max return live aggregates per key.
+
+        Example:
+        # >>> totals = rows.LiveGroupBy(lambda r: r['user']).Sum(lambda r: r['amount'])
+        # >>> rows.Add({'user': 'a', 'amount': 5})
+        # >>> totals['a']
+        5
+        """
+
+        return LiveGrouping(self, key)
+
+    def LiveCount(self, fun=None):
+        """
+        Returns a live count of the elements, or of the elements that satisfy a condition.
+
+        Args:
+        - fun: The condition function. If None, all elements are counted.
+
+        Returns:
+        - LiveValue: The live count.
+        """
+
+        source = self if fun is None else self.LiveWhere(fun)
+        return LiveValue(source, _Count, None)
+
+    def LiveSum(self, selector=None):
+        """
+        Returns a live sum of the elements.
+
+        Args:
+        - selector: The function that selects the value to sum from an element.
+
+        Returns:
+        - LiveValue: The live sum.
+        """
+
+        return LiveValue(self, _Sum, selector)
+
+    def LiveAverage(self, selector=None):
+        """
+        Returns a live average of the elements.
+
+        Args:
+        - selector: The function that selects the value to average from an element.
+
+        Returns:
+        - LiveValue: The live average. Reading it raises ValueError while the sequence is empty.
+        """
+
+        return LiveValue(self, _Average, selector)
+
+    def LiveMin(self, selector=None):
+        """
+        Returns a live minimum of the elements, kept in a heap so that additions and removals are O(log n).
+
+        Args:
+        - selector: The function that selects the value to compare from an element.
+
+        Returns:
+        - LiveValue: The live minimum. Reading it raises ValueError while the sequence is empty.
+        """
+
+        return LiveValue(self, _Min, selector)
+
+    def LiveMax(self, selector=None):
+        """
+        Returns a live maximum of the elements, kept in a heap so that additions and removals are O(log n).
+
+        Args:
+        - selector: The function that selects the value to compare from an element.
+
+        Returns:
+        - LiveValue: The live maximum. Reading it raises ValueError while the sequence is empty.
+        """
+
+        return LiveValue(self, _Max, selector)
+
+
+class ObservableList(_Observable, List):
+    """
+    A List whose LiveWhere, LiveSelect, LiveGroupBy, LiveCount, LiveSum, LiveAverage, LiveMin and LiveMax
+    return live views and aggregates that are updated incrementally when the list is changed through Add,
+    AddRange, Insert, Remove or RemoveAt, instead of being recomputed. Appending an element costs O(1) per filter, projection, count, sum or average
+    and O(log n) per minimum or maximum; inserting or removing in the middle of a filtered view is O(n).
+
+    Changes made with the methods of the Python list (append, del, ...) are not observed.
+    The List methods (Where, Count, OrderBy, ...) keep their usual behavior and return snapshots.
+
+    Example:
+    # >>> rows = ObservableList()
+    # >>> errors = rows.LiveWhere(lambda r: r['level'] == 'error').LiveCount()
+    # >>> rows.AddRange([{'level': 'error'}, {'level': 'info'}])
+    # >>> errors.Value
+    1
+    """
+
+    def __init__(self, iterable=()):
+        super().__init__(iterable)
+        self._observers = WeakSet()
+
+    def Add(self, new_element):
+        """
+        Adds a new element to the list and updates the live views.
+
+        Args:
+        - new_element: The new element to be added to the list.
+        """
+
+        super().Add(new_element)
+        self._notify_inserted(len(self) - 1, new_element)
+
+    def AddRange(self, input_list):
+        """
+        Adds the elements of the input list to the current list and updates the live views.
+
+        Args:
+        - input_list: The sequence whose elements are to be added to the current list.
+        """
+
+        start = len(self)
+        super().AddRange(list(input_list))
+        for index in range(start, len(self)):
+            self._notify_inserted(index, self[index])
+
+    def Insert(self, index, element):
+        """
+        Inserts the specified element at the specified index in the list and updates the live views.
+
+        Args:
+        - index (int): The index at which to insert the element.
+        - element: The element to be inserted.
+        """
+
+        index = min(max(index + len(self) if index < 0 else index, 0), len(self))
+        super().Insert(index, element)
+        self._notify_inserted(index, element)
+
+    def Remove(self, element):
+        """
+        Removes the first occurrence of the specified element from the list and updates the live views.
+
+        Args:
+        - element: The element to be removed.
+        """
+
+        self.RemoveAt(self.IndexOf(element))
+
+    def RemoveAt(self, index):
+        """
+        Removes the element at the specified index from the list and updates the live views.
+
+        Args:
+        - index (int): The index of the element to be removed.
+        """
+
+        if index < 0:
+            index += len(self)
+        element = self[index]
+        super().RemoveAt(index)
+        self._notify_removed(index, element)
+
+
+class _WhereView:
+    __slots__ = ('_fun', '_mask')
+
+    def __init__(self, fun):
+        self._fun = fun
+        self._mask = []
+
+    def inserted(self, items, index, item):
+        keep = bool(self._fun(item))
+        if index == len(self._mask):
+            self._mask.append(keep)
+            position = len(items)
+        else:
+            position = sum(self._mask[:index])
+            self._mask.insert(index, keep)
+        return (position, item) if keep else None
+
+    def removed(self, items, index, item):
+        if not self._mask.pop(index):
+            return None
+        position = len(items) - 1 if index == len(self._mask) else sum(self._mask[:index])
+        return position, items[position]
+
+
+class _SelectView:
+    __slots__ = ('_fun',)
+
+    def __init__(self, fun):
+        self._fun = fun
+
+    def inserted(self, items, index, item):
+        return index, self._fun(item)
+
+    def removed(self, items, index, item):
+        return index, items[index]
+
+
+class LiveList(_Observable):
+    """
+    A read-only live view over an ObservableList or another live view, created by LiveWhere or LiveSelect.
+    It can be enumerated and indexed like a list, and further live views and aggregates can be built on it.
+    """
+
+    def __init__(self, source, view):
+        self._source = source
+        self._view = view
+        self._items = []
+        self._observers = WeakSet()
+        source._subscribe(self)
+
+    def _inserted(self, index, item):
+        change = self._view.inserted(self._items, index, item)
+        if change is not None:
+            position, value = change
+            if position == len(self._items):
+                self._items.append(value)
+            else:
+                self._items.insert(position, value)
+            self._notify_inserted(position, value)
+
+    def _removed(self, index, item):
+        change = self._view.removed(self._items, index, item)
+        if change is not None:
+            position, value = change
+            del self._items[position]
+            self._notify_removed(position, value)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __eq__(self, other):
+        return self._items == list(other)
+
+    # views are kept in weak sets of their sources, so they hash by identity
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return repr(self._items)
+
+    def ToList(self):
+        """
+        Returns a snapshot of the view.
+
+        Returns:
+        - List: The current elements of the view.
+        """
+
+        return List(self._items)
+
+
+class _Count:
+    __slots__ = ('n',)
+
+    def __init__(self):
+        self.n = 0
+
+    def add(self, value):
+        self.n += 1
+
+    def remove(self, value):
+        self.n -= 1
+
+    def result(self):
+        return self.n
+
+
+class _Sum:
+    __slots__ = ('n', 'total')
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+
+    def add(self, value):
+        self.n += 1
+        self.total += value
+
+    def remove(self, value):
+        self.n -= 1
+        self.total -= value
+
+    def result(self):
+        return self.total
+
+
+class _Average(_Sum):
+    __slots__ = ()
+
+    def result(self):
+        if self.n == 0:
+            raise ValueError("Sequence contains no elements")
+        return self.total / float(self.n)
+
+
+class _Descending:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+class _Min:
+    """
+    Heap of the values with lazy deletion: removed values are counted and dropped when they reach the top.
+    When the heap holds more than twice as many entries as live values, it is rebuilt from the live ones,
+    so its size stays proportional to the number of values under any mix of additions and removals.
+    """
+
+    __slots__ = ('n', '_heap', '_removed')
+
+    def __init__(self):
+        self.n = 0
+        self._heap = []
+        self._removed = Counter()
+
+    def _wrap(self, value):
+        return value
+
+    def add(self, value):
+        self.n += 1
+        heapq.heappush(self._heap, self._wrap(value))
+
+    def remove(self, value):
+        self.n -= 1
+        self._removed[self._wrap(value)] += 1
+        if self.n == 0:
+            self._heap.clear()
+            self._removed.clear()
+        elif len(self._heap) > 2 * self.n:
+            self._compact()
+
+    def _compact(self):
+        removed = self._removed
+        live = []
+        for entry in self._heap:
+            if removed.get(entry):
+                removed[entry] -= 1
+                if not removed[entry]:
+                    del removed[entry]
+            else:
+                live.append(entry)
+        heapq.heapify(live)
+        self._heap = live
+
+    def result(self):
+        if self.n == 0:
+            raise ValueError("Sequence contains no elements")
+        heap = self._heap
+        while self._removed.get(heap[0]):
+            self._removed[heap[0]] -= 1
+            if not self._removed[heap[0]]:
+                del self._removed[heap[0]]
+            heapq.heappop(heap)
+        top = heap[0]
+        return top.value if isinstance(top, _Descending) else top
+
+
+class _Max(_Min):
+    __slots__ = ()
+
+    def _wrap(self, value):
+        return _Descending(value)
+
+
+class LiveValue:
+    """
+    A live aggregate of a sequence, updated as elements are added and removed. Read it with Value.
+    """
+
+    def __init__(self, source, aggregate, selector):
+        self._source = source
+        self._state = aggregate()
+        self._selector = selector
+        source._subscribe(self)
+
+    def _select(self, item):
+        return item if self._selector is None else self._selector(item)
+
+    def _inserted(self, index, item):
+        self._state.add(self._select(item))
+
+    def _removed(self, index, item):
+        self._state.remove(self._select(item))
+
+    @property
+    def Value(self):
+        return self._state.result()
+
+    def __eq__(self, other):
+        return self.Value == (other.Value if isinstance(other, LiveValue) else other)
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return repr(self.Value)
+
+
+class LiveGrouping:
+    """
+    The elements of a sequence grouped by key, created by LiveGroupBy. Its aggregates are maintained per key.
+    """
+
+    def __init__(self, source, key):
+        self._source = source
+        self._key = key
+
+    def Count(self):
+        """
+        Returns a live count of the elements of each group.
+
+        Returns:
+        - LiveGroupValues: The live counts by key.
+        """
+
+        return LiveGroupValues(self._source, self._key, _Count, None)
+
+    def Sum(self, selector=None):
+        """
+        Returns a live sum of each group.
+
+        Args:
+        - selector: The function that selects the value to sum from an element.
+
+        Returns:
+        - LiveGroupValues: The live sums by key.
+        """
+
+        return LiveGroupValues(self._source, self._key, _Sum, selector)
+
+    def Average(self, selector=None):
+        """
+        Returns a live average of each group.
+
+        Args:
+        - selector: The function that selects the value to average from an element.
+
+        Returns:
+        - LiveGroupValues: The live averages by key.
+        """
+
+        return LiveGroupValues(self._source, self._key, _Average, selector)
+
+    def Min(self, selector=None):
+        """
+        Returns a live minimum of each group.
+
+        Args:
+        - selector: The function that selects the value to compare from an element.
+
+        Returns:
+        - LiveGroupValues: The live minimums by key.
+        """
+
+        return LiveGroupValues(self._source, self._key, _Min, selector)
+
+    def Max(self, selector=None):
+        """
+        Returns a live maximum of each group.
+
+        Args:
+        - selector: The function that selects the value to compare from an element.
+
+        Returns:
+        - LiveGroupValues: The live maximums by key.
+        """
+
+        return LiveGroupValues(self._source, self._key, _Max, selector)
+
+
+class LiveGroupValues:
+    """
+    A live aggregate per group key. Index it with a key, or read all groups with Value.
+    Groups are listed in the order in which their keys first occur and disappear when their last element is removed.
+    """
+
+    def __init__(self, source, key, aggregate, selector):
+        self._source = source
+        self._key = key
+        self._aggregate = aggregate
+        self._selector = selector
+        self._groups = {}
+        source._subscribe(self)
+
+    def _select(self, item):
+        return item if self._selector is None else self._selector(item)
+
+    def _inserted(self, index, item):
+        key = self._key(item)
+        state = self._groups.get(key)
+        if state is None:
+            state = self._groups[key] = self._aggregate()
+        state.add(self._select(item))
+
+    def _removed(self, index, item):
+        key = self._key(item)
+        state = self._groups[key]
+        state.remove(self._select(item))
+        if state.n == 0:
+            del self._groups[key]
+
+    def __getitem__(self, key):
+        return self._groups[key].result()
+
+    def __contains__(self, key):
+        return key in self._groups
+
+    def __len__(self):
+        return len(self._groups)
+
+    @property
+    def Value(self):
+        return {key: state.result() for key, state in self._groups.items()}
+
+    def __eq__(self, other):
+        return self.Value == (other.Value if isinstance(other, LiveGroupValues) else other)
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return repr(self.Value)
@@ -0,0 +1,494 @@
+# https://learn.microsoft.com/en-us/dotnet/standard/parallel-programming/introduction-to-plinq
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import chain, islice
+
+from python_linq.linq_like_csharp import List, _aggregate_states, _group_results, _group_states, _parse_aggregates
+
+_SELECT = 'select'
+_WHERE = 'where'
+_SELECT_MANY = 'select_many'
+
+_EMPTY = object()
+
+
+def _stream(stages, chunk):
+    """
+    Lazily applies the stages to a chunk, so a large chunk (such as a range of a file) is never held in memory.
+    """
+
+    output = iter(chunk)
+    for kind, fun in stages:
+        if kind == _SELECT:
+            output = map(fun, output)
+        elif kind == _WHERE:
+            output = filter(fun, output)
+        else:
+            output = chain.from_iterable(output)
+            if fun is not None:
+                output = map(fun, output)
+    return output
+
+
+def _run_stages(stages, chunk):
+    return list(_stream(stages, chunk))
+
+
+def _aggregate_chunk(stages, chunk, seed, func):
+    accumulator = seed
+    for x in _stream(stages, chunk):
+        accumulator = func(accumulator, x)
+    return accumulator
+
+
+def _for_each_chunk(stages, chunk, fun):
+    for x in _stream(stages, chunk):
+        fun(x)
+
+
+def _count_chunk(stages, chunk, fun):
+    output = _stream(stages, chunk)
+    if fun is not None:
+        output = filter(fun, output)
+    return sum(1 for _ in output)
+
+
+def _sum_count_chunk(stages, chunk, selector):
+    total = 0
+    count = 0
+    for x in _stream(stages, chunk):
+        total += x if selector is None else selector(x)
+        count += 1
+    return total, count
+
+
+def _extreme_chunk(stages, chunk, fun, selector, extreme):
+    """
+    Returns (True, extreme element or value) of a chunk, or (False, None) if it is empty.
+    """
+
+    output = _stream(stages, chunk)
+    if selector is not None:
+        output = map(selector, output)
+    result = extreme(output, key=fun, default=_EMPTY)
+    return (False, None) if result is _EMPTY else (True, result)
+
+
+def _extreme(partials, fun, extreme):
+    values = [value for found, value in partials if found]
+    if not values:
+        raise ValueError("Sequence contains no elements")
+    return extreme(values, key=fun)
+
+
+def _distinct_chunk(stages, chunk):
+    return list(dict.fromkeys(_stream(stages, chunk)))
+
+
+def _group_chunk(stages, chunk, fun_key_selector, fun_element_selector):
+    groups = {}
+    for x in _stream(stages, chunk):
+        key = fun_key_selector(x)
+        values = groups.get(key)
+        if values is None:
+            values = groups[key] = []
+        values.append(x if fun_element_selector is None else fun_element_selector(x))
+    return groups
+
+
+def _group_states_chunk(stages, chunk, fun_key_selector, parsed):
+    return _group_states(_stream(stages, chunk), fun_key_selector, parsed)
+
+
+def _aggregate_states_chunk(stages, chunk, parsed):
+    return _aggregate_states(_stream(stages, chunk), parsed)
+
+
+def _chunks(source, chunk_size):
+    iterator = iter(source)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelQuery:
+    """
+    A query whose Select, Where and SelectMany stages run on a pool of processes or threads.
+    Created by List.AsParallel(), Enumerable.AsParallel() or File.ParallelLines().
+
+    The source is split into chunks; each chunk goes through all the stages of the query in a single task,
+    so the elements cross the process boundary once. At most two chunks per worker are in flight, so a lazy
+    source is read as the workers take its chunks, not all at once. Nothing runs until a terminal method
+    (ToList, Aggregate, ForEach, ...) is called. Count, Sum, Average, Min, Max, Distinct, GroupBy,
+    GroupAggregate and AggregateMany reduce each chunk in its worker and merge the partial results,
+    so only those cross back.
+
+    With the "process" backend the functions passed to the query and the elements must be picklable
+    (for example module-level functions, not lambdas). The "thread" backend has no such restriction,
+    but only helps when the functions release the GIL (I/O, hashing of large buffers, native code).
+
+    Like PLINQ, a query is unordered by default: results come in the order in which the chunks complete.
+    Call AsOrdered() to keep the order of the source.
+
+    Example:
+    # >>> List(range(10)).AsParallel(backend="thread").AsOrdered().Select(lambda x: x * x).ToList()
+    [0, 1, 4, 9, 16, 25, 36, 49, 64, 81]
+    """
+
+    def __init__(self, source, workers=None, backend="process", chunk_size=None, ordered=False, stages=()):
+        if backend not in ("process", "thread"):
+            raise ValueError("backend must be 'process' or 'thread'")
+        self._source = source
+        self._workers = workers or os.cpu_count() or 1
+        self._backend = backend
+        self._chunk_size = chunk_size
+        self._ordered = ordered
+        self._stages = tuple(stages)
+
+    def _with(self, **changes):
+        options = dict(source=self._source, workers=self._workers, backend=self._backend,
+                       chunk_size=self._chunk_size, ordered=self._ordered, stages=self._stages)
+        options.update(changes)
+        return ParallelQuery(**options)
+
+    def _executor(self):
+        if self._backend == "process":
+            return ProcessPoolExecutor(max_workers=self._workers)
+        return ThreadPoolExecutor(max_workers=self._workers)
+
+    def _partitions(self):
+        # a source that splits itself, such as the byte ranges of a file, is read by the workers
+        partition = getattr(self._source, '_partition', None)
+        if partition is not None:
+            return partition(self._workers, self._chunk_size)
+        chunk_size = self._chunk_size
+        if chunk_size is None:
+            # about four chunks per worker balances the load without too many round trips
+            length = len(self._source) if hasattr(self._source, '__len__') else 4096 * self._workers
+            chunk_size = max(1, -(-length // (self._workers * 4)))
+        return _chunks(self._source, chunk_size)
+
+    def _run(self, task, *args):
+        # at most two chunks per worker are in flight, so a lazy source is read only as fast as it is processed
+        window = 2 * self._workers
+        partitions = iter(self._partitions())
+        pending = deque()
+        with self._executor() as executor:
+            try:
+                while True:
+                    for chunk in islice(partitions, window - len(pending)):
+                        pending.append(executor.submit(task, self._stages, chunk, *args))
+                    if not pending:
+                        return
+                    if self._ordered:
+                        yield pending.popleft().result()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            pending.remove(future)
+                        for future in done:
+                            yield future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def AsOrdered(self):
+        """
+        Makes the query keep the order of the source in its results.
+
+        Returns:
+        - ParallelQuery: The ordered query.
+        """
+
+        return self._with(ordered=True)
+
+    def AsUnordered(self):
+        """
+        Lets the query return results in the order in which the chunks complete, for maximum throughput.
+
+        Returns:
+        - ParallelQuery: The unordered query.
+        """
+
+        return self._with(ordered=False)
+
+    def Select(self, fun):
+        """
+        Adds a projection that runs in parallel.
+
+        Args:
+        - fun: The function that specifies the projection to be applied to each element.
+
+        Returns:
+        - ParallelQuery: The query with the projection.
+        """
+
+        return self._with(stages=self._stages + ((_SELECT, fun),))
+
+    def Where(self, fun):
+        """
+        Adds a filter that runs in parallel.
+
+        Args:
+        - fun: The function that specifies the condition for the sampling filter.
+
+        Returns:
+        - ParallelQuery: The query with the filter.
+        """
+
+        return self._with(stages=self._stages + ((_WHERE, fun),))
+
+    def SelectMany(self, fun_selector=None):
+        """
+        Adds a one-to-many projection that runs in parallel.
+
+        Args:
+        - fun_selector: The function applied to each inner element. If None, the elements are flattened as is.
+
+        Returns:
+        - ParallelQuery: The query with the projection.
+        """
+
+        return self._with(stages=self._stages + ((_SELECT_MANY, fun_selector),))
+
+    def Aggregate(self, seed, func, combine_func=None, result_selector=None):
+        """
+        Applies an accumulator function over the results of the query.
+
+        If combine_func is provided, every chunk is folded in parallel starting from seed, and the partial
+        results are then combined with combine_func, so seed must be a neutral value for func.
+        Otherwise the stages run in parallel and the results are folded sequentially in the calling process.
+
+        Args:
+        - seed: The initial accumulator value.
+        - func: The function that receives the accumulator and an element and returns the new accumulator.
+        - combine_func: The function that merges two partial accumulators.
+        - result_selector: The function that transforms the final accumulator into the result.
+
+        Returns:
+        The final accumulator value, transformed by result_selector if it is provided.
+
+        Example:
+        # >>> List(range(5)).AsParallel(backend="thread").Aggregate(0, lambda a, x: a + x, lambda a, b: a + b)
+        10
+        """
+
+        accumulator = seed
+        if combine_func is None:
+            for chunk in self._run(_run_stages):
+                for x in chunk:
+                    accumulator = func(accumulator, x)
+        else:
+            for partial in self._run(_aggregate_chunk, seed, func):
+                accumulator = combine_func(accumulator, partial)
+        return accumulator if result_selector is None else result_selector(accumulator)
+
+    def ForEach(self, fun):
+        """
+        Applies a function to each result of the query in the workers.
+        With the "process" backend the side effects of fun happen in the worker processes.
+
+        Args:
+        - fun: The function to be applied to each element.
+        """
+
+        for _ in self._run(_for_each_chunk, fun):
+            pass
+
+    def Count(self, fun=None):
+        """
+        Counts the results of the query that satisfy a condition. Every chunk is counted in its worker.
+
+        Args:
+        - fun: The condition function used to determine which results to count.
+
+        Returns:
+        - int: The number of results.
+        """
+
+        return sum(self._run(_count_chunk, fun))
+
+    def Sum(self, selector=None):
+        """
+        Calculates the sum of the results of the query. Every chunk is summed in its worker.
+
+        Args:
+        - selector: The function that selects the value to sum from each result.
+
+        Returns:
+        - The sum of the values.
+        """
+
+        return sum(total for total, _ in self._run(_sum_count_chunk, selector))
+
+    def Average(self, selector=None):
+        """
+        Calculates the average of the results of the query from the sums and counts of the chunks.
+
+        Args:
+        - selector: The function that selects the value to average from each result.
+
+        Returns:
+        - The average of the values.
+
+        Raises:
+        - ValueError: If the query has no results.
+        """
+
+        total = 0
+        count = 0
+        for chunk_total, chunk_count in self._run(_sum_count_chunk, selector):
+            total += chunk_total
+            count += chunk_count
+        if count == 0:
+            raise ValueError("Sequence contains no elements")
+        return total / float(count)
+
+    def Min(self, fun=None, selector=None):
+        """
+        Finds the minimum result of the query from the minimums of the chunks.
+
+        Args:
+        - fun: If provided, the result with the smallest fun(result) is returned (the same as MinBy).
+        - selector: If provided, the smallest selector(result) value is returned.
+
+        Returns:
+        - The minimum.
+
+        Raises:
+        - ValueError: If the query has no results.
+        """
+
+        return _extreme(self._run(_extreme_chunk, fun, selector, min), fun, min)
+
+    def Max(self, fun=None, selector=None):
+        """
+        Finds the maximum result of the query from the maximums of the chunks.
+
+        Args:
+        - fun: If provided, the result with the greatest fun(result) is returned (the same as MaxBy).
+        - selector: If provided, the greatest selector(result) value is returned.
+
+        Returns:
+        - The maximum.
+
+        Raises:
+        - ValueError: If the query has no results.
+        """
+
+        return _extreme(self._run(_extreme_chunk, fun, selector, max), fun, max)
+
+    def Distinct(self):
+        """
+        Returns the distinct results of the query. Every chunk is deduplicated in its worker.
+        The results must be hashable. With AsOrdered() they come in the order of their first occurrence.
+
+        Returns:
+        - List: The distinct results.
+        """
+
+        return List(dict.fromkeys(chain.from_iterable(self._run(_distinct_chunk))))
+
+    def GroupBy(self, fun_key_selector, fun_element_selector=None, fun_result_selector=None):
+        """
+        Groups the results of the query by key. Every chunk is grouped in its worker and the groups are merged.
+        Prefer GroupAggregate when only aggregates of the groups are needed: it does not send the elements back.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the results.
+        - fun_element_selector: The function that maps each result before it is put into its group.
+        - fun_result_selector: The function that receives the key and the List of values of a group
+        and produces the result for that group.
+
+        Returns:
+        - List: One dictionary with 'key' and 'values' fields per group
+        (or the result of fun_result_selector, if it is provided).
+        """
+
+        groups = {}
+        for partial in self._run(_group_chunk, fun_key_selector, fun_element_selector):
+            for key, values in partial.items():
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = List(values)
+                else:
+                    group.extend(values)
+        if fun_result_selector is None:
+            return List({'key': key, 'values': values} for key, values in groups.items())
+        return List(fun_result_selector(key, values) for key, values in groups.items())
+
+    def GroupAggregate(self, fun_key_selector, aggregates):
+        """
+        Groups the results of the query by key and computes aggregates for each group.
+        Every chunk is aggregated in its worker, and the partial aggregates of each group are merged.
+
+        Args:
+        - fun_key_selector: The function that selects the key for grouping the results.
+        - aggregates (dict): Maps a result field name to one of 'count', 'sum', 'min', 'max', 'average', 'variance',
+        or to a tuple (name, selector) where the selector picks the value to aggregate from each result.
+
+        Returns:
+        - List: One dictionary per group, containing the 'key' field and one field per aggregate.
+
+        Example:
+        # >>> File.ParallelLines("access.log").Select(parse).GroupAggregate(by_status, {'n': 'count'})
+        [{'key': 200, 'n': 9120}, {'key': 404, 'n': 17}]
+        """
+
+        parsed = _parse_aggregates(aggregates)
+        groups = {}
+        for partial in self._run(_group_states_chunk, fun_key_selector, parsed):
+            for key, states in partial.items():
+                merged = groups.get(key)
+                if merged is None:
+                    groups[key] = states
+                else:
+                    for state, other in zip(merged, states):
+                        state.merge(other)
+        return List(_group_results(groups, parsed))
+
+    def AggregateMany(self, aggregates):
+        """
+        Computes several aggregates of the results of the query. Every chunk is aggregated in its worker,
+        and the partial aggregates are merged.
+
+        Args:
+        - aggregates (dict): Maps a result field name to one of 'count', 'sum', 'min', 'max', 'average', 'variance',
+        or to a tuple (name, selector) where the selector picks the value to aggregate from each result.
+
+        Returns:
+        - dict: One field per aggregate.
+        """
+
+        parsed = _parse_aggregates(aggregates)
+        merged = [aggregate() for _, aggregate, _ in parsed]
+        for states in self._run(_aggregate_states_chunk, parsed):
+            for state, other in zip(merged, states):
+                state.merge(other)
+        return {name: state.result() for (name, _, _), state in zip(parsed, merged)}
+
+    def ToList(self):
+        """
+        Runs the query and collects the results.
+
+        Returns:
+        - List: The results of the query.
+        """
+
+        output = List()
+        for chunk in self._run(_run_stages):
+            output.extend(chunk)
+        return output
+
+    def AsSequential(self):
+        """
+        Runs the query and returns its results as a List, so further operators run sequentially.
+
+        Returns:
+        - List: The results of the query.
+        """
+
+        return self.ToList()
@@ -0,0 +1,261 @@
+import copy
+import time
+
+from python_linq.linq_like_csharp import List, Enumerable, _Deferred
+
+
+class OperatorProfile:
+    """
+    The measurements of one operator call in a profiled query.
+
+    Fields:
+    - name: The name of the operator.
+    - seconds: The wall time spent in the operator itself, without the time of the profiled stages it reads from.
+    For lazy operators this includes the enumerations of the stage so far.
+    - rows_in: The number of elements of the source. For a lazy source, the number of rows produced so far
+    by the stage it comes from, or None if the source is not profiled.
+    - rows_out: The number of elements of the result, or None if the result is not a sequence.
+    For lazy operators, the number of rows produced by the latest enumeration so far, or None until it is enumerated.
+    - selector_calls: How many times the functions passed to the operator have been called so far
+    (this grows when a lazy stage is enumerated later).
+    """
+
+    __slots__ = ('name', 'seconds', '_rows_in', 'rows_out', '_calls', '_upstream')
+
+    def __init__(self, name, seconds, rows_in, rows_out, calls, upstream=None):
+        self.name = name
+        self.seconds = seconds
+        self._rows_in = rows_in
+        self.rows_out = rows_out
+        self._calls = calls
+        self._upstream = upstream
+
+    @property
+    def rows_in(self):
+        if self._rows_in is None and self._upstream is not None:
+            return self._upstream.rows_out
+        return self._rows_in
+
+    @property
+    def selector_calls(self):
+        return self._calls[0]
+
+    def AsDict(self):
+        """
+        Returns the measurements as a dictionary, for example to forward them to a metrics system.
+
+        Returns:
+        - dict: The fields 'name', 'seconds', 'rows_in', 'rows_out' and 'selector_calls'.
+        """
+
+        return {
+            'name': self.name,
+            'seconds': self.seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'selector_calls': self.selector_calls,
+        }
+
+    def __repr__(self):
+        return 'OperatorProfile({})'.format(self.AsDict())
+
+
+class QueryProfile:
+    """
+    The report of a profiled query: one OperatorProfile per operator call, in call order.
+    """
+
+    def __init__(self, hook=None):
+        self.stages = []
+        self._hook = hook
+        # time spent in the profiled stages called by the stage that is running, to be subtracted from its own
+        self._nested = 0.0
+
+    def _measure(self, stage, fun, *args, **kwargs):
+        outer = self._nested
+        self._nested = 0.0
+        start = time.perf_counter()
+        try:
+            return fun(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stage.seconds += elapsed - self._nested
+            self._nested = outer + elapsed
+
+    def _record(self, stage):
+        self.stages.append(stage)
+        if self._hook is not None:
+            self._hook(stage)
+
+    def TotalSeconds(self):
+        """
+        Returns the total wall time of all operator calls.
+
+        Returns:
+        - float: The time in seconds.
+        """
+
+        return sum(stage.seconds for stage in self.stages)
+
+    def AsDicts(self):
+        """
+        Returns the measurements of all operator calls as dictionaries.
+
+        Returns:
+        - List: One dictionary per operator call.
+        """
+
+        return List(stage.AsDict() for stage in self.stages)
+
+    def Explain(self):
+        """
+        Formats the report as a text table.
+
+        Returns:
+        - str: One line per operator call with its rows in and out, selector calls and time.
+        """
+
+        header = ('#', 'operator', 'rows in', 'rows out', 'selector calls', 'time ms')
+        rows = [header]
+        for i, stage in enumerate(self.stages, 1):
+            rows.append((str(i), stage.name, _format(stage.rows_in), _format(stage.rows_out),
+                         str(stage.selector_calls), '{:.3f}'.format(stage.seconds * 1000)))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ['  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in rows]
+        lines.append('total {:.3f} ms'.format(self.TotalSeconds() * 1000))
+        return '\n'.join(lines)
+
+    def __str__(self):
+        return self.Explain()
+
+
+def _format(value):
+    return '-' if value is None else str(value)
+
+
+def _length(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+def _counting(fun, calls):
+    def counted(*args, **kwargs):
+        calls[0] += 1
+        return fun(*args, **kwargs)
+    return counted
+
+
+def _is_query(value):
+    return isinstance(value, (List, Enumerable)) or type(value).__module__.startswith('python_linq.')
+
+
+def _timed(source, stage, profile):
+    stage.rows_out = 0
+    iterator = profile._measure(stage, iter, source)
+    while True:
+        try:
+            x = profile._measure(stage, next, iterator)
+        except StopIteration:
+            return
+        stage.rows_out += 1
+        yield x
+
+
+def _profiled(result, stage, profile):
+    # a copy of the lazy sequence that times and counts its rows when it is enumerated; the copy keeps the type
+    # of the result, so that methods such as ThenBy or the heap-based OrderedEnumerable.Take still apply
+    timed = copy.copy(result)
+    timed._iterable = _Deferred(_timed, (result, stage, profile))
+    return timed
+
+
+class ProfiledQuery:
+    """
+    Wraps a List, Enumerable or other sequence of this library and records every operator called on it
+    (and on the sequences it returns) in a shared QueryProfile. Created by WithProfiling().
+
+    Profiling is opt-in: sequences that are not wrapped run without any instrumentation.
+    Lazy stages (Enumerable) are timed and their rows counted while they are enumerated,
+    so the report is complete once the query has been consumed.
+
+    Example:
+    # >>> query = List(range(1000)).WithProfiling().Select(lambda x: x * 2).Where(lambda x: x % 3 == 0)
+    # >>> print(query.Explain())
+    #   operator  rows in  rows out  selector calls  time ms
+    1  Select    1000     1000      1000            0.151
+    2  Where     1000     334       1000            0.098
+    total 0.249 ms
+    """
+
+    def __init__(self, target, profile, stage=None):
+        self._target = target
+        self._profile = profile
+        self._stage = stage
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not name[:1].isupper() or not callable(attribute):
+            return attribute
+        return self._operator(name, attribute)
+
+    def _operator(self, name, method):
+        def operator(*args, **kwargs):
+            calls = [0]
+            args = tuple(_counting(a, calls) if callable(a) and not _is_query(a) else a for a in args)
+            kwargs = {k: _counting(v, calls) if callable(v) and not _is_query(v) else v for k, v in kwargs.items()}
+            stage = OperatorProfile(name, 0.0, _length(self._target), None, calls, self._stage)
+            result = self._profile._measure(stage, method, *args, **kwargs)
+            if isinstance(result, Enumerable):
+                result = _profiled(result, stage, self._profile)
+            elif _is_query(result):
+                stage.rows_out = _length(result)
+            self._profile._record(stage)
+            return ProfiledQuery(result, self._profile, stage) if _is_query(result) else result
+        return operator
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __getitem__(self, index):
+        return self._target[index]
+
+    def __eq__(self, other):
+        return self._target == (other._target if isinstance(other, ProfiledQuery) else other)
+
+    def __repr__(self):
+        return repr(self._target)
+
+    def Unwrap(self):
+        """
+        Returns the wrapped sequence without instrumentation.
+
+        Returns:
+        The wrapped List, Enumerable or other sequence.
+        """
+
+        return self._target
+
+    def Profile(self):
+        """
+        Returns the report of the query.
+
+        Returns:
+        - QueryProfile: The measurements of all operator calls so far.
+        """
+
+        return self._profile
+
+    def Explain(self):
+        """
+        Formats the report of the query as a text table.
+
+        Returns:
+        - str: One line per operator call with its rows in and out, selector calls and time.
+        """
+
+        return self._profile.Explain()
@@ -0,0 +1,275 @@
+from bisect import bisect_left, bisect_right
+
+from python_linq.linq_like_csharp import List
+
+_BOUNDS = ('<', '<=', '>', '>=', '==', '!=')
+
+
+class SortedList(List):
+    """
+    A List that keeps its elements ordered by key. Add, AddRange and Remove preserve the order, and the keys
+    are kept in a separate list so that Contains, IndexOf, Range, Floor and Ceiling are binary searches.
+    SkipWhile and TakeWhile take a bound on the key ('<', '<=', '>', '>=', '==', '!=') and a value,
+    and then cut the list with a binary search instead of a scan.
+    Elements with equal keys keep the order in which they were added.
+
+    The other List methods work as usual and return plain Lists.
+
+    Example:
+    # >>> events = SortedList(events, key=lambda e: e['time'])
+    # >>> events.Range(start, end).Count()
+    # >>> events.SkipWhile('<', start).TakeWhile('<', end)
+    """
+
+    def __init__(self, iterable=(), key=None):
+        items = sorted(iterable, key=key)
+        super().__init__(items)
+        self._key = key
+        self._keys = items[:] if key is None else [key(x) for x in items]
+
+    def _from_slice(self, start, end):
+        result = SortedList(key=self._key)
+        list.extend(result, self[start:end])
+        result._keys = self._keys[start:end]
+        return result
+
+    def _key_of(self, element):
+        return element if self._key is None else self._key(element)
+
+    def _find(self, element):
+        key = self._key_of(element)
+        for i in range(bisect_left(self._keys, key), bisect_right(self._keys, key)):
+            if self[i] == element:
+                return i
+        return -1
+
+    def _bound(self, operator_name, value):
+        """
+        Returns the range [start, end) of the indexes whose keys satisfy 'key operator_name value'.
+        For '!=' the range is the keys before the equal ones, which is all that SkipWhile and TakeWhile need.
+        """
+
+        if operator_name not in _BOUNDS:
+            raise ValueError("Unknown operator '{}'".format(operator_name))
+        low = bisect_left(self._keys, value)
+        high = bisect_right(self._keys, value)
+        return {
+            '<': (0, low),
+            '<=': (0, high),
+            '>': (high, len(self)),
+            '>=': (low, len(self)),
+            '==': (low, high),
+            '!=': (0, low if low < high else len(self)),
+        }[operator_name]
+
+    def _prefix(self, operator_name, value):
+        start, end = self._bound(operator_name, value)
+        return end if start == 0 else 0
+
+    def _scan(self, fun):
+        """
+        Returns the index of the first element that does not satisfy the condition, or len(self) if all do.
+        """
+
+        for i, x in enumerate(self):
+            if not fun(x):
+                return i
+        return len(self)
+
+    def Add(self, new_element):
+        """
+        Adds a new element at its position in the order, after the elements with an equal key.
+
+        Args:
+        - new_element: The new element to be added to the list.
+        """
+
+        key = self._key_of(new_element)
+        index = bisect_right(self._keys, key)
+        List.Insert(self, index, new_element)
+        self._keys.insert(index, key)
+
+    def AddRange(self, input_list):
+        """
+        Adds the elements of the input sequence at their positions in the order.
+        A few elements are inserted one by one; many are merged with a single sort.
+
+        Args:
+        - input_list: The sequence whose elements are to be added to the list.
+        """
+
+        elements = list(input_list)
+        if len(elements) * 8 < len(self):
+            for element in elements:
+                self.Add(element)
+            return
+        if self._indexes:
+            self._check_indexes(elements)
+        keys = self._keys + (elements if self._key is None else [self._key(x) for x in elements])
+        elements = list(self) + elements
+        # the sort is stable and the existing elements come first, so they stay before new elements with equal keys;
+        # they are also already one sorted run, which the sort merges with the new elements without re-sorting it
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self[:] = [elements[i] for i in order]
+        self._keys = [keys[i] for i in order]
+        if self._indexes:
+            self._invalidate_indexes()
+
+    def Insert(self, index, element):
+        """
+        Not supported: the position of an element is determined by its key. Use Add.
+
+        Raises:
+        - TypeError: Always.
+        """
+
+        raise TypeError("SortedList does not support Insert; use Add")
+
+    def Remove(self, element):
+        """
+        Removes the first occurrence of the specified element from the list.
+
+        Args:
+        - element: The element to be removed.
+
+        Raises:
+        - ValueError: If the element is not in the list.
+        """
+
+        index = self._find(element)
+        if index < 0:
+            raise ValueError("{!r} is not in list".format(element))
+        self.RemoveAt(index)
+
+    def RemoveAt(self, index):
+        """
+        Removes the element at the specified index from the list.
+
+        Args:
+        - index (int): The index of the element to be removed.
+        """
+
+        List.RemoveAt(self, index)
+        del self._keys[index]
+
+    def Contains(self, element):
+        """
+        Determines whether the list contains a specific element, with a binary search on its key.
+
+        Args:
+        - element: The element to be checked for presence in the list.
+
+        Returns:
+        True if the element is present in the list, otherwise False.
+        """
+
+        return self._find(element) >= 0
+
+    def IndexOf(self, element):
+        """
+        Returns the index of the first occurrence of an element, with a binary search on its key.
+
+        Args:
+        - element: The element to find the index of.
+
+        Returns:
+        - int: The index of the first occurrence of the element.
+
+        Raises:
+        - ValueError: If the element is not in the list.
+        """
+
+        index = self._find(element)
+        if index < 0:
+            raise ValueError("{!r} is not in list".format(element))
+        return index
+
+    def Range(self, low=None, high=None):
+        """
+        Returns the elements whose keys are in the interval [low, high).
+
+        Args:
+        - low: The smallest key to include. If None, the range starts at the first element.
+        - high: The key at which the range ends (excluded). If None, the range ends at the last element.
+
+        Returns:
+        - SortedList: The elements of the range.
+
+        Example:
+        # >>> SortedList([5, 1, 9, 3]).Range(2, 9)
+        [3, 5]
+        """
+
+        start = 0 if low is None else bisect_left(self._keys, low)
+        end = len(self) if high is None else bisect_left(self._keys, high)
+        return self._from_slice(start, max(start, end))
+
+    def Floor(self, key, default_value=None):
+        """
+        Returns the last element whose key is less than or equal to the specified key.
+
+        Args:
+        - key: The key to look for.
+        - default_value: The value returned if there is no such element.
+
+        Returns:
+        The element, or default_value.
+        """
+
+        index = bisect_right(self._keys, key)
+        return self[index - 1] if index > 0 else default_value
+
+    def Ceiling(self, key, default_value=None):
+        """
+        Returns the first element whose key is greater than or equal to the specified key.
+
+        Args:
+        - key: The key to look for.
+        - default_value: The value returned if there is no such element.
+
+        Returns:
+        The element, or default_value.
+        """
+
+        index = bisect_left(self._keys, key)
+        return self[index] if index < len(self) else default_value
+
+    def TakeWhile(self, fun, value=None):
+        """
+        Returns the elements from the beginning as long as the condition is true. If the condition is a bound
+        on the key, the end of the run is found with a binary search.
+
+        Args:
+        - fun: The condition function, or a comparison operator ('<', '<=', '>', '>=', '==', '!=') applied to the key.
+        - value: The right-hand side of the comparison, if fun is an operator.
+
+        Returns:
+        - SortedList: The leading elements that satisfy the condition.
+
+        Example:
+        # >>> SortedList([5, 1, 9, 3]).TakeWhile('<', 5)
+        [1, 3]
+        """
+
+        end = self._scan(fun) if callable(fun) else self._prefix(fun, value)
+        return self._from_slice(0, end)
+
+    def SkipWhile(self, fun, value=None):
+        """
+        Skips the elements from the beginning as long as the condition is true and returns the rest. If the condition
+        is a bound on the key, the end of the skipped run is found with a binary search.
+
+        Args:
+        - fun: The condition function, or a comparison operator ('<', '<=', '>', '>=', '==', '!=') applied to the key.
+        - value: The right-hand side of the comparison, if fun is an operator.
+
+        Returns:
+        - SortedList: The remaining elements.
+
+        Example:
+        # >>> SortedList([5, 1, 9, 3]).SkipWhile('<=', 3)
+        [5, 9]
+        """
+
+        start = self._scan(fun) if callable(fun) else self._prefix(fun, value)
+        return self._from_slice(start, len(self))
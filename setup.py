@@ -35,6 +35,7 @@ setup(
 
     packages=['python_linq'],
     install_requires=[],
+    extras_require={'numpy': ['numpy']},
 
     classifiers=[
         'License :: OSI Approved :: GNU AFFERO GENERAL PUBLIC LICENSE Version 3, 19 November 2007',
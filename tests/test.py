@@ -1,5 +1,12 @@
-from python_linq.linq_like_csharp import List
+from python_linq.linq_like_csharp import List, Enumerable
 from python_linq.file_like_csharp import File
+from python_linq.async_like_csharp import AsyncEnumerable
+from python_linq.observable_like_csharp import ObservableList
+from python_linq.sorted_like_csharp import SortedList
+from python_linq.cache_like_csharp import QueryCache
+import asyncio
+import os
+import tempfile
 
 def join_test():
     x = [
@@ -26,6 +33,49 @@ def join_test():
 #  result:   [{'id': 1, 'm': 6, 'b': 45635643}, {'id': 4, 'm': 0, 'b': 456356}]
 
 
+def columnar_test():
+    x = List([
+        {"m": 6, 'id': 1},
+        {"m": 8, 'id': 5},
+        {"m": 7, 'id': 1},
+        {"m": 0, 'id': 4}
+    ]).ToColumnar()
+
+    y = [
+        {"b": 45635643, 'id': 1},
+        {"b": 456356, 'id': 4}
+    ]
+
+    print(x.Where('m', '>', 5).Select('id'))
+    print(x.GroupAggregate('id', {'count': 'count', 'total': ('sum', 'm')}))
+    print(x.Join(y, 'id', 'id').Select('id', 'b'))
+    z = List([{'id': 1, 'm': 6}, {'id': 2}, {'id': 3, 'm': 9}]).ToColumnar()
+    print(z.Where('m', '>', 5).Select('id'), z.Count('m', '!=', 6), z.Where('m', '==', None).Select('id'))
+    print(z.Sum('m'), z.Average('m'), z.Min('m'), z.Max('m'),
+          z.GroupAggregate('id', {'n': 'count', 'm': ('count', 'm'), 'top': ('max', 'm')}).Select('n', 'm', 'top'))
+
+
+# result: [1, 5, 1]
+#         [{'key': 1, 'count': 2, 'total': 13}, {'key': 5, 'count': 1, 'total': 8}, {'key': 4, 'count': 1, 'total': 0}]
+#         [{'id': 1, 'b': 45635643}, {'id': 1, 'b': 45635643}, {'id': 4, 'b': 456356}]
+#         [1, 3] 1 [2]
+#         15 7.5 6 9 [{'n': 1, 'm': 1, 'top': 6}, {'n': 1, 'm': 0, 'top': None}, {'n': 1, 'm': 1, 'top': 9}]
+
+
+def left_join_test():
+    orders = [{'id': 1, 'customer': 10}, {'id': 2, 'customer': 20}, {'id': 3, 'customer': 10}]
+    customers = [{'id': 10, 'name': 'A'}]
+
+    print(List(orders).LeftJoin(customers, lambda n: n['customer'], lambda o: o['id'],
+                                lambda n, o: (n['id'], o['name'] if o else None)))
+    print(List(customers).GroupJoin(orders, lambda n: n['id'], lambda o: o['customer'],
+                                    lambda n, g: (n['name'], g.Select(lambda x: x['id']))))
+
+
+# result: [(1, 'A'), (2, None), (3, 'A')]
+#         [('A', [1, 3])]
+
+
 def select_many_test():
     x = [[10, 10, 220, 30], [60, 50, 33, 1, 52]]
     r = List(x).SelectMany(lambda y: y * 10)
@@ -41,7 +91,8 @@ def test_linq():
         .Select(lambda x: x * 2) \
         .Where(lambda x: x < 40) \
         .OrderByDescending() \
-        .GroupBy(lambda x: x)
+        .GroupBy(lambda x: x) \
+        .ToList()
     print(x)
 
     File.ReadAllLines("test.txt") \
@@ -52,13 +103,187 @@ def test_linq():
 
 
 
+def group_by_test():
+    x = List([1, 2, 3, 4, 5, 6, 7])
+
+    print(x.GroupBy(lambda x: x % 3))
+    print(x.GroupAggregate(lambda x: x % 2, {'count': 'count', 'max': 'max'}))
+    print(x.ToLookup(lambda x: x > 4)[True])
+
+
+# result: [{'key': 1, 'values': [1, 4, 7]}, {'key': 2, 'values': [2, 5]}, {'key': 0, 'values': [3, 6]}]
+#         [{'key': 1, 'count': 4, 'max': 7}, {'key': 0, 'count': 3, 'max': 6}]
+#         [5, 6, 7]
+
+
+def predicate_overloads_test():
+    x = List([3, 8, 1, 9, 4])
+
+    print(x.Any(lambda x: x > 5), x.All(lambda x: x > 1), x.Count(lambda x: x % 2 == 0))
+    print(x.First(lambda x: x > 5), x.Last(lambda x: x > 5), x.Single(lambda x: x == 1),
+          x.FirstOrDefault(0, lambda x: x > 100), x.SingleOrDefault(0, lambda x: x > 5))
+
+
+# result: True False 2
+#         8 9 1 0 0
+
+
+def as_parallel_test():
+    x = List(range(10)).AsParallel(workers=4, backend="thread", chunk_size=3) \
+        .AsOrdered() \
+        .Select(lambda x: x * x) \
+        .Where(lambda x: x % 2 == 0)
+
+    print(x.ToList())
+    print(x.Aggregate(0, lambda a, x: a + x, lambda a, b: a + b))
+
+
+# result: [0, 4, 16, 36, 64]
+#         120
+
+
+def parallel_lines_test():
+    file_name = os.path.join(tempfile.mkdtemp(), 'numbers.txt')
+    File.WriteLines(file_name, Enumerable.From(range(1000)).Select(str))
+    x = File.ParallelLines(file_name, workers=3, backend="thread", range_size=100).Select(int)
+
+    print(x.Count(), x.Sum(), x.Min(), x.Max(), x.AsOrdered().ToList()[:3])
+    print(sorted(x.GroupAggregate(lambda n: n % 2, {'n': 'count', 'top': 'max'}), key=lambda g: g['key']))
+
+
+# result: 1000 499500 0 999 [0, 1, 2]
+#         [{'key': 0, 'n': 500, 'top': 998}, {'key': 1, 'n': 500, 'top': 999}]
+
+
+def external_order_test():
+    x = Enumerable.From([(3, 'a'), (1, 'b'), (3, 'c'), (2, 'd'), (1, 'e')] * 100)
+
+    print(x.OrderBy(lambda t: t[0], memory_limit=1000).Select(lambda t: t[1]).Take(4).ToList())
+    print(x.OrderByDescending(lambda t: t[0], memory_limit=1000).ThenByDescending(lambda t: t[1]).Distinct().ToList())
+
+
+# result: ['b', 'e', 'b', 'e']
+#         [(3, 'c'), (3, 'a'), (2, 'd'), (1, 'e'), (1, 'b')]
+
+
+def async_enumerable_test():
+    async def fetch(x):
+        await asyncio.sleep(0.01 * (5 - x))
+        return x * 10
+
+    async def run():
+        x = AsyncEnumerable.From(range(5)).SelectAsync(fetch, max_concurrency=5)
+        print(await x.ToList())
+        print(await x.Where(lambda x: x > 10).Count())
+        y = AsyncEnumerable.From([3, 1, 4, 1, 5, 9, 2, 6])
+        print(await y.Min(), await y.Max(lambda v: -v), await y.Max(selector=lambda v: v % 5), await y.Average())
+        print(await y.OrderBy(lambda v: v % 3).ThenByDescending().ToList(), await y.Last(lambda v: v < 5))
+        print(await y.GroupBy(lambda v: v % 2, fun_result_selector=lambda k, g: (k, g.Count())).ToList())
+        print(await y.Except([1, 9]).Union(x).Zip(range(5), lambda a, b: a * b).ToList(),
+              await y.Single(lambda v: v > 6), await y.Aggregate(0, lambda a, v: a * 10 + v))
+        print(await y.ElementAt(2), await y.ElementAtOrDefault(20, -1), await y.Reverse().Chunk(3).ToList(),
+              await y.MinBy(lambda v: abs(v - 5)), (await y.Stats())['sample_variance'])
+        print(await y.GroupAggregate(lambda v: v % 2, {'n': 'count', 'top': 'max'}).ToList(),
+              (await y.ToLookup(lambda v: v % 2))[0], await y.AggregateMany({'total': 'sum'}),
+              await y.LeftJoin([(1, 'one')], lambda v: v, lambda p: p[0], lambda v, p: p and p[1]).Take(3).ToList(),
+              await y.GroupJoin([1, 1], lambda v: v, lambda v: v, lambda v, g: len(g)).Take(2).ToList())
+
+    asyncio.run(run())
+
+
+# result: [0, 10, 20, 30, 40]
+#         3
+#         1 1 4 3.875
+#         [9, 6, 3, 4, 1, 1, 5, 2] 2
+#         [(1, 5), (0, 3)]
+#         [0, 4, 10, 6, 24] 9 31415926
+#         4 -1 [[6, 2, 9], [5, 1, 4], [1, 3]] 5 7.55357142857143
+#         [{'key': 1, 'n': 5, 'top': 9}, {'key': 0, 'n': 3, 'top': 6}] [4, 2, 6] {'total': 31} [None, 'one', None] [0, 2]
+
+
+def numeric_test():
+    x = List([10, 20, 1, 60, 30, 10]).AsNumeric('q')
+
+    print(x.Sum(), x.Average(), x.Max(), x.Count('>', 10))
+    print(x.Where('<', 20).Select(lambda x: x * 2))
+    print(List([2 ** 40, 3]).AsNumeric('q').Select(lambda v: v * v), List([2 ** 62, 2 ** 62]).AsNumeric('q').Sum())
+    print(x.Select(lambda v: v + 1, vectorized=True), x.Sum(lambda v: v // 10), x.Min(selector=lambda v: -v))
+    try:
+        List([1, 0]).AsNumeric('q').Select(lambda v: 1 / v)
+    except ZeroDivisionError:
+        print('ZeroDivisionError')
+    try:
+        List([1.5]).AsNumeric('q')
+    except TypeError:
+        print('TypeError')
+
+
+# result: 131 21.833333333333332 60 3
+#         [20, 2, 20]
+#         [1208925819614629174706176, 9] 9223372036854775808
+#         [11, 21, 2, 61, 31, 11] 13 -60
+#         ZeroDivisionError
+#         TypeError
+
+
+def then_by_test():
+    x = List([{'score': 5, 'ts': 2}, {'score': 9, 'ts': 3}, {'score': 5, 'ts': 1}, {'score': 1, 'ts': 1}])
+    ordered = x.OrderByDescending(lambda r: r['score']).ThenBy(lambda r: r['ts'])
+
+    print(ordered.Take(3).ToList())
+    print(ordered.First())
+
+
+# result: [{'score': 9, 'ts': 3}, {'score': 5, 'ts': 1}, {'score': 5, 'ts': 2}]
+#         {'score': 9, 'ts': 3}
+
+
+def stats_test():
+    x = List([{'v': 2}, {'v': 4}, {'v': 4}, {'v': 4}, {'v': 5}, {'v': 5}, {'v': 7}, {'v': 9}])
+
+    print(x.Stats(lambda r: r['v']))
+    print(x.MaxBy(lambda r: r['v']), x.Aggregate(0, lambda acc, r: acc + r['v'], lambda acc: acc * 10))
+
+
+# result: {'count': 8, 'sum': 40, 'min': 2, 'max': 9, 'average': 5.0, 'variance': 4.0, 'sample_variance': 4.571428571428571}
+#         {'v': 9} 400
+
+
+def profiling_test():
+    x = List(range(1000)).WithProfiling() \
+        .Select(lambda x: x * 2) \
+        .Where(lambda x: x % 3 == 0)
+
+    print(x.Profile().AsDicts().Select(lambda s: (s['name'], s['rows_in'], s['rows_out'], s['selector_calls'])))
+    print(x.Explain())
+    y = Enumerable.From(range(1000)).WithProfiling().Select(lambda x: x * 2).Where(lambda x: x % 3 == 0)
+    print(y.Count(), y.Profile().AsDicts().Select(lambda s: (s['name'], s['rows_in'], s['rows_out'])))
+
+
+# result: [('Select', 1000, 1000, 1000), ('Where', 1000, 334, 1000)]
+#         (a table with one line per operator and the total time)
+#         334 [('Select', None, 1000), ('Where', 1000, 334), ('Count', 334, None)]
+
+
 def union_test():
     x = [20, 10, 30, 50]
     y = [60, 20, 30, 60]
     print(List(x).Union(y))
 
 
-# result: [10, 50, 20, 60, 30]
+# result: [20, 10, 30, 50, 60]
+
+
+def distinct_by_test():
+    x = [{'id': 1, 'v': 'a'}, {'id': 2, 'v': 'b'}, {'id': 1, 'v': 'c'}]
+    y = [{'id': 2}]
+
+    print(List(x).DistinctBy(lambda r: r['id']))
+    print(List(x).ExceptBy(y, lambda r: r['id']))
+
+
+# result: [{'id': 1, 'v': 'a'}, {'id': 2, 'v': 'b'}]
+#         [{'id': 1, 'v': 'a'}, {'id': 1, 'v': 'c'}]
 
 
 def zip_test():
@@ -71,6 +296,187 @@ def zip_test():
 # ['A1', 'B2', 'C3']
 
 
+def enumerable_test():
+    x = Enumerable.From(range(10 ** 9)) \
+        .Select(lambda x: x * 2) \
+        .Where(lambda x: x % 3 == 0) \
+        .Take(4)
+
+    print(x.ToList())
+    print(List([5, 1, 4]).AsEnumerable().OrderBy().First())
+
+
+# result: [0, 6, 12, 18]
+#         1
+
+
+def read_lines_test():
+    print(File.ReadLines("test.txt").Select(lambda x: int(x)).Where(lambda x: x > 60).First())
+
+
+# result: 65
+
+
+def map_bytes_test():
+    print(File.ReadSegments("test.txt", b"\r\n").Select(bytes).Take(2).ToList())
+    print(bytes(File.OpenView("test.txt", 3, 1)))
+
+
+# result: [b'5', b'6']
+#         b'6'
+
+
+def memoize_test():
+    calls = []
+    x = Enumerable.From(range(5)).Select(lambda n: calls.append(n) or n * 10).Memoize()
+    print(x.Take(2).ToList(), len(calls))
+    print(x.ToList(), x.Count(), len(calls))
+    shared = Enumerable.From(range(5)).Share()
+    print(shared.Take(2).ToList(), shared.ToList())
+    print(File.ReadLines("test.txt").Select(int).Where(lambda n: n > 60).Cached("test").Count())
+    cache = QueryCache()
+    query = lambda t: File.ReadLines("test.txt").Select(int).Where(lambda n: n > t).Cached(cache=cache).Count()
+    print(query(60), query(60), query(70), cache.Statistics()['hits'])
+    ordered = lambda: Enumerable.From(range(5)).OrderByDescending(lambda n: n % 3).GroupAggregate(
+        lambda n: n % 2, {'top': ('max', lambda n: n * 10)}).Cached(cache=cache)
+    deferred = ordered()
+    print(cache.Statistics()['misses'], ordered().ToList(), deferred.ToList(), cache.Statistics()['hits'])
+
+
+# result: [0, 10] 2
+#         [0, 10, 20, 30, 40] 5 5
+#         [0, 1] [2, 3, 4]
+#         5
+#         5 5 3 1
+#         2 [{'key': 0, 'top': 40}, {'key': 1, 'top': 30}] [{'key': 0, 'top': 40}, {'key': 1, 'top': 30}] 2
+
+
+def observable_list_test():
+    rows = ObservableList([5, 8, 1])
+    even = rows.LiveWhere(lambda x: x % 2 == 0).LiveSelect(lambda x: x * 10)
+    count = rows.LiveCount(lambda x: x > 2)
+    maximum = rows.LiveMax()
+    groups = rows.LiveGroupBy(lambda x: x % 2).Sum()
+    rows.AddRange([4, 12])
+    rows.Remove(8)
+    rows.Insert(0, 2)
+    print(even, count, maximum, groups)
+    rows.RemoveAt(-1)
+    print(even, count, maximum, groups)
+    print(rows.Where(lambda x: x > 2), rows.Count(), rows.Max(lambda x: -x))
+
+
+# result: [20, 40, 120] 3 12 {1: 6, 0: 18}
+#         [20, 40] 2 5 {1: 6, 0: 6}
+#         [5, 4] 4 1
+
+
+def index_test():
+    get_id = lambda x: x['id']
+    users = List([{'id': 1, 'name': 'Ann'}, {'id': 2, 'name': 'Bob'}])
+    users.CreateIndex('id', get_id, unique=True)
+    users.Add({'id': 3, 'name': 'Eve'})
+    users.RemoveAt(0)
+    print(users.Lookup('id', 3), users.Where(get_id, equals=2))
+    numbers = List([5, 6, 10])
+    numbers.CreateIndex('value')
+    numbers.Insert(0, 7)
+    print(numbers.IndexOf(10), numbers.Contains(6), numbers.Contains(8))
+
+
+# result: [{'id': 3, 'name': 'Eve'}] [{'id': 2, 'name': 'Bob'}]
+#         3 True False
+
+
+def sorted_list_test():
+    x = SortedList([(5, 'e'), (1, 'a'), (9, 'i')], key=lambda t: t[0])
+    x.AddRange([(3, 'c'), (7, 'g')])
+    x.Add((4, 'd'))
+    x.Remove((9, 'i'))
+    print(x.Range(3, 7).Select(lambda t: t[1]), x.IndexOf((7, 'g')), x.Contains((4, 'x')))
+    print(x.Floor(6), x.Ceiling(6), x.Floor(0))
+    print(x.SkipWhile('<', 4).TakeWhile('<=', 5))
+    print(x.SkipWhile(lambda t: t[0] < 10), x.TakeWhile(lambda t: t[0] < 10).Count())
+
+
+# result: ['c', 'd', 'e'] 4 False
+#         (5, 'e') (7, 'g') None
+#         [(4, 'd'), (5, 'e')]
+#         [] 5
+
+
+def chunk_test():
+    print(List([1, 2, 3, 4, 5]).Chunk(2).ToList())
+    print(Enumerable.From(["ab", "cd", "efg", "h"]).Batch(3, max_bytes=4).ToList())
+    List(range(7)).ForEachBatch(lambda batch: print(batch.Sum()), size=3)
+
+
+# result: [[1, 2], [3, 4], [5]]
+#         [['ab', 'cd'], ['efg', 'h']]
+#         3
+#         12
+#         6
+
+
+def write_lines_test():
+    file_name = os.path.join(tempfile.mkdtemp(), 'lines.txt')
+    File.WriteLines(file_name, Enumerable.From(range(3)).Select(str))
+    File.AppendLines(file_name, (x for x in ["a", "b"]))
+    with File.OpenWriter(file_name, "a", flush_every=1) as writer:
+        writer.WriteLine("c")
+    print(repr(File.ReadAllText(file_name)))
+    File.WriteAllLines(file_name, ['1', '2'])
+    File.AppendLines(file_name, ['3'])
+    File.AppendAllText(file_name, '4')
+    File.AppendAllLines(file_name, (x for x in ['5']))
+    print(repr(File.ReadAllText(file_name)))
+
+
+# result: '0\n1\n2\na\nb\nc\n'
+#         '1\n2\n3\n4\n5\n'
+
+
+def compressed_test():
+    directory = tempfile.mkdtemp()
+    for extension in ['.gz', '.bz2', '.xz']:
+        file_name = os.path.join(directory, 'lines' + extension)
+        File.WriteLines(file_name, Enumerable.From(range(5)).Select(str))
+        File.AppendLines(file_name, ["a"])
+        print(extension, File.ReadLines(file_name).Where(lambda x: x != "2").ToList())
+    plain = os.path.join(directory, 'plain.txt')
+    File.WriteAllLines(plain, ['BZh is not bz2'])
+    File.AppendAllLines(plain, ['x'])
+    os.rename(os.path.join(directory, 'lines.gz'), os.path.join(directory, 'lines'))
+    print(File.ReadAllLines(plain), File.ReadLines(os.path.join(directory, 'lines'), compression='sniff').Count())
+
+
+# result: .gz ['0', '1', '3', '4', 'a']
+# result: .bz2 ['0', '1', '3', '4', 'a']
+# result: .xz ['0', '1', '3', '4', 'a']
+#         ['BZh is not bz2', 'x'] 6
+
+
+def read_records_test():
+    directory = tempfile.mkdtemp()
+    csv_name = os.path.join(directory, 'orders.csv')
+    File.WriteAllText(csv_name, 'id,name,price\nA1,"Smith, J",10.5\nB2,Doe,3\nA3,"multi\nline",2.25\n')
+    print(File.ReadCsv(csv_name, columns=['price', 'id'], types={'price': float},
+                       predicate=lambda row: row['id'].startswith('A')).ToList())
+    json_name = os.path.join(directory, 'events.jsonl')
+    File.WriteAllText(json_name, '{"user": "a", "level": "ERROR"}\n\n{"user": "b", "level": "INFO"}\n')
+    print(File.ReadJsonLines(json_name, fields=['user', 'code'], predicate=lambda e: e['level'] == 'ERROR').ToList())
+    File.AppendAllText(csv_name, 'C4\n')
+    try:
+        File.ReadCsv(csv_name).ToList()
+    except ValueError as e:
+        print(str(e).replace(csv_name, 'orders.csv'))
+
+
+# result: [{'price': 10.5, 'id': 'A1'}, {'price': 2.25, 'id': 'A3'}]
+# result: [{'user': 'a', 'code': None}]
+#         Record 4 of orders.csv has 1 fields, fewer than the header
+
+
 def append_all_lines_to_file_test():
     file_name = 'test.txt'
     array = ["10", "44532"]